@@ -0,0 +1,160 @@
+# Formación de imagen SAR por retroproyección (backprojection) en el dominio del tiempo.
+# Toma la matriz de ecos comprimida en rango y las posiciones de la plataforma (sar_sim.py)
+# y, para cada píxel, suma a lo largo de la trayectoria la muestra interpolada en su retardo
+# 2R/c con la fase de portadora compensada. La grilla se divide en tiles que se reparten en
+# un pool de procesos; dentro de cada tile el cálculo es vectorizado (píxeles x bloque de
+# pulsos), así que una imagen de 1000x1000 escala con la cantidad de núcleos.
+# Uso: python backprojection.py [-pixeles 1000] [-workers 8] [-tile 64] [-plot]
+import argparse  #para parsear argumentos
+import os        #para contar los núcleos
+import time  # Para medir el tiempo de formación de la imagen
+from concurrent.futures import ProcessPoolExecutor  # Pool de procesos para los tiles
+
+import numpy as np  # Para operaciones numéricas y manejo de arreglos
+
+from sar_raw import open_raw  # Ecos comprimidos guardados en disco
+
+TILE = 64  # Lado de los tiles en píxeles
+PULSE_BLOCK = 256  # Pulsos procesados juntos dentro de un tile (acota la memoria)
+
+_shared = {}  # Datos compartidos por los tiles de cada proceso del pool
+
+
+def image_grid(p, nx, ny):
+    """
+    Ejes de una grilla de nx x ny píxeles que cubre la trayectoria y la franja de rango.
+    """
+    return np.linspace(p['x_R_initial'], p['x_f'], nx), np.linspace(p['y_m'], p['y_M'], ny)
+
+
+def backproject_tile(compressed, x, x_axis, y_axis, p, footprint=True, pulse_block=PULSE_BLOCK):
+    """
+    Retroproyección de un tile de la grilla.
+
+    Args:
+        compressed: Ecos comprimidos en rango (pulsos, muestras), con el pico de un blanco en
+            la muestra round((2R/c - t_i)/TS_ft) - 1 (convención de echo4).
+        x: Posiciones de la plataforma (pulsos,).
+        x_axis, y_axis: Coordenadas de los píxeles del tile.
+        p (dict): Parámetros de la escena (sar_sim.make_params()).
+        footprint (bool): Si True, cada píxel solo integra los pulsos que lo iluminan.
+    Returns:
+        Imagen compleja (len(y_axis), len(x_axis)).
+    """
+    px, py = np.meshgrid(x_axis, y_axis)
+    px = px.ravel()[np.newaxis, :]
+    py = py.ravel()[np.newaxis, :]
+    n_samples = compressed.shape[1]
+    image = np.zeros(px.shape[1], dtype=np.complex128)
+    for start in range(0, len(x), pulse_block):
+        x_R = x[start:start + pulse_block, np.newaxis]
+        if footprint:
+            lit = (py > p['y_m']) & (py < p['y_M']) & (np.abs(px - x_R) < p['m'] * py)
+            if not lit.any():
+                continue  # Ningún píxel del tile está en la huella de estos pulsos
+        block = compressed[start:start + pulse_block]
+        delay = 2 * np.sqrt((px - x_R) ** 2 + (py - p['y_R']) ** 2) / p['c']  # (pulsos, píxeles)
+        s = (delay - p['t_i']) / p['TS_ft'] - 1  # Muestra fraccionaria del retardo
+        i0 = np.floor(s).astype(np.int64)
+        frac = s - i0
+        valid = (i0 >= 0) & (i0 < n_samples - 1)
+        if footprint:
+            valid &= lit
+        i0 = np.where(valid, i0, 0)
+        # Interpolación lineal entre las muestras i0 e i0 + 1 de cada pulso
+        sample = (np.take_along_axis(block, i0, axis=1) * (1 - frac)
+                  + np.take_along_axis(block, i0 + 1, axis=1) * frac)
+        phase = np.exp(-1j * 2 * np.pi * p['fC'] * delay)  # Compensa la fase de portadora
+        image += np.einsum('ij,ij->j', sample * phase, valid)
+    return image.reshape(len(y_axis), len(x_axis))
+
+
+def _init_worker(compressed, x, p, footprint, pulse_block):
+    if isinstance(compressed, str):
+        compressed = open_raw(compressed)[0]  # Cada proceso mapea el archivo (no se copia)
+    _shared.update(compressed=compressed, x=x, p=p, footprint=footprint, pulse_block=pulse_block)
+
+
+def _run_tile(task):
+    iy, ix, x_axis, y_axis = task
+    tile = backproject_tile(_shared['compressed'], _shared['x'], x_axis, y_axis, _shared['p'],
+                            _shared['footprint'], _shared['pulse_block'])
+    return iy, ix, tile
+
+
+def backproject(compressed, x, x_axis, y_axis, p, tile=TILE, workers=None, footprint=True,
+                pulse_block=PULSE_BLOCK):
+    """
+    Imagen completa por retroproyección, con los tiles repartidos en un pool de procesos.
+
+    Args:
+        compressed: Ecos comprimidos en rango, o la ruta de un archivo comprimido de
+            sar_raw.py (se lee por bloques de pulsos).
+        tile (int): Lado de los tiles en píxeles.
+        workers (int): Procesos del pool (por defecto os.cpu_count(); 1 = sin pool).
+    Returns:
+        Imagen compleja (len(y_axis), len(x_axis)).
+    """
+    workers = workers or os.cpu_count()
+    tasks = [(iy, ix, x_axis[ix:ix + tile], y_axis[iy:iy + tile])
+             for iy in range(0, len(y_axis), tile) for ix in range(0, len(x_axis), tile)]
+    image = np.zeros((len(y_axis), len(x_axis)), dtype=np.complex128)
+    if workers == 1:
+        _init_worker(compressed, x, p, footprint, pulse_block)
+        results = map(_run_tile, tasks)
+        for iy, ix, sub in results:
+            image[iy:iy + sub.shape[0], ix:ix + sub.shape[1]] = sub
+        return image
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(compressed, x, p, footprint, pulse_block)) as pool:
+        for iy, ix, sub in pool.map(_run_tile, tasks):
+            image[iy:iy + sub.shape[0], ix:ix + sub.shape[1]] = sub
+    return image
+
+
+def plot_image(image, x_axis, y_axis, dynamic_range=40):
+    """
+    Imagen en dB con rango dinámico ajustable.
+    """
+    import matplotlib.pyplot as plt  # Solo para graficar
+    mag_db = 20 * np.log10(np.maximum(np.abs(image), 1e-12))
+    plt.imshow(mag_db, origin='lower', cmap='gray', aspect='auto',
+               extent=[x_axis[0], x_axis[-1], y_axis[0], y_axis[-1]],
+               vmin=mag_db.max() - dynamic_range, vmax=mag_db.max())
+    plt.xlabel('Posición a lo largo de la trayectoria (m)')
+    plt.ylabel('Rango (m)')
+    plt.title('Imagen SAR (backprojection, dB)')
+    plt.colorbar()
+    plt.show()
+
+
+if __name__ == "__main__":
+    import chirp_bank  # Compresión en rango
+    import sar_sim  # Escena de SAR.m
+
+    # Crear el parser
+    parser = argparse.ArgumentParser(description="Imagen SAR por retroproyección con tiles en paralelo")
+    parser.add_argument('-pixeles', type=int, default=200, help="Píxeles por lado de la imagen")
+    parser.add_argument('-workers', type=int, default=os.cpu_count(), help="Procesos del pool")
+    parser.add_argument('-tile', type=int, default=TILE, help="Lado de los tiles en píxeles")
+    parser.add_argument('-plot', action='store_true', help="Grafica la imagen")
+    args = parser.parse_args()
+
+    p = sar_sim.make_params()
+    sigma, x = sar_sim.simulate(sar_sim.TARGETS, p)
+    compressed = chirp_bank.range_compress(sigma, p['B'], p['tau'], p['TS_ft'], 'hamming')
+    x_axis, y_axis = image_grid(p, args.pixeles, args.pixeles)
+
+    start = time.perf_counter()
+    image = backproject(compressed, x, x_axis, y_axis, p, tile=args.tile, workers=args.workers)
+    print(f"Imagen {image.shape} con {args.workers} procesos en {time.perf_counter() - start:.2f} s")
+
+    # Verificación: el máximo local cerca de cada blanco
+    for rcs, x_0, y_0 in sar_sim.TARGETS:
+        ix = np.abs(x_axis - x_0) < 10
+        iy = np.abs(y_axis - y_0) < 10
+        sub = np.abs(image[np.ix_(iy, ix)])
+        ky, kx = np.unravel_index(np.argmax(sub), sub.shape)
+        print(f"Blanco ({x_0:.0f}, {y_0:.0f}) m -> pico en ({x_axis[ix][kx]:.1f}, {y_axis[iy][ky]:.1f}) m")
+    if args.plot:
+        plot_image(image, x_axis, y_axis)
@@ -0,0 +1,120 @@
+# Banco de chirps de referencia para compresión de pulso (filtro adaptado).
+# echo4 (SAR.m, eco.m) vuelve a calcular exp(1j*pi*K*t.^2) y fft(s, nfft) en cada llamada,
+# aunque solo dependen de (B, tau, TS_ft, nfft). Acá los chirps, sus espectros y los
+# filtros adaptados con ventana se calculan una vez y quedan en una caché LRU; los arreglos
+# devueltos son de solo lectura porque se comparten entre todas las llamadas.
+# Uso: python chirp_bank.py [-ventana hamming]
+import argparse  #para parsear argumentos
+import time  # Para medir tiempos
+from functools import lru_cache  # Caché de los espectros de referencia
+
+import numpy as np  # Para operaciones numéricas y manejo de arreglos
+
+CACHE_SIZE = 32  # Combinaciones de parámetros guardadas
+
+WINDOWS = {
+    'rect': np.ones,
+    'hamming': np.hamming,
+    'hann': np.hanning,
+    'blackman': np.blackman,
+}
+
+
+def _read_only(array):
+    array.flags.writeable = False
+    return array
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def chirp(B, tau, TS_ft):
+    """
+    Chirp LFM en banda base muestreado en t = -tau/2:TS_ft:tau/2 (como en echo4).
+    """
+    t = np.arange(int(np.floor(round(tau / TS_ft, 9))) + 1) * TS_ft - tau / 2
+    K = B / tau
+    return _read_only(np.exp(1j * np.pi * K * t ** 2))
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def chirp_spectrum(B, tau, TS_ft, nfft):
+    """
+    fft(s, nfft) del chirp de referencia.
+    """
+    return _read_only(np.fft.fft(chirp(B, tau, TS_ft), nfft))
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def taper(name, n):
+    """
+    Ventana de n muestras para bajar los lóbulos laterales del pulso comprimido.
+    """
+    return _read_only(WINDOWS[name](n))
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def matched_filter(B, tau, TS_ft, nfft, window='rect'):
+    """
+    Respuesta en frecuencia del filtro adaptado: conj(fft(s · ventana, nfft)).
+
+    Con el chirp empezando en la muestra k del eco, el pico comprimido queda en k.
+    """
+    s = chirp(B, tau, TS_ft)
+    return _read_only(np.conj(np.fft.fft(s * taper(window, len(s)), nfft)))
+
+
+def range_compress(echoes, B, tau, TS_ft, window='rect', nfft=None):
+    """
+    Compresión en rango de una matriz de ecos completa (pulsos x muestras) con una sola
+    FFT/IFFT por lotes y el filtro adaptado de la caché.
+
+    Args:
+        echoes: Arreglo complejo (..., muestras).
+        window (str): Ventana del filtro ('rect', 'hamming', 'hann', 'blackman').
+        nfft (int): Puntos de la FFT (por defecto el número de muestras).
+    Returns:
+        Arreglo complejo (..., nfft) comprimido en rango.
+    """
+    nfft = nfft or echoes.shape[-1]
+    H = matched_filter(B, tau, TS_ft, nfft, window)
+    return np.fft.ifft(np.fft.fft(echoes, nfft, axis=-1) * H, axis=-1)
+
+
+def cache_info():
+    """
+    Estadísticas de la caché (aciertos y fallos por función).
+    """
+    return {f.__name__: f.cache_info() for f in (chirp, chirp_spectrum, taper, matched_filter)}
+
+
+def clear_cache():
+    for f in (chirp, chirp_spectrum, taper, matched_filter):
+        f.cache_clear()
+
+
+if __name__ == "__main__":
+    import sar_sim  # Escena de SAR.m
+
+    # Crear el parser
+    parser = argparse.ArgumentParser(description="Compresión en rango con banco de chirps en caché")
+    parser.add_argument('-ventana', type=str, default='rect', choices=WINDOWS, help="Ventana del filtro adaptado")
+    args = parser.parse_args()
+
+    p = sar_sim.make_params()
+    sigma, x = sar_sim.simulate(sar_sim.TARGETS, p)
+    B, tau, TS_ft, nfft = p['B'], p['tau'], p['TS_ft'], p['nfft']
+
+    # Referencia: se resintetiza el filtro en cada pulso, como echo4
+    start = time.perf_counter()
+    for row in sigma:
+        t = np.arange(int(np.floor(round(tau / TS_ft, 9))) + 1) * TS_ft - tau / 2
+        s = np.exp(1j * np.pi * (B / tau) * t ** 2) * WINDOWS[args.ventana](len(t))
+        np.fft.ifft(np.fft.fft(row, nfft) * np.conj(np.fft.fft(s, nfft)))
+    per_pulse = time.perf_counter() - start
+
+    start = time.perf_counter()
+    compressed = range_compress(sigma, B, tau, TS_ft, args.ventana)
+    batched = time.perf_counter() - start
+    print(f"{sigma.shape[0]} pulsos: resintetizando {per_pulse:.2f} s, banco en caché {batched:.2f} s")
+    print(f"Pico del primer pulso en la muestra {np.argmax(np.abs(compressed[0]))}")
+    for name, info in cache_info().items():
+        print(f"{name}: {info}")
@@ -0,0 +1,130 @@
+# Procesador SAR Range-Doppler (RDA) en el dominio de la frecuencia.
+# La retroproyección cuesta O(N³) (píxeles x pulsos); el RDA procesa la matriz de ecos
+# completa con FFTs, O(N² log N):
+#   1. compresión en rango (filtro adaptado del banco de chirps),
+#   2. FFT en azimut (a lo largo de los pulsos) -> dominio range-Doppler,
+#   3. corrección de la migración en rango (RCMC): cada fila Doppler se reinterpola para
+#      que un blanco a distancia mínima R0 quede en el bin de R0,
+#   4. compresión en azimut con el filtro exp(-j R0 sqrt(4k² - kx²)) e IFFT en azimut.
+# La imagen queda en coordenadas (posición a lo largo de la trayectoria, distancia mínima R0).
+# Uso: python range_doppler.py [-xf 500] [-benchmark -pixeles 100]
+import argparse  #para parsear argumentos
+import time  # Para medir tiempos
+
+import numpy as np  # Para operaciones numéricas y manejo de arreglos
+
+import chirp_bank  # Compresión en rango
+
+
+def range_axis(n_samples, p):
+    """
+    Distancia asociada a cada muestra de rango (convención de echo4: el eco de un blanco a
+    distancia R queda en la muestra round((2R/c - t_i)/TS_ft) - 1).
+    """
+    return p['c'] / 2 * (p['t_i'] + (np.arange(n_samples) + 1) * p['TS_ft'])
+
+
+def rcmc(data, R, kx, k):
+    """
+    Corrección de la migración en rango en el dominio range-Doppler.
+
+    Un blanco a distancia mínima R0 aparece, en la frecuencia espacial kx, a distancia
+    R0 / sqrt(1 - (kx / 2k)²): cada fila se interpola linealmente en esa distancia.
+
+    Args:
+        data: Matriz range-Doppler (kx, muestras de rango).
+        R: Distancias de las muestras de rango.
+        kx: Frecuencias espaciales en azimut (rad/m).
+        k (float): Número de onda de la portadora (2π/λ).
+    """
+    D = np.sqrt(np.maximum(1 - (kx / (2 * k)) ** 2, 1e-6))[:, np.newaxis]
+    dR = R[1] - R[0]
+    s = (R[np.newaxis, :] / D - R[0]) / dR  # Muestra fraccionaria de R0 / D para cada fila
+    i0 = np.floor(s).astype(np.int64)
+    frac = s - i0
+    valid = (i0 >= 0) & (i0 < data.shape[1] - 1)
+    i0 = np.where(valid, i0, 0)
+    out = (np.take_along_axis(data, i0, axis=1) * (1 - frac)
+           + np.take_along_axis(data, i0 + 1, axis=1) * frac)
+    return np.where(valid, out, 0)
+
+
+def range_doppler(sigma, x, p, window='hamming', compressed=False):
+    """
+    Imagen SAR por Range-Doppler.
+
+    Args:
+        sigma: Ecos crudos (pulsos, muestras) de sar_sim.simulate() (o ya comprimidos en
+            rango si compressed=True).
+        x: Posiciones de la plataforma (equiespaciadas).
+        p (dict): Parámetros de la escena (sar_sim.make_params()).
+        window (str): Ventana del filtro adaptado en rango.
+    Returns:
+        tuple: (imagen compleja (pulsos, muestras), eje x en m, eje R0 en m).
+    """
+    data = sigma if compressed else chirp_bank.range_compress(sigma, p['B'], p['tau'], p['TS_ft'], window)
+    R = range_axis(data.shape[1], p)
+    dx = x[1] - x[0]
+    k = 2 * np.pi * p['fC'] / p['c']
+    kx = 2 * np.pi * np.fft.fftfreq(len(x), dx)
+
+    data = np.fft.fft(data, axis=0)  # Azimut -> kx
+    data = rcmc(data, R, kx, k)
+    # Compresión en azimut: quita la fase R0 sqrt(4k² - kx²) de cada bin de R0
+    data *= np.exp(-1j * R[np.newaxis, :] * np.sqrt(np.maximum(4 * k ** 2 - kx[:, np.newaxis] ** 2, 0)))
+    image = np.fft.ifft(data, axis=0)
+    return image, x, R
+
+
+if __name__ == "__main__":
+    import sar_sim  # Escena de SAR.m
+
+    # Crear el parser
+    parser = argparse.ArgumentParser(description="Procesador SAR Range-Doppler")
+    parser.add_argument('-xf', type=float, default=sar_sim.DEFAULTS['x_f'], help="Posición final de la trayectoria [m]")
+    parser.add_argument('-benchmark', action='store_true', help="Compara con backprojection en la misma escena")
+    parser.add_argument('-pixeles', type=int, default=100, help="Píxeles por lado de la imagen de backprojection")
+    parser.add_argument('-workers', type=int, default=None, help="Procesos de backprojection")
+    parser.add_argument('-plot', action='store_true', help="Grafica la imagen")
+    args = parser.parse_args()
+
+    p = sar_sim.make_params(x_f=args.xf)
+    sigma, x = sar_sim.simulate(sar_sim.TARGETS, p)
+    start = time.perf_counter()
+    image, x_axis, R0_axis = range_doppler(sigma, x, p)
+    t_rda = time.perf_counter() - start
+    print(f"Range-Doppler: imagen {image.shape} ({image.size} píxeles) en {t_rda:.2f} s")
+
+    # El blanco (x_0, y_0) aparece en (x_0, |y_0 - y_R|): la trayectoria está dentro de la franja
+    for rcs, x_0, y_0 in sar_sim.TARGETS:
+        R0 = abs(y_0 - p['y_R'])
+        ix = np.abs(x_axis - x_0) < 10
+        ir = np.abs(R0_axis - R0) < 10
+        sub = np.abs(image[np.ix_(ix, ir)])
+        kx_, kr = np.unravel_index(np.argmax(sub), sub.shape)
+        print(f"Blanco ({x_0:.0f}, R0 {R0:.0f}) m -> pico en ({x_axis[ix][kx_]:.1f}, {R0_axis[ir][kr]:.1f}) m")
+
+    if args.benchmark:
+        import backprojection  # Referencia en el dominio del tiempo
+        compressed = chirp_bank.range_compress(sigma, p['B'], p['tau'], p['TS_ft'], 'hamming')
+        bp_x, bp_y = backprojection.image_grid(p, args.pixeles, args.pixeles)
+        start = time.perf_counter()
+        backprojection.backproject(compressed, x, bp_x, bp_y, p, workers=args.workers)
+        t_bp = time.perf_counter() - start
+        per_pixel = t_bp / (len(bp_x) * len(bp_y))
+        print(f"Backprojection: {len(bp_x)}x{len(bp_y)} píxeles en {t_bp:.2f} s "
+              f"({per_pixel * 1e6:.1f} µs/píxel, {per_pixel * image.size:.0f} s estimados para {image.shape})")
+        print(f"Range-Doppler: {t_rda / image.size * 1e6:.3f} µs/píxel "
+              f"({per_pixel * image.size / t_rda:.0f}x más rápido en la misma grilla)")
+
+    if args.plot:
+        import matplotlib.pyplot as plt  # Solo para graficar
+        mag_db = 20 * np.log10(np.maximum(np.abs(image.T), 1e-12))
+        plt.imshow(mag_db, origin='lower', cmap='gray', aspect='auto',
+                   extent=[x_axis[0], x_axis[-1], R0_axis[0], R0_axis[-1]],
+                   vmin=mag_db.max() - 40, vmax=mag_db.max())
+        plt.xlabel('Posición a lo largo de la trayectoria (m)')
+        plt.ylabel('Distancia mínima R0 (m)')
+        plt.title('Imagen SAR (Range-Doppler, dB)')
+        plt.colorbar()
+        plt.show()
@@ -0,0 +1,162 @@
+# Datos crudos SAR fuera de memoria (out-of-core) en archivos mapeados en memoria.
+# SAR.m agranda sigma(n,:) fila por fila en RAM, así que aperturas largas o muestreo fino en
+# rango quedan limitados por la memoria. Acá la escena se genera por bloques de pulsos
+# directamente a un archivo complex64 con un encabezado de metadatos, y la compresión en
+# rango y la formación de imagen (Range-Doppler o backprojection) lo leen por bloques: el
+# tamaño de la escena queda limitado por el disco.
+#
+# Formato: HEADER_SIZE bytes con MAGIC + JSON (forma, tipo, parámetros de la escena, etapa)
+# rellenado con espacios, seguido de la matriz (pulsos, muestras) complex64 en orden C.
+# Uso: python sar_raw.py -archivo escena.sar -xf 2000 [-bloque 1024]
+import argparse  #para parsear argumentos
+import json      # Encabezado de metadatos
+import os        #para borrar archivos temporales
+import time  # Para medir tiempos
+import tracemalloc  # Memoria máxima reservada (sin contar las páginas mapeadas del archivo)
+
+import numpy as np  # Para operaciones numéricas y manejo de arreglos
+
+import chirp_bank  # Compresión en rango
+import sar_sim  # Generación de la escena
+from range_doppler import range_axis, rcmc  # Etapas del procesador Range-Doppler
+
+MAGIC = b'SARRAW1\n'
+HEADER_SIZE = 4096
+DTYPE = np.complex64
+BLOCK = 1024  # Pulsos por bloque (las pasadas por columnas usan bloques del mismo tamaño)
+
+
+def create_raw(path, shape, meta):
+    """
+    Crea un archivo de datos con su encabezado y devuelve la matriz mapeada (lectura/escritura).
+
+    Args:
+        shape (tuple): (pulsos, muestras).
+        meta (dict): Metadatos serializables en JSON (parámetros de la escena, etapa...).
+    """
+    header = MAGIC + json.dumps({'shape': list(shape), 'dtype': np.dtype(DTYPE).str, **meta}).encode()
+    if len(header) >= HEADER_SIZE:
+        raise ValueError(f"Encabezado de {len(header)} bytes, máximo {HEADER_SIZE - 1}")
+    with open(path, 'wb') as raw_file:
+        raw_file.write(header.ljust(HEADER_SIZE - 1) + b'\n')
+        raw_file.truncate(HEADER_SIZE + int(np.prod(shape)) * np.dtype(DTYPE).itemsize)
+    return np.memmap(path, dtype=DTYPE, mode='r+', offset=HEADER_SIZE, shape=tuple(shape))
+
+
+def open_raw(path, mode='r'):
+    """
+    Abre un archivo creado con create_raw().
+
+    Returns:
+        tuple: (matriz np.memmap, metadatos).
+    """
+    with open(path, 'rb') as raw_file:
+        header = raw_file.read(HEADER_SIZE)
+    if not header.startswith(MAGIC):
+        raise ValueError(f"'{path}' no es un archivo de datos SAR")
+    meta = json.loads(header[len(MAGIC):].decode().strip())
+    data = np.memmap(path, dtype=np.dtype(meta['dtype']), mode=mode, offset=HEADER_SIZE,
+                     shape=tuple(meta['shape']))
+    return data, meta
+
+
+def simulate_to_file(path, targets=sar_sim.TARGETS, p=None, block=BLOCK, rng=None):
+    """
+    Genera la escena de sar_sim por bloques de pulsos directamente al archivo.
+
+    Returns:
+        int: Número de pulsos escritos.
+    """
+    p = p or sar_sim.make_params()
+    x = sar_sim.positions(p)
+    data = create_raw(path, (len(x), p['nfft']), {'stage': 'raw', 'params': p})
+    for start in range(0, len(x), block):
+        sigma, _ = sar_sim.simulate(targets, p, rng, x=x[start:start + block])
+        data[start:start + block] = sigma
+    data.flush()
+    return len(x)
+
+
+def range_compress_file(src, dst, window='hamming', block=BLOCK):
+    """
+    Compresión en rango de un archivo de ecos crudos, bloque a bloque, a otro archivo.
+    """
+    raw, meta = open_raw(src)
+    p = meta['params']
+    out = create_raw(dst, raw.shape, {**meta, 'stage': 'compressed', 'window': window})
+    for start in range(0, raw.shape[0], block):
+        out[start:start + block] = chirp_bank.range_compress(np.asarray(raw[start:start + block]),
+                                                             p['B'], p['tau'], p['TS_ft'], window)
+    out.flush()
+
+
+def range_doppler_file(src, dst, block=BLOCK):
+    """
+    Range-Doppler fuera de memoria sobre un archivo comprimido en rango, en tres pasadas:
+    FFT en azimut por bloques de columnas, RCMC y filtro de azimut por bloques de filas Doppler
+    (ambos operan fila a fila) e IFFT en azimut por bloques de columnas, todo sobre dst.
+    """
+    data, meta = open_raw(src)
+    if meta['stage'] != 'compressed':
+        raise ValueError(f"'{src}' no está comprimido en rango (etapa {meta['stage']})")
+    p = meta['params']
+    n_pulses, n_samples = data.shape
+    columns = max(1, block * n_samples // n_pulses)  # Columnas por bloque: mismos elementos que block filas
+    out = create_raw(dst, data.shape, {**meta, 'stage': 'range_doppler'})
+    R = range_axis(n_samples, p)
+    k = 2 * np.pi * p['fC'] / p['c']
+    kx = 2 * np.pi * np.fft.fftfreq(n_pulses, p['v'] * p['TS_st'])
+
+    for start in range(0, n_samples, columns):  # Azimut -> kx
+        out[:, start:start + columns] = np.fft.fft(np.asarray(data[:, start:start + columns]), axis=0)
+    for start in range(0, n_pulses, block):  # RCMC y compresión en azimut
+        kx_block = kx[start:start + block]
+        rows = rcmc(np.asarray(out[start:start + block]), R, kx_block, k)
+        rows *= np.exp(-1j * R[np.newaxis, :] * np.sqrt(np.maximum(4 * k ** 2 - kx_block[:, np.newaxis] ** 2, 0)))
+        out[start:start + block] = rows
+    for start in range(0, n_samples, columns):  # kx -> azimut
+        out[:, start:start + columns] = np.fft.ifft(np.asarray(out[:, start:start + columns]), axis=0)
+    out.flush()
+
+
+if __name__ == "__main__":
+    # Crear el parser
+    parser = argparse.ArgumentParser(description="Escena SAR fuera de memoria en archivos mapeados")
+    parser.add_argument('-archivo', type=str, default="escena.sar", help="Archivo de ecos crudos")
+    parser.add_argument('-xf', type=float, default=2000, help="Posición final de la trayectoria [m]")
+    parser.add_argument('-nfft', type=int, default=sar_sim.DEFAULTS['nfft'], help="Muestras en rango")
+    parser.add_argument('-bloque', type=int, default=BLOCK, help="Pulsos por bloque")
+    parser.add_argument('-conservar', action='store_true', help="No borra los archivos intermedios")
+    args = parser.parse_args()
+
+    params = sar_sim.make_params(x_f=args.xf, nfft=args.nfft)
+    base = os.path.splitext(args.archivo)[0]
+    compressed_path, image_path = base + '_rc.sar', base + '_rda.sar'
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    n = simulate_to_file(args.archivo, sar_sim.TARGETS, params, args.bloque)
+    size_mb = os.path.getsize(args.archivo) / 1e6
+    print(f"Escena: {n} pulsos x {params['nfft']} muestras ({size_mb:.0f} MB) en {time.perf_counter() - start:.1f} s")
+    start = time.perf_counter()
+    range_compress_file(args.archivo, compressed_path, block=args.bloque)
+    print(f"Compresión en rango en {time.perf_counter() - start:.1f} s")
+    start = time.perf_counter()
+    range_doppler_file(compressed_path, image_path, block=args.bloque)
+    print(f"Range-Doppler en {time.perf_counter() - start:.1f} s")
+    print(f"Memoria máxima reservada: {tracemalloc.get_traced_memory()[1] / 1e6:.0f} MB por archivo de {size_mb:.0f} MB")
+    tracemalloc.stop()
+
+    image, meta = open_raw(image_path)
+    x_axis = sar_sim.positions(meta['params'])
+    R0_axis = range_axis(image.shape[1], meta['params'])
+    for rcs, x_0, y_0 in sar_sim.TARGETS:
+        ix = np.flatnonzero(np.abs(x_axis - x_0) < 10)
+        ir = np.flatnonzero(np.abs(R0_axis - abs(y_0 - params['y_R'])) < 10)
+        sub = np.abs(image[ix[0]:ix[-1] + 1, ir[0]:ir[-1] + 1])
+        kx_, kr = np.unravel_index(np.argmax(sub), sub.shape)
+        print(f"Blanco ({x_0:.0f}, {y_0:.0f}) m -> pico en ({x_axis[ix[kx_]]:.1f}, R0 {R0_axis[ir[kr]]:.1f}) m")
+    if not args.conservar:
+        del image
+        for path in (args.archivo, compressed_path, image_path):
+            os.remove(path)
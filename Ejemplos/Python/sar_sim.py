@@ -0,0 +1,212 @@
+# Simulador de ecos crudos SAR (port vectorizado de Ejemplos/Matlab/SAR.m).
+# SAR.m recorre las posiciones de la plataforma y, para cada blanco dentro de la huella,
+# llama a echo4(), que vuelve a sintetizar el chirp y su FFT. Acá todas las posiciones x
+# blancos se calculan de una vez: la huella es una máscara por broadcasting, los retardos
+# una matriz 2-D, y los ecos se forman con una sola FFT/IFFT por lotes de la matriz de
+# impulsos (pulsos x nfft) multiplicada por el espectro del chirp.
+# Uso: python sar_sim.py [-plot] [-verificar] [-blancos 200] [-xf 5000]
+import argparse  #para parsear argumentos
+import time  # Para medir el tiempo de simulación
+
+import numpy as np  # Para operaciones numéricas y manejo de arreglos
+
+from chirp_bank import chirp, chirp_spectrum  # Chirp de referencia y su espectro en caché
+
+# --- Parámetros de SAR.m (mismos nombres) ---
+DEFAULTS = {
+    'c': 3e8,              # Velocidad de la luz [m/s]
+    'fC': 5.3e9,           # Frecuencia central [Hz] (banda C)
+    'B': 50e6,             # Ancho de banda [Hz]
+    'tau': 5e-6,           # Duración del pulso [s]
+    'v': 100,              # Velocidad de la plataforma [m/s]
+    'PRF': 1000,           # Frecuencia de repetición de pulsos [Hz]
+    'nfft': 1024,          # Puntos para la FFT
+    'x_R_initial': 0,      # Posición inicial del radar [m]
+    'x_f': 500,            # Posición final [m]
+    'y_R': 1000,           # Distancia perpendicular a la trayectoria [m]
+    'CR_swath_M': 150,     # Ancho máximo de la huella [m]
+    'y_m': 800,            # Rango mínimo [m]
+    'y_M': 1200,           # Rango máximo [m]
+    'm': 0.2,              # Pendiente para el cálculo de la huella
+    't_i': 0,              # Tiempo inicial [s]
+    'N0': 0,               # Nivel de ruido
+}
+
+# Blancos de SAR.m: RCS (dBsm), PosX (m), PosY (m)
+TARGETS = np.array([
+    [10, 200, 950],    # Blanco fuerte cerca del centro
+    [5, 300, 1050],    # Blanco medio
+    [0, 150, 1100],    # Blanco débil
+])
+
+
+def make_params(**overrides):
+    """
+    Parámetros de la simulación: DEFAULTS con los cambios pedidos y los derivados
+    (TS_st, TS_ft, t_f) calculados como en SAR.m.
+    """
+    p = {**DEFAULTS, **overrides}
+    p.setdefault('TS_st', 1 / p['PRF'])  # Intervalo de tiempo entre pulsos [s]
+    p.setdefault('TS_ft', 1 / (2 * p['B']))  # Intervalo de tiempo rápido (fast-time) [s]
+    p.setdefault('t_f', 2 * (p['y_M'] + p['CR_swath_M']) / p['c'])  # Tiempo final [s]
+    return p
+
+
+def positions(p):
+    """
+    Posiciones de la plataforma a lo largo de la trayectoria (x(n) de SAR.m): se avanza
+    v*TS_st antes de cada pulso mientras la posición anterior sea menor que x_f.
+    """
+    step = p['v'] * p['TS_st']
+    n_pos = int(np.ceil(round((p['x_f'] - p['x_R_initial']) / step, 9)))
+    return p['x_R_initial'] + step * np.arange(1, n_pos + 1)
+
+
+def ranges_and_mask(x, targets, p):
+    """
+    Distancias plataforma-blanco y huella iluminada para todas las posiciones.
+
+    Args:
+        x: Posiciones de la plataforma (pulsos,).
+        targets: Arreglo (blancos, 3) con RCS (dBsm), PosX y PosY.
+    Returns:
+        tuple: (R, mask) de tamaño (pulsos, blancos).
+    """
+    x_0 = targets[:, 1][np.newaxis, :]
+    y_0 = targets[:, 2][np.newaxis, :]
+    x_R = x[:, np.newaxis]
+    R = np.sqrt((x_0 - x_R) ** 2 + (y_0 - p['y_R']) ** 2)  # Distancia del objetivo
+    mask = ((y_0 > p['y_m']) & (y_0 < p['y_M'])
+            & (x_0 > x_R - p['m'] * y_0) & (x_0 < x_R + p['m'] * y_0))  # Dentro del footprint
+    return R, mask
+
+
+def simulate(targets=TARGETS, p=None, rng=None, x=None):
+    """
+    Matriz de ecos crudos sigma (pulsos x nfft) de SAR.m.
+
+    Cada eco es el chirp desplazado circularmente al retardo 2R/c (con su fase
+    exp(j2π fC 2R/c)): los impulsos de todos los blancos se acumulan en una matriz
+    (pulsos x nfft) y se convolucionan con el chirp con una sola FFT/IFFT por lotes.
+
+    Args:
+        targets: Arreglo (blancos, 3) con RCS (dBsm), PosX y PosY.
+        p (dict): Parámetros (make_params()).
+        rng: Generador de NumPy para el ruido.
+        x: Posiciones a simular (por defecto toda la trayectoria; un subconjunto permite
+            generar la escena por bloques de pulsos).
+    Returns:
+        tuple: (sigma complejo (pulsos, nfft), posiciones x (pulsos,)).
+    """
+    p = p or make_params()
+    targets = np.asarray(targets, dtype=np.float64)
+    nfft = p['nfft']
+    x = positions(p) if x is None else x
+    R, mask = ranges_and_mask(x, targets, p)
+    delay_0 = 2 * R / p['c']  # Retardos (pulsos, blancos)
+    i_echo = np.round((delay_0 - p['t_i']) / p['TS_ft']).astype(np.int64) - 1  # Índice base 0
+    # echo4 descarta los retardos fuera de la ventana y fft(echo, nfft) trunca a nfft muestras
+    valid = mask & (delay_0 < p['t_f'] + 2 * p['tau']) & (i_echo >= 0) & (i_echo < nfft)
+    sigma_0 = 10 ** (targets[:, 0] / 10)
+    weights = sigma_0[np.newaxis, :] * np.exp(1j * 2 * np.pi * p['fC'] * delay_0)
+
+    pulse_idx, target_idx = np.nonzero(valid)
+    impulses = np.zeros((len(x), nfft), dtype=np.complex128)
+    np.add.at(impulses, (pulse_idx, i_echo[pulse_idx, target_idx]), weights[pulse_idx, target_idx])
+
+    S = chirp_spectrum(p['B'], p['tau'], p['TS_ft'], nfft)  # Espectro del chirp (banco en caché)
+    sigma = np.fft.ifft(np.fft.fft(impulses, axis=1) * S, axis=1)
+
+    if p['N0']:
+        rng = rng or np.random.default_rng()
+        sigma += (rng.standard_normal(sigma.shape) + 1j * rng.standard_normal(sigma.shape)) * p['N0']
+    return sigma, x
+
+
+def echo4(R, TS_ft, t_i, t_f, nfft, B, tau, fC, c=3e8):
+    """
+    Port directo de echo4 de SAR.m (un eco por llamada), para verificar simulate().
+    """
+    delay_0 = (2 * R) / c
+    s = chirp(B, tau, TS_ft) * np.exp(1j * 2 * np.pi * fC * delay_0)
+    S = np.fft.fft(s, nfft)
+    t2 = np.arange(t_i, t_f + 2 * tau, TS_ft)
+    echo = np.zeros(len(t2))
+    i_echo = int(round((delay_0 - t_i) / TS_ft))
+    if delay_0 < t_f + 2 * tau:
+        echo[i_echo - 1] = 1
+    S2 = np.fft.fft(echo, nfft)
+    return np.fft.ifft(S * S2)
+
+
+def simulate_loop(targets=TARGETS, p=None):
+    """
+    Simulación con los bucles de SAR.m (referencia lenta, sin ruido).
+    """
+    p = p or make_params()
+    x = positions(p)
+    sigma = np.zeros((len(x), p['nfft']), dtype=np.complex128)
+    for n, x_R in enumerate(x):
+        for rcs, x_0, y_0 in targets:
+            R = np.sqrt((x_0 - x_R) ** 2 + (y_0 - p['y_R']) ** 2)
+            if p['y_m'] < y_0 < p['y_M'] and x_R - p['m'] * y_0 < x_0 < x_R + p['m'] * y_0:
+                sigma[n] += 10 ** (rcs / 10) * echo4(R, p['TS_ft'], p['t_i'], p['t_f'], p['nfft'],
+                                                     p['B'], p['tau'], p['fC'], p['c'])
+    return sigma, x
+
+
+def random_targets(n, p, rng=None):
+    """
+    n blancos aleatorios dentro de la franja de rango y de la trayectoria.
+    """
+    rng = rng or np.random.default_rng(0)
+    return np.column_stack([rng.uniform(-5, 10, n),
+                            rng.uniform(p['x_R_initial'], p['x_f'], n),
+                            rng.uniform(p['y_m'], p['y_M'], n)])
+
+
+def plot_echoes(sigma, x, nfft):
+    """
+    Mapa de ecos (dB) y fase, como la figura 3 de SAR.m.
+    """
+    import matplotlib.pyplot as plt  # Solo para graficar
+    mag_db = 20 * np.log10(np.maximum(np.abs(sigma.T), 1e-12))
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(12, 5))
+    im = ax1.imshow(mag_db, aspect='auto', origin='lower', cmap='gray',
+                    extent=[x[0], x[-1], 1, nfft], vmin=mag_db.max() - 60, vmax=mag_db.max())
+    ax1.set_xlabel('Posición a lo largo de la trayectoria (m)')
+    ax1.set_ylabel('Muestras en rango')
+    ax1.set_title('Mapa de ecos (dB)')
+    fig.colorbar(im, ax=ax1)
+    im = ax2.imshow(np.angle(sigma.T), aspect='auto', origin='lower', cmap='hsv', extent=[x[0], x[-1], 1, nfft])
+    ax2.set_xlabel('Posición a lo largo de la trayectoria (m)')
+    ax2.set_ylabel('Muestras en rango')
+    ax2.set_title('Fase de los ecos (rad)')
+    fig.colorbar(im, ax=ax2)
+    fig.suptitle('Fotograma de la simulación SAR')
+    plt.show()
+
+
+if __name__ == "__main__":
+    # Crear el parser
+    parser = argparse.ArgumentParser(description="Simulador vectorizado de ecos SAR (SAR.m)")
+    parser.add_argument('-blancos', type=int, default=0, help="Blancos aleatorios (0 = los 3 de SAR.m)")
+    parser.add_argument('-xf', type=float, default=DEFAULTS['x_f'], help="Posición final de la trayectoria [m]")
+    parser.add_argument('-N0', type=float, default=DEFAULTS['N0'], help="Nivel de ruido")
+    parser.add_argument('-verificar', action='store_true', help="Compara con el port directo de los bucles de SAR.m")
+    parser.add_argument('-plot', action='store_true', help="Grafica el mapa de ecos")
+    args = parser.parse_args()
+
+    params = make_params(x_f=args.xf, N0=args.N0)
+    targets = random_targets(args.blancos, params) if args.blancos else TARGETS
+    start = time.perf_counter()
+    sigma, x = simulate(targets, params)
+    print(f"{len(x)} pulsos x {len(targets)} blancos -> sigma {sigma.shape} en {time.perf_counter() - start:.2f} s")
+
+    if args.verificar:
+        start = time.perf_counter()
+        reference, _ = simulate_loop(targets, make_params(x_f=args.xf))
+        print(f"Bucles de SAR.m: {time.perf_counter() - start:.2f} s, "
+              f"error máximo {np.max(np.abs(simulate(targets, make_params(x_f=args.xf))[0] - reference)):.2e}")
+    if args.plot:
+        plot_echoes(sigma, x, params['nfft'])
@@ -0,0 +1,93 @@
+# Benchmark de compresión: relación de compresión y costo de CPU de cada códec para los
+# datos típicos de cada view, escritos con el mismo formato que usa el script (save_csv).
+# Uso: python bench_compression.py [-f32] [-dir results]
+import argparse  #para parsear argumentos
+import glob      # Para recorrer un directorio de resultados reales
+import os        #para armar rutas
+import tempfile  # Directorio temporal para los CSV sintéticos
+import time  # Para medir el tiempo de CPU
+
+import numpy as np  # Para operaciones numéricas y manejo de arreglos
+
+import binblock  # Formato de escritura de las capturas
+import dsp  # Para generar el IQ de ejemplo
+from compression import CODECS
+
+
+def synthetic_views(directorio):
+    """
+    Escribe una captura típica de cada view y devuelve {view: ruta}.
+    """
+    rng = np.random.default_rng(0)
+    dtype = binblock.DTYPE
+    paths = {}
+
+    def write(name, columns):
+        paths[name] = os.path.join(directorio, f'{name}_1.csv')
+        binblock.save_csv(paths[name], columns)
+
+    # TimeOverview: tren de pulsos de -20 dBm sobre ruido de -60 dBm, 10 ms
+    n = 96700
+    t = binblock.time_axis(10e-3, n, 1e3)
+    level = np.where((t % 1.0) < 0.01, -20, -60) + rng.normal(0, 1.5, n)
+    write('TimeOverview', {'Time (ms)': t, 'Amplitud (dBm)': level.astype(dtype)})
+    # Pulse_Trace: un pulso de 15 us
+    n = 2040
+    t = binblock.time_axis(15e-6, n, 1e6)
+    level = np.where((t > 2) & (t < 12), -5, -70) + rng.normal(0, 1.0, n)
+    write('PulseTrace', {'Time (ms)': t, 'Amplitud (dBm)': level.astype(dtype)})
+    # Spectrum y DPX: chirp de 20 MHz en un span de 40 MHz
+    for name, n in (('Spectrum', 801), ('DPX', 501)):
+        f = binblock.frequency_axis(1.3e9, 40e6, n)
+        level = np.where(np.abs(f - 1.3e9) < 10e6, -25, -75) + rng.normal(0, 2.0, n)
+        write(name, {'Frecuencia (Hz)': f, 'Amplitud (dBm)': level.astype(dtype)})
+    # PVT, Frequency e IQ a partir de un chirp muestreado a 50 MHz
+    fs, n = 50e6, 4000
+    tt = np.arange(n) / fs
+    iq = np.exp(1j * np.pi * 1e12 * (tt - tt.mean()) ** 2) * 0.1 + rng.normal(0, 1e-3, n)
+    iq = iq.astype(dsp.complex_dtype())
+    views = dsp.derive_views(iq, fs, 1.3e9)
+    write('PVTime', views['PVTime'])
+    write('Frequency', views['Frequency'])
+    write('IQ', {'Time (s)': dsp.sample_times(n, fs), 'I (V)': iq.real, 'Q (V)': iq.imag})
+    return paths
+
+
+def measure(path, codec, repeats=3):
+    """
+    Devuelve (relación de compresión, ms de CPU por MB al comprimir, ms de CPU por MB al leer).
+    """
+    with open(path, 'rb') as capture_file:
+        data = capture_file.read()
+    start = time.process_time()
+    for _ in range(repeats):
+        packed = codec.compress(data)
+    t_compress = (time.process_time() - start) / repeats
+    start = time.process_time()
+    for _ in range(repeats):
+        codec.decompress(packed)
+    t_decompress = (time.process_time() - start) / repeats
+    mb = len(data) / 1e6
+    return len(data) / len(packed), 1e3 * t_compress / mb, 1e3 * t_decompress / mb
+
+
+# Crear el parser
+parser = argparse.ArgumentParser(description="Benchmark de compresión de capturas por view")
+parser.add_argument('-f32', action='store_true', help="Escribe las capturas en modo float32")
+parser.add_argument('-dir', type=str, default="", help="Mide además las capturas reales de un directorio de resultados")
+args = parser.parse_args()
+if args.f32:
+    binblock.set_dtype(np.float32)
+
+with tempfile.TemporaryDirectory() as directorio:
+    paths = synthetic_views(directorio)
+    if args.dir:
+        for path in sorted(glob.glob(os.path.join(args.dir, '*', '*.csv'))):
+            paths[os.path.relpath(path, args.dir)] = path
+    print(f"{'View':<34}{'Tamaño':>10}" + ''.join(f"{name + ' ratio':>14}{'comp ms/MB':>12}{'desc ms/MB':>12}" for name in CODECS))
+    for view, path in paths.items():
+        row = f"{view:<34}{os.path.getsize(path) / 1e3:>8.1f}kB"
+        for codec in CODECS.values():
+            ratio, t_c, t_d = measure(path, codec)
+            row += f"{ratio:>13.2f}x{t_c:>12.1f}{t_d:>12.1f}"
+        print(row)
@@ -0,0 +1,74 @@
+# Benchmark de memoria: campaña simulada de capturas TimeOverview en float64 vs float32.
+# Cada modo corre en un proceso aparte para medir su pico de RSS de forma independiente.
+# Uso: python bench_float32.py [-n 1000] [-puntos 100000] [-csv]
+import argparse  #para parsear argumentos
+import os        #para archivos temporales
+import resource  # Para medir el pico de memoria (ru_maxrss)
+import subprocess  # Para correr cada modo en un proceso separado
+import sys
+import tempfile  # Directorio temporal para los CSV
+import time  # Para medir tiempos
+
+import numpy as np  # Para operaciones numéricas y manejo de arreglos
+
+import binblock  # Decodificación de bloques binarios
+
+
+def fake_block(n_points, seed=0):
+    """
+    Genera una respuesta binaria como la de :FETCh:TOVerview? con n_points muestras float32.
+    """
+    rng = np.random.default_rng(seed)
+    data = (rng.standard_normal(n_points) * 3 - 60).astype('<f4').tobytes()
+    size = str(len(data))
+    return b'#' + str(len(size)).encode() + size.encode() + data
+
+
+def campaign(n_captures, n_points, write_csv):
+    """
+    Simula la campaña: decodifica cada captura, genera su eje temporal y la conserva en
+    memoria (como hace el análisis de la campaña completa). Devuelve el pico de RSS en MB.
+    """
+    raw = fake_block(n_points)
+    captures = []
+    with tempfile.TemporaryDirectory() as directorio:
+        for i in range(n_captures):
+            data = binblock.parse_block(raw)
+            time_points = binblock.time_axis(10e-3, len(data), 1e3)
+            if write_csv:
+                binblock.save_csv(os.path.join(directorio, f'TimeOverview_{i + 1}.csv'),
+                                  {'Time (ms)': time_points, 'Amplitud (dBm)': data})
+            captures.append(data)
+        # Análisis típico sobre la campaña: máximo por captura y promedio de potencia
+        stack = np.stack(captures)
+        peaks = stack.max(axis=1)
+        mean_power = 10 * np.log10(np.mean(10 ** (stack / 10), axis=1))
+        _ = peaks, mean_power
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # Linux: KB -> MB
+
+
+# Crear el parser
+parser = argparse.ArgumentParser(description="Benchmark de memoria float32 vs float64 (TimeOverview)")
+parser.add_argument('-n', type=int, default=1000, help="Número de capturas de la campaña")
+parser.add_argument('-puntos', type=int, default=100000, help="Puntos por captura")
+parser.add_argument('-csv', action='store_true', help="Incluye la escritura de los CSV")
+parser.add_argument('-modo', type=str, default="", help=argparse.SUPPRESS)  # uso interno (proceso hijo)
+args = parser.parse_args()
+
+if args.modo:
+    binblock.set_dtype(np.float32 if args.modo == 'float32' else np.float64)
+    start = time.perf_counter()
+    rss = campaign(args.n, args.puntos, args.csv)
+    print(f"{rss:.1f} {time.perf_counter() - start:.2f}")
+else:
+    print(f"Campaña TimeOverview: {args.n} capturas x {args.puntos} puntos")
+    results = {}
+    for modo in ('float64', 'float32'):
+        cmd = [sys.executable, __file__, '-modo', modo, '-n', str(args.n), '-puntos', str(args.puntos)]
+        if args.csv:
+            cmd.append('-csv')
+        out = subprocess.run(cmd, capture_output=True, text=True, check=True).stdout.split()
+        results[modo] = (float(out[0]), float(out[1]))
+        print(f"\t -{modo}: pico RSS {results[modo][0]:.1f} MB, tiempo {results[modo][1]:.2f} s")
+    reduction = 100 * (1 - results['float32'][0] / results['float64'][0])
+    print(f"Reducción del pico de RSS: {reduction:.1f} %")
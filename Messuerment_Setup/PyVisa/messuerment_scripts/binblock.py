@@ -0,0 +1,153 @@
+# Decodificación de los bloques binarios IEEE 488.2 que devuelve el RSA6114A
+# (#<num_digits><num_bytes><datos>) y tipo de dato usado en todo el camino de datos.
+import numpy as np  # Para operaciones numéricas y manejo de arreglos
+import pandas as pd  # Para guardar y leer archivos CSV
+
+from compression import open_capture  # Lectura transparente de capturas comprimidas
+
+# --- Tipo de dato de las muestras ---
+# El instrumento envía float32 (4 bytes, little endian). Por defecto se mantiene el
+# comportamiento original (float64); con set_dtype(np.float32) las muestras quedan en
+# float32 desde el decodificador hasta el CSV y los módulos de análisis.
+DTYPE = np.float64
+FLOAT_FORMAT = None  # Formato de escritura en CSV (None = formato por defecto de pandas)
+COMPRESSOR = None  # compression.BackgroundCompressor opcional para los CSV guardados
+MONITOR = None  # monitor.Monitor opcional que publica la última traza guardada
+RING = None  # trace_ring.TraceRing opcional que reparte las trazas a otros procesos
+SAVED = 0  # Archivos guardados con save_csv (el runner verifica que cada captura guardó algo)
+
+
+def set_dtype(dtype):
+    """
+    Selecciona el tipo de dato de las muestras para todo el camino de datos.
+
+    Args:
+        dtype: np.float32 o np.float64.
+    """
+    global DTYPE, FLOAT_FORMAT
+    DTYPE = np.dtype(dtype).type
+    # 9 cifras significativas alcanzan para recuperar exactamente un float32
+    FLOAT_FORMAT = '%.9g' if DTYPE == np.float32 else None
+
+
+def set_compressor(compressor):
+    """
+    Activa (o desactiva con None) la compresión en segundo plano de los CSV guardados.
+    """
+    global COMPRESSOR
+    COMPRESSOR = compressor
+
+
+def set_monitor(monitor):
+    """
+    Activa (o desactiva con None) la publicación de las trazas guardadas en el monitoreo.
+    """
+    global MONITOR
+    MONITOR = monitor
+
+
+def set_ring(ring):
+    """
+    Activa (o desactiva con None) la publicación de las trazas en memoria compartida.
+    """
+    global RING
+    RING = ring
+
+
+def decode_floats(data_bytes):
+    """
+    Convierte los bytes de datos (float32 little endian) a un arreglo NumPy de tipo DTYPE.
+
+    Args:
+        data_bytes (bytes): Datos del bloque, sin el encabezado.
+    """
+    # frombuffer no copia; astype genera un arreglo propio y escribible (libera el buffer crudo)
+    return np.frombuffer(data_bytes, dtype='<f4', count=len(data_bytes) // 4).astype(DTYPE)
+
+
+def block_bytes(raw_response):
+    """
+    Extrae los bytes de datos de una respuesta binaria, sin el encabezado ni decodificar.
+
+    Args:
+        raw_response (bytes): Respuesta leída con read_raw().
+    Returns:
+        bytes, o None si la respuesta no es un bloque binario.
+    """
+    if len(raw_response) < 2 or raw_response[0] != ord('#'):  # Verifica que el formato sea correcto (inicia con #)
+        return None
+    num_digits = int(chr(raw_response[1]))  # Número de dígitos que indican la longitud de datos
+    num_bytes = int(raw_response[2:2 + num_digits].decode())  # Longitud de los datos en bytes
+    header_length = 2 + num_digits  # Longitud del encabezado
+    return raw_response[header_length:header_length + num_bytes]
+
+
+def parse_block(raw_response):
+    """
+    Decodifica una respuesta binaria completa del instrumento.
+
+    Args:
+        raw_response (bytes): Respuesta leída con read_raw().
+    Returns:
+        Arreglo NumPy de tipo DTYPE, o None si la respuesta no es un bloque binario.
+    """
+    data_bytes = block_bytes(raw_response)
+    return None if data_bytes is None else decode_floats(data_bytes)
+
+
+def time_axis(stop, n, scale=1.0):
+    """
+    Genera un eje temporal de 0 a stop con n puntos, escalado y del tipo DTYPE.
+
+    Args:
+        stop (float): Tiempo final en segundos.
+        n (int): Número de puntos.
+        scale (float): Factor de escala (1e3 para ms, 1e6 para us).
+    """
+    return np.linspace(0, stop * scale, n, dtype=DTYPE)
+
+
+def frequency_axis(center, span, n):
+    """
+    Genera un eje de frecuencias absolutas en Hz.
+
+    Se mantiene siempre en float64: a 1.3 GHz la resolución de float32 (~128 Hz) no
+    alcanza para separar los puntos de los spans chicos.
+    """
+    return np.linspace(center - span / 2, center + span / 2, n)
+
+
+def save_csv(output_path, columns):
+    """
+    Guarda las columnas en un CSV respetando la precisión de DTYPE.
+
+    Args:
+        output_path (str): Ruta del archivo.
+        columns (dict): Nombre de columna -> arreglo.
+    """
+    global SAVED
+    pd.DataFrame(columns).to_csv(output_path, index=False, float_format=FLOAT_FORMAT)
+    SAVED += 1
+    if MONITOR is not None:
+        MONITOR.publish(output_path, columns)  # Última traza diezmada para el navegador
+    if RING is not None:
+        RING.publish(output_path, columns)  # Misma traza para los procesos consumidores
+    if COMPRESSOR is not None:
+        COMPRESSOR.submit(output_path)  # Se comprime en segundo plano, sin frenar la adquisición
+
+
+def read_capture(path):
+    """
+    Lee un CSV de captura y devuelve sus columnas como arreglos de tipo DTYPE.
+
+    Las columnas en Hz se leen siempre en float64 (ver frequency_axis). Si la captura fue
+    comprimida se descomprime de forma transparente.
+
+    Args:
+        path (str): Ruta del CSV guardado por una view.
+    Returns:
+        dict: Nombre de columna -> arreglo NumPy.
+    """
+    with open_capture(path) as capture_file:
+        df = pd.read_csv(capture_file)
+    return {col: df[col].to_numpy(dtype=np.float64 if '(Hz)' in col else DTYPE) for col in df.columns}
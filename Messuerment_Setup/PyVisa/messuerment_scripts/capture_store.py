@@ -0,0 +1,236 @@
+# Acceso perezoso a todas las capturas de un directorio de resultados.
+# CaptureStore indexa las capturas de cada view (número, vista derivada, instante y forma)
+# leyendo solo los metadatos del sistema de archivos y el encabezado de cada CSV; la forma
+# se guarda en un índice (capture_index.json) para no volver a contar filas en las próximas
+# aperturas. Los datos se cargan recién al usarlos, a través de un caché LRU limitado en
+# bytes, de modo que un notebook o un script por lotes puede recorrer campañas grandes con
+# memoria acotada en lugar de abrir CSV por nombre fijo.
+# Uso: store = CaptureStore('results')
+#      for capture in store.select('PVT'):
+#          phase = capture['Phase (º)']
+import argparse  #para parsear argumentos
+import csv       # Encabezado de cada captura
+import datetime  # Para mostrar los instantes de captura
+import json      # Índice de formas guardado en el directorio
+import os        #para recorrer el directorio de resultados
+import re        # Nombre de archivo -> prefijo, número y vista derivada
+from collections import OrderedDict  # Orden de uso del caché LRU
+
+import numpy as np  # Para operaciones numéricas y manejo de arreglos
+import pandas as pd  # Resumen del índice
+
+import binblock  # Lectura de capturas (DTYPE, descompresión transparente)
+from compression import CODECS, open_capture  # Extensiones de códec y lectura comprimida
+
+CACHE_BYTES = 256 * 1024 * 1024  # Memoria máxima de capturas cargadas
+INDEX_NAME = "capture_index.json"
+# '<Prefijo>_<n>.csv' o '<Prefijo>_<n>_<Vista>.csv', con o sin extensión de compresión
+CAPTURE_NAME = re.compile(r'^(?P<prefix>[A-Za-z]+)_(?P<number>\d+)(?:_(?P<kind>\w+))?\.csv(?P<suffix>\.\w+)?$')
+
+
+class Capture:
+    """
+    Referencia perezosa a una captura: los metadatos están siempre disponibles y los datos
+    se leen (a través del caché del store) al acceder a una columna o con load().
+    """
+
+    def __init__(self, store, view, number, kind, path, timestamp, columns, rows):
+        self.store = store
+        self.view = view  # Subdirectorio de la view
+        self.number = number
+        self.kind = kind  # Vista derivada ('' para la captura original)
+        self.path = path  # Ruta sin extensión de compresión
+        self.timestamp = timestamp
+        self.columns = columns
+        self.rows = rows
+
+    @property
+    def shape(self):
+        return (self.rows, len(self.columns))
+
+    @property
+    def nbytes(self):
+        """
+        Memoria estimada una vez cargada (columnas en Hz en float64, el resto en DTYPE).
+        """
+        return sum(self.rows * (8 if '(Hz)' in c else np.dtype(binblock.DTYPE).itemsize) for c in self.columns)
+
+    def load(self):
+        """
+        Columnas de la captura (desde el caché o leídas del disco).
+
+        Returns:
+            dict: Nombre de columna -> arreglo NumPy.
+        """
+        return self.store._load(self)
+
+    def __getitem__(self, column):
+        return self.load()[column]
+
+    def __repr__(self):
+        kind = f", {self.kind}" if self.kind else ""
+        return f"Capture({self.view} #{self.number}{kind}, {self.rows}x{len(self.columns)})"
+
+
+class CaptureStore:
+    """
+    Índice de las capturas de un directorio de resultados con caché LRU de datos.
+
+    Args:
+        directorio (str): Directorio de resultados (un subdirectorio por view).
+        cache_bytes (int): Bytes máximos de capturas cargadas en memoria.
+    """
+
+    def __init__(self, directorio, cache_bytes=CACHE_BYTES):
+        self.directorio = directorio
+        self.cache_bytes = cache_bytes
+        self.cache = OrderedDict()  # ruta -> (columnas, bytes), de la menos a la más usada
+        self.cached_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.captures = []
+        self.refresh()
+
+    def refresh(self):
+        """
+        Vuelve a indexar el directorio (capturas nuevas de una campaña en curso).
+        """
+        index_path = os.path.join(self.directorio, INDEX_NAME)
+        try:
+            with open(index_path) as index_file:
+                index = json.load(index_file)
+        except (OSError, ValueError):
+            index = {}  # Índice ausente o corrupto: se reconstruye
+        suffixes = {codec.suffix for codec in CODECS.values()}
+        captures, new_index, seen = [], {}, set()
+        for view in sorted(os.listdir(self.directorio)):
+            view_dir = os.path.join(self.directorio, view)
+            if not os.path.isdir(view_dir):
+                continue
+            for entry in os.scandir(view_dir):
+                match = CAPTURE_NAME.match(entry.name)
+                if match is None or (match['suffix'] and match['suffix'] not in suffixes):
+                    continue
+                stat = entry.stat()
+                key = os.path.join(view, entry.name)
+                cached = index.get(key)
+                if cached is None or cached['size'] != stat.st_size or cached['mtime'] != stat.st_mtime:
+                    cached = {'size': stat.st_size, 'mtime': stat.st_mtime, **read_shape(entry.path)}
+                new_index[key] = cached
+                path = entry.path[:len(entry.path) - len(match['suffix'] or '')]
+                if path in seen:
+                    continue  # Captura comprimiéndose: existen el CSV y su versión comprimida
+                seen.add(path)
+                captures.append(Capture(self, view, int(match['number']), match['kind'] or '', path,
+                                        stat.st_mtime, cached['columns'], cached['rows']))
+        captures.sort(key=lambda c: (c.view, c.kind, c.number))
+        self.captures = captures
+        if new_index != index:
+            try:
+                with open(index_path, 'w') as index_file:
+                    json.dump(new_index, index_file)
+            except OSError:
+                pass  # Directorio de solo lectura: el índice se recalcula la próxima vez
+
+    def views(self):
+        """
+        Views presentes en el directorio.
+        """
+        return sorted({c.view for c in self.captures})
+
+    def select(self, view=None, kind='', numbers=None, since=None, until=None):
+        """
+        Capturas que cumplen los filtros, ordenadas por view, vista derivada y número.
+
+        Args:
+            view (str): Subdirectorio de la view (None = todas).
+            kind (str): Vista derivada ('' = capturas originales, None = todas).
+            numbers: Números de captura (iterable o range).
+            since, until (datetime o float): Rango de instantes de captura.
+        """
+        since = since.timestamp() if isinstance(since, datetime.datetime) else since
+        until = until.timestamp() if isinstance(until, datetime.datetime) else until
+        numbers = None if numbers is None else set(numbers)
+        return [c for c in self.captures
+                if (view is None or c.view == view) and (kind is None or c.kind == kind)
+                and (numbers is None or c.number in numbers)
+                and (since is None or c.timestamp >= since) and (until is None or c.timestamp <= until)]
+
+    def get(self, view, number, kind=''):
+        """
+        Captura puntual (KeyError si no existe).
+        """
+        for capture in self.captures:
+            if capture.view == view and capture.number == number and capture.kind == kind:
+                return capture
+        raise KeyError(f"{view} #{number} {kind}".strip())
+
+    def __iter__(self):
+        return iter(self.captures)
+
+    def __len__(self):
+        return len(self.captures)
+
+    def summary(self):
+        """
+        Índice como DataFrame (una fila por captura, sin cargar datos).
+        """
+        return pd.DataFrame([{'view': c.view, 'number': c.number, 'kind': c.kind, 'rows': c.rows,
+                              'columns': len(c.columns), 'timestamp': datetime.datetime.fromtimestamp(c.timestamp),
+                              'path': c.path} for c in self.captures])
+
+    def _load(self, capture):
+        if capture.path in self.cache:
+            self.hits += 1
+            self.cache.move_to_end(capture.path)
+            return self.cache[capture.path][0]
+        self.misses += 1
+        columns = binblock.read_capture(capture.path)
+        nbytes = sum(a.nbytes for a in columns.values())
+        if nbytes <= self.cache_bytes:
+            self.cache[capture.path] = (columns, nbytes)
+            self.cached_bytes += nbytes
+            while self.cached_bytes > self.cache_bytes:
+                _, (_, evicted) = self.cache.popitem(last=False)  # La menos usada
+                self.cached_bytes -= evicted
+        return columns
+
+    def cache_info(self):
+        return {'hits': self.hits, 'misses': self.misses, 'entries': len(self.cache),
+                'bytes': self.cached_bytes, 'max_bytes': self.cache_bytes}
+
+    def clear_cache(self):
+        self.cache.clear()
+        self.cached_bytes = 0
+
+
+def read_shape(path):
+    """
+    Columnas y filas de un CSV leyendo el encabezado y contando saltos de línea (sin
+    convertir los datos).
+    """
+    with open_capture(path) as capture_file:
+        columns = next(csv.reader([capture_file.readline()]), [])
+        rows = sum(chunk.count('\n') for chunk in iter(lambda: capture_file.read(1 << 20), ''))
+    return {'columns': columns, 'rows': rows}
+
+
+if __name__ == "__main__":
+    # Crear el parser
+    parser = argparse.ArgumentParser(description="Índice de las capturas de un directorio de resultados")
+    parser.add_argument('-dir', type=str, default="results", help="Directorio de resultados")
+    parser.add_argument('-view', type=str, default=None, help="Filtra por view Ejemplo: -view PVT")
+    parser.add_argument('-kind', type=str, default=None, help="Vista derivada ('' = capturas originales)")
+    args = parser.parse_args()
+
+    store = CaptureStore(args.dir)
+    table = store.summary()
+    if len(table):
+        if args.view is not None:
+            table = table[table['view'] == args.view]
+        if args.kind is not None:
+            table = table[table['kind'] == args.kind]
+        groups = table.groupby(['view', 'kind']).agg(capturas=('number', 'size'), filas=('rows', 'sum'),
+                                                      desde=('timestamp', 'min'), hasta=('timestamp', 'max'))
+        print(groups.to_string())
+    print(f"{len(table)} capturas en '{args.dir}'")
@@ -0,0 +1,242 @@
+# Ajuste por mínimos cuadrados de la linealidad del chirp sobre capturas de Frequency vs
+# Time (rampa lineal de frecuencia) y Phase vs Time (fase cuadrática).
+# La tasa del chirp se estimaba como ancho de banda (bordes a -10 dB del espectro) sobre
+# duración (ancho del Pulse Trace). Acá se ajusta la curva completa de cada captura y se
+# obtienen la tasa, la frecuencia inicial, la no linealidad residual y el error RMS de fase.
+# Todas las capturas de un mismo eje temporal se apilan en un arreglo 2-D (capturas x
+# puntos) y se resuelven juntas: las ecuaciones normales de cada captura salen de productos
+# matriciales con los momentos del eje temporal (pesos por captura para descartar NaN y
+# muestras fuera de la ventana) y se resuelven en una sola llamada a np.linalg.solve.
+# Uso: python chirp_fit.py -dir results -ventana 2 4.5
+#      python chirp_fit.py -dir results -view Multi -salida chirp_fit.csv
+import argparse  #para parsear argumentos
+
+import numpy as np  # Para operaciones numéricas y manejo de arreglos
+import pandas as pd  # Tabla de resultados
+
+from capture_store import CaptureStore  # Capturas del directorio de resultados
+
+FREQUENCY_COLUMN = 'frecuency (Hz)'
+PHASE_COLUMN = 'Phase (º)'
+# Columna de tiempo -> segundos. frequency() y Multi guardan el eje de FVTime en ms aunque
+# la columna se llame 'time (s)' (time_axis(10e-3, n, 1e3)).
+TIME_COLUMNS = {'time (s)': 1e-3, 'Time (ms)': 1e-3}
+
+
+def _time_column(columns):
+    return next(c for c in columns if c in TIME_COLUMNS)
+
+
+def _weights(t, values, window=None):
+    """
+    Pesos 0/1 por muestra (valores finitos dentro de la ventana) y valores con ceros en
+    las muestras descartadas.
+    """
+    weights = np.isfinite(values)
+    if window is not None:
+        weights &= ((t >= window[0]) & (t <= window[1]))[None, :]
+    return weights.astype(np.float64), np.where(weights, values, 0.0)
+
+
+def polyfit_batch(t, values, degree, weights):
+    """
+    Ajuste polinomial ponderado de todas las filas de values sobre un eje común t.
+
+    El eje se normaliza a [-1, 1] (ecuaciones normales bien condicionadas) y las matrices
+    de cada fila se arman con los momentos sum(w u^k) = weights @ u^k.
+
+    Args:
+        t (array): Eje común (n_puntos).
+        values (array): Datos (n_capturas x n_puntos), ceros donde el peso es 0.
+        degree (int): Grado del polinomio.
+        weights (array): Pesos (n_capturas x n_puntos).
+    Returns:
+        tuple: (coeficientes en t de menor a mayor grado (n_capturas x degree+1), residuos
+        (n_capturas x n_puntos)).
+    """
+    center, half = (t[0] + t[-1]) / 2, (t[-1] - t[0]) / 2
+    u = (t - center) / half
+    powers = u[:, None] ** np.arange(2 * degree + 1)  # n_puntos x (2 grado + 1)
+    moments = weights @ powers  # n_capturas x (2 grado + 1)
+    k = np.arange(degree + 1)
+    normal = moments[:, k[:, None] + k[None, :]]  # Matriz de Hankel de cada captura
+    rhs = (weights * values) @ powers[:, :degree + 1]
+    # Capturas sin muestras suficientes: sistema identidad (coeficientes 0, se marcan NaN)
+    singular = (weights > 0).sum(axis=1) <= degree
+    normal[singular] = np.eye(degree + 1)
+    coeffs_u = np.linalg.solve(normal, rhs[:, :, None])[:, :, 0]
+    coeffs_u[singular] = np.nan
+    residuals = (values - coeffs_u @ powers[:, :degree + 1].T) * weights
+    # Coeficientes en u -> coeficientes en t (u = (t - center) / half)
+    coeffs = np.zeros_like(coeffs_u)
+    for j in range(degree + 1):
+        for i in range(j, degree + 1):
+            binom = float(np.prod(range(i - j + 1, i + 1)) / np.prod(range(1, j + 1)))
+            coeffs[:, j] += coeffs_u[:, i] * binom * (-center) ** (i - j) / half ** i
+    return coeffs, residuals
+
+
+def _span(t, weights):
+    """
+    Primer y último instante con peso de cada captura.
+    """
+    valid = weights > 0
+    first = t[np.argmax(valid, axis=1)]
+    last = t[len(t) - 1 - np.argmax(valid[:, ::-1], axis=1)]
+    return first, last
+
+
+def _rms(residuals, weights):
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.sqrt((residuals ** 2).sum(axis=1) / weights.sum(axis=1))
+
+
+def fit_frequency(t, frequency, window=None):
+    """
+    Rampa lineal f(t) = f0 + k t sobre capturas de Frequency vs Time.
+
+    Args:
+        t (array): Eje temporal común en segundos.
+        frequency (array): Frecuencia en Hz (n_capturas x n_puntos).
+        window (tuple): (inicio, fin) en segundos del tramo a ajustar (el pulso).
+    Returns:
+        dict: Arreglos por captura: 'chirp_rate' (Hz/s), 'start_frequency' (Hz, en el
+        primer instante ajustado), 'bandwidth' (Hz), 'nonlinearity' (máximo residuo sobre
+        el ancho de banda) y 'rms_frequency_error' (Hz).
+    """
+    weights, frequency = _weights(t, np.atleast_2d(np.asarray(frequency, dtype=np.float64)), window)
+    coeffs, residuals = polyfit_batch(t, frequency, 1, weights)
+    first, last = _span(t, weights)
+    bandwidth = np.abs(coeffs[:, 1]) * (last - first)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        nonlinearity = np.abs(residuals).max(axis=1) / bandwidth
+    return {'chirp_rate': coeffs[:, 1], 'start_frequency': coeffs[:, 0] + coeffs[:, 1] * first,
+            'bandwidth': bandwidth, 'nonlinearity': nonlinearity,
+            'rms_frequency_error': _rms(residuals, weights)}
+
+
+def _fill_forward(values, valid):
+    """
+    Cada posición toma el último valor válido en o antes de ella (NaN si no hay ninguno).
+    """
+    index = np.where(valid, np.arange(values.shape[1]), -1)
+    np.maximum.accumulate(index, axis=1, out=index)
+    filled = np.take_along_axis(values, np.maximum(index, 0), axis=1)
+    return np.where(index >= 0, filled, np.nan)
+
+
+def unwrap_phase(phase_deg, weights):
+    """
+    Fase continua en radianes sobre las muestras con peso.
+
+    Entre muestras válidas contiguas se desenvuelve como np.unwrap. A través de un hueco
+    (muestras descartadas) la fase puede avanzar más de media vuelta, así que el salto se
+    elige con la pendiente: la frecuencia instantánea antes y después del hueco (de
+    enlaces contiguos) predice el avance y se agregan las vueltas que faltan.
+    """
+    valid = weights > 0
+    phase = np.deg2rad(np.where(valid, phase_deg, 0.0))
+    n = phase.shape[1]
+    # Muestra válida anterior de cada muestra válida (-1 = ninguna)
+    last = np.where(valid, np.arange(n), -1)
+    np.maximum.accumulate(last, axis=1, out=last)
+    prev = np.concatenate((np.full((len(phase), 1), -1), last[:, :-1]), axis=1)
+    link = valid & (prev >= 0)
+    gap = np.where(link, np.arange(n) - prev, 1)
+    step = np.take_along_axis(phase, np.maximum(prev, 0), axis=1)
+    wrapped = np.where(link, (phase - step + np.pi) % (2 * np.pi) - np.pi, 0.0)
+    # Frecuencia (rad por muestra) de los enlaces contiguos, extendida hacia ambos lados
+    contiguous = link & (gap == 1)
+    before = _fill_forward(wrapped, contiguous)
+    after = _fill_forward(wrapped[:, ::-1], contiguous[:, ::-1])[:, ::-1]
+    before = np.take_along_axis(before, np.maximum(prev, 0), axis=1)  # Último antes del hueco
+    sides = np.stack((before, after))
+    slope = np.nansum(sides, axis=0) / np.maximum(np.isfinite(sides).sum(axis=0), 1)
+    expected = slope * gap
+    turns = np.where(link & (gap > 1), np.round((expected - wrapped) / (2 * np.pi)), 0.0)
+    increment = wrapped + 2 * np.pi * turns
+    first = np.take_along_axis(phase, np.argmax(valid, axis=1)[:, None], axis=1)
+    return first + np.cumsum(increment, axis=1)
+
+
+def fit_phase(t, phase, window=None):
+    """
+    Fase cuadrática phi(t) = a + 2 pi f0 t + pi k t^2 sobre capturas de Phase vs Time.
+
+    Args:
+        t (array): Eje temporal común en segundos.
+        phase (array): Fase en grados (n_capturas x n_puntos), con o sin saltos de 360º.
+        window (tuple): (inicio, fin) en segundos del tramo a ajustar.
+    Returns:
+        dict: Arreglos por captura: 'chirp_rate' (Hz/s), 'start_frequency' (Hz, respecto
+        de la frecuencia central del análisis), 'bandwidth' (Hz) y 'rms_phase_error' (grados).
+    """
+    weights, phase = _weights(t, np.atleast_2d(np.asarray(phase, dtype=np.float64)), window)
+    phase = unwrap_phase(phase, weights) * weights
+    coeffs, residuals = polyfit_batch(t, phase, 2, weights)
+    first, last = _span(t, weights)
+    rate = coeffs[:, 2] / np.pi
+    return {'chirp_rate': rate, 'start_frequency': (coeffs[:, 1] + 2 * coeffs[:, 2] * first) / (2 * np.pi),
+            'bandwidth': np.abs(rate) * (last - first),
+            'rms_phase_error': np.rad2deg(_rms(residuals, weights))}
+
+
+def fit_captures(store, view=None, window=None):
+    """
+    Ajusta todas las capturas de Frequency vs Time y Phase vs Time de un CaptureStore
+    (una resolución por eje temporal).
+
+    Args:
+        store (CaptureStore): Capturas del directorio de resultados.
+        view (str): Subdirectorio de la view (None = todas).
+        window (tuple): (inicio, fin) en segundos del tramo a ajustar.
+    Returns:
+        DataFrame: Una fila por captura.
+    """
+    groups = {}  # (tipo, eje temporal) -> capturas
+    for capture in store.select(view, kind=None):
+        if FREQUENCY_COLUMN in capture.columns:
+            kind, column = 'frequency', FREQUENCY_COLUMN
+        elif PHASE_COLUMN in capture.columns:
+            kind, column = 'phase', PHASE_COLUMN
+        else:
+            continue
+        time_column = _time_column(capture.columns)
+        t = capture[time_column].astype(np.float64) * TIME_COLUMNS[time_column]
+        groups.setdefault((kind, len(t), t[0], t[-1]), []).append((capture, t, capture[column]))
+    rows = []
+    for (kind, *_), members in groups.items():
+        t = members[0][1]
+        values = np.vstack([m[2] for m in members])
+        result = (fit_frequency if kind == 'frequency' else fit_phase)(t, values, window)
+        for i, (capture, _, _) in enumerate(members):
+            row = {'view': capture.view, 'number': capture.number, 'kind': capture.kind, 'fit': kind,
+                   'chirp_rate_mhz_per_us': result['chirp_rate'][i] * 1e-12,
+                   'start_freq_mhz': result['start_frequency'][i] * 1e-6,
+                   'bandwidth_mhz': result['bandwidth'][i] * 1e-6}
+            if kind == 'frequency':
+                row['nonlinearity_pct'] = result['nonlinearity'][i] * 100
+                row['rms_freq_error_khz'] = result['rms_frequency_error'][i] * 1e-3
+            else:
+                row['rms_phase_error_deg'] = result['rms_phase_error'][i]
+            rows.append(row)
+    return pd.DataFrame(rows)
+
+
+if __name__ == "__main__":
+    # Crear el parser
+    parser = argparse.ArgumentParser(description="Ajuste de linealidad del chirp (Frequency vs Time y Phase vs Time)")
+    parser.add_argument('-dir', type=str, default="results", help="Directorio de resultados")
+    parser.add_argument('-view', type=str, default=None, help="Filtra por view Ejemplo: -view Multi")
+    parser.add_argument('-ventana', type=float, nargs=2, default=None, help="Tramo a ajustar en ms Ejemplo: -ventana 2 4.5")
+    parser.add_argument('-salida', type=str, default="", help="Guarda la tabla en un CSV")
+    args = parser.parse_args()
+
+    window = None if args.ventana is None else (args.ventana[0] * 1e-3, args.ventana[1] * 1e-3)
+    table = fit_captures(CaptureStore(args.dir), args.view, window)
+    if len(table):
+        print(table.to_string(index=False))
+        if args.salida:
+            table.to_csv(args.salida, index=False)
+            print(f"Tabla guardada en '{args.salida}'.")
+    print(f"{len(table)} capturas ajustadas en '{args.dir}'")
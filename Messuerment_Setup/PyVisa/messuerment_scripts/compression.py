@@ -0,0 +1,171 @@
+# Compresión en segundo plano de las capturas guardadas.
+# Cada CSV se comprime en un hilo aparte (la adquisición nunca espera) y se reemplaza por
+# su versión comprimida. La lectura descomprime de forma transparente según la extensión.
+import gzip      # Contenedor .gz (deflate de zlib)
+import io        # Buffers en memoria para la lectura
+import lzma      # Contenedor .xz (LZMA)
+import os        #para reemplazar archivos
+import queue     # Cola de trabajos del hilo compresor
+import threading  # Hilo de compresión
+
+
+class Codec:
+    """
+    Interfaz de un códec de compresión. Para agregar uno nuevo se implementan compress() y
+    decompress() y se registra con register_codec().
+    """
+    name = "none"
+    suffix = ""
+
+    def compress(self, data):
+        return data
+
+    def decompress(self, data):
+        return data
+
+
+class ZlibCodec(Codec):
+    """
+    Deflate (zlib) en contenedor gzip: pandas y cualquier herramienta leen los .csv.gz.
+    """
+    name = "zlib"
+    suffix = ".gz"
+
+    def __init__(self, level=6):
+        self.level = level
+
+    def compress(self, data):
+        return gzip.compress(data, compresslevel=self.level, mtime=0)
+
+    def decompress(self, data):
+        return gzip.decompress(data)
+
+
+class LzmaCodec(Codec):
+    """
+    LZMA en contenedor xz: más lento, mejor relación de compresión.
+    """
+    name = "lzma"
+    suffix = ".xz"
+
+    def __init__(self, preset=6):
+        self.preset = preset
+
+    def compress(self, data):
+        return lzma.compress(data, preset=self.preset)
+
+    def decompress(self, data):
+        return lzma.decompress(data)
+
+
+CODECS = {}  # nombre -> códec
+
+
+def register_codec(codec):
+    """
+    Registra un códec para compresión (por nombre) y lectura (por extensión).
+    """
+    CODECS[codec.name] = codec
+
+
+for _codec in (ZlibCodec(), LzmaCodec()):
+    register_codec(_codec)
+
+
+def find_capture(path):
+    """
+    Devuelve la ruta existente de una captura (sin comprimir o con alguna extensión de
+    códec), o None si no existe.
+    """
+    if os.path.exists(path):
+        return path
+    for codec in CODECS.values():
+        if os.path.exists(path + codec.suffix):
+            return path + codec.suffix
+    return None
+
+
+def capture_exists(path):
+    """
+    True si la captura existe, comprimida o no (para numerar los archivos nuevos).
+    """
+    return find_capture(path) is not None
+
+
+def open_capture(path):
+    """
+    Abre una captura para lectura en modo texto, descomprimiéndola si hace falta.
+
+    Args:
+        path (str): Ruta de la captura sin extensión de códec (o con ella).
+    """
+    found = find_capture(path)
+    if found is None:
+        raise FileNotFoundError(path)
+    for codec in CODECS.values():
+        if codec.suffix and found.endswith(codec.suffix):
+            with open(found, 'rb') as compressed:
+                return io.StringIO(codec.decompress(compressed.read()).decode('utf-8'))
+    return open(found, 'r', encoding='utf-8')
+
+
+def compress_file(path, codec):
+    """
+    Comprime un archivo y lo reemplaza por '<path><suffix>' (escritura atómica).
+
+    Returns:
+        tuple: (bytes originales, bytes comprimidos).
+    """
+    with open(path, 'rb') as original:
+        data = original.read()
+    packed = codec.compress(data)
+    tmp_path = path + codec.suffix + '.tmp'
+    with open(tmp_path, 'wb') as compressed:
+        compressed.write(packed)
+    os.replace(tmp_path, path + codec.suffix)
+    os.remove(path)
+    return len(data), len(packed)
+
+
+class BackgroundCompressor:
+    """
+    Hilo que comprime los archivos que se le envían con submit().
+    """
+
+    def __init__(self, codec_name="zlib"):
+        self.codec = CODECS[codec_name]
+        self.jobs = queue.Queue()
+        self.raw_bytes = 0
+        self.packed_bytes = 0
+        self.thread = threading.Thread(target=self._worker, daemon=True)
+        self.thread.start()
+
+    def submit(self, path):
+        """
+        Encola un archivo para comprimir (no bloquea).
+        """
+        self.jobs.put(path)
+
+    def _worker(self):
+        while True:
+            path = self.jobs.get()
+            try:
+                if path is None:
+                    return
+                raw, packed = compress_file(path, self.codec)
+                self.raw_bytes += raw
+                self.packed_bytes += packed
+            except Exception as e:
+                print(f"Error comprimiendo '{path}': {e}")
+            finally:
+                self.jobs.task_done()
+
+    def close(self):
+        """
+        Espera a que se compriman los archivos pendientes y detiene el hilo.
+        """
+        self.jobs.put(None)
+        self.thread.join()
+        if self.raw_bytes:
+            print(f"Compresión {self.codec.name}: {self.raw_bytes / 1e6:.1f} MB -> "
+                  f"{self.packed_bytes / 1e6:.1f} MB ({self.raw_bytes / self.packed_bytes:.1f}x)")
@@ -2,17 +2,27 @@ import pyvisa  # Para comunicación con instrumentos vía VISA
 import time  # Para agregar retrasos entre comandos
 #import sys
 import pandas as pd  # Para guardar datos en archivos CSV
-import struct  # Para desempaquetar datos binarios recibidos del instrumento
 import numpy as np  # Para operaciones numéricas y manejo de arreglos
 import matplotlib.pyplot as plt
 import argparse  #para parsear argumentos
 import datetime  # Para obtener la fecha y hora actual
 import os        #para crear directorios
+from binblock import parse_block, time_axis, frequency_axis, save_csv  # Decodificación y guardado de muestras
+import dsp  # Procesamiento de IQ en el host
+from scpi_queue import QueryQueue  # Consultas agrupadas en un solo mensaje
+from latency import timed_query, timed_fetch, opc_class  # Timeouts adaptativos por operación
+from compression import capture_exists  # Numeración de capturas (comprimidas o no)
+from trace_accumulator import TraceAccumulator, ACCUMULATORS, TOL_DB  # Promediado en el host
+import transfer  # Puntos de traza negociados por view
 
 # --- Configuración inicial de la conexión al instrumento ---
 rm = pyvisa.ResourceManager()  # Crea un administrador de recursos para manejar conexiones VISA
 instrument = None  # Variable para almacenar la conexión al instrumento (inicialmente None)
 
+# --- Códigos de retorno de instrument_config ---
+CONFIG_ERROR = 1  # Archivo inválido o comando fallido
+POINTS_ERROR = 2  # El instrumento no aceptó la cantidad de puntos de traza negociada
+
 
 #Función para guardar los logs en un archivo
 def logger(message):
@@ -23,7 +33,7 @@ def logger(message):
         log_file.write(f"[{timestamp}] {message}\n")
         
 # Comando para el instrumento
-def send_command(instr, command, wait_opc=True, delay=0.1):
+def send_command(instr, command, wait_opc=True, delay=0.1, context=None):
     """
     Envía un comando al instrumento y espera su finalización si wait_opc es True.
     Args:
@@ -31,13 +41,14 @@ def send_command(instr, command, wait_opc=True, delay=0.1):
         command (str): Comando SCPI a enviar.
         wait_opc (bool): Si True, espera confirmación de finalización con *OPC?.
         delay (float): Retraso en segundos después de enviar el comando.
+        context (str): CSV de configuración (separa los tiempos de disparo y espera por view).
     """
     print(f"Enviando: {command}")  # Muestra el comando que se está enviando
     logger(f"Enviando: {command}") 
     instr.write(command)  # Envía el comando al instrumento
     time.sleep(delay)  # Espera un pequeño retraso para que el instrumento procese el comando
     if wait_opc:
-        opc_response = instr.query('*OPC?')  # Consulta si el comando ha finalizado
+        opc_response = timed_query(instr, '*OPC?', op=opc_class(command, context))  # Consulta si el comando ha finalizado
         if opc_response.strip() == '1':
             print(f"Comando '{command}' completado.")
         else:
@@ -46,6 +57,42 @@ def send_command(instr, command, wait_opc=True, delay=0.1):
         print(f"Comando '{command}' enviado sin esperar confirmación.")
 
 
+def negotiate_points(instrument, measurements):
+    """
+    Fija y verifica la cantidad de puntos de traza de cada medición según la resolución
+    pedida por la view en curso (transfer.set_resolution).
+
+    Args:
+        instrument: Objeto de conexión al instrumento.
+        measurements (list): Mediciones abiertas por la view ('PHVTime', 'SPECtrum'...).
+    Returns:
+        int: 0 si todas quedaron configuradas, 1 si el instrumento no aceptó algún valor.
+    """
+    for measurement in measurements:
+        points = transfer.requested(measurement)
+        if points is None:
+            transfer.expect(measurement, None)  # Cantidad por defecto del instrumento
+            continue
+        command, value, expected = transfer.points_setting(measurement, points)
+        send_command(instrument, f"{command} {value}")
+        response = timed_query(instrument, f"{command}?").strip()
+        if not transfer.same_value(response, value):
+            print(f"Error: {command} quedó en {response} (se pidió {value})")
+            return 1
+        print(f"Puntos de traza de {measurement}: {value}")
+        transfer.expect(measurement, expected)
+    return 0
+
+
+def config_error(name, status):
+    """
+    Retorno de una view cuya configuración falló (status: código de instrument_config).
+    """
+    if status == POINTS_ERROR:
+        return f"Error en {name}: no se pudo fijar la cantidad de puntos"
+    return f"Error en {name}: configuración fallida"
+
+
 def ploter(archivo):
 
     # Leer la primera línea como título (correctamente, sin confundirla con encabezado)
@@ -70,13 +117,20 @@ def ploter(archivo):
     plt.show()  
 
 
-def instrument_config(instrument, csv_file):
+def instrument_config(instrument, csv_file, solo_captura=False, solo_configuracion=False):
     """
     Configura el instrumento según los comandos y parámetros definidos en un archivo CSV.
 
     Args:
         instrument: Objeto de conexión al instrumento.
         csv_file (str): Ruta al archivo CSV que contiene la configuración.
+        solo_captura (bool): Si True, omite la configuración de la vista y ejecuta solo los
+            :CLEar:RESults y las filas desde el primer :INITiate:IMMediate (la vista ya está
+            configurada).
+        solo_configuracion (bool): Si True, ejecuta solo las filas previas al primer
+            :INITiate:IMMediate (configura la vista sin disparar la adquisición).
+    Returns:
+        int: 0 si la configuración se completó, CONFIG_ERROR o POINTS_ERROR si no.
     """
     try:
         df = pd.read_csv(csv_file, encoding='utf-8-sig')  # Lectura robusta con manejo de BOM
@@ -86,7 +140,21 @@ def instrument_config(instrument, csv_file):
         if not all(col in df.columns for col in columnas_requeridas):
             print(f"Error: Faltan columnas en el CSV. Se esperaban: {columnas_requeridas}")
             print(f"Columnas encontradas: {list(df.columns)}")
-            return 1
+            return CONFIG_ERROR
+
+        init_rows = df.index[df['Comando'].astype(str).str.strip() == ':INITiate:IMMediate']
+        # Mediciones que abre la vista (para negociar sus puntos de traza antes del disparo)
+        measurements = [m for m in (transfer.measurement_of(str(c)) for c in df['Comando'].dropna()) if m]
+        negotiated = solo_captura  # En solo captura los puntos ya se negociaron al configurar
+        if solo_captura and len(init_rows) > 0:
+            # Descarta las filas de configuración previas al disparo salvo los CLEar:RESults:
+            # sin ellos los promedios del instrumento (:TRACe3:DPSA:AVERage:COUNt) no se
+            # reinician entre capturas
+            setup = df.loc[:init_rows[0] - 1]
+            clear = setup[(setup['Tipo'] == 'Comando') & setup['Comando'].astype(str).str.upper().str.contains(':CLEAR:RESULTS')]
+            df = pd.concat([clear, df.loc[init_rows[0]:]])
+        elif solo_configuracion and len(init_rows) > 0:
+            df = df.loc[:init_rows[0] - 1]  # Descarta el disparo y la espera de la adquisición
 
         # Iterar por cada fila como diccionario
         for _, row in df.iterrows():
@@ -111,13 +179,18 @@ def instrument_config(instrument, csv_file):
                 if tipo == 'Print':
                     print(descripcion)
                 elif tipo == 'Comando':
+                    if not negotiated and str(comando).strip() == ':INITiate:IMMediate':
+                        if negotiate_points(instrument, measurements) != 0:
+                            return POINTS_ERROR  # No se dispara con una resolución distinta a la pedida
+                        negotiated = True
                     comando_completo = f"{comando} {parametro}" if pd.notna(parametro) else comando
-                    send_command(instrument, comando_completo)
+                    send_command(instrument, comando_completo, context=os.path.basename(csv_file))
                 elif tipo == 'VerificarError':
-                    error_status = instrument.query(comando).strip()
+                    # :SYSTem:ERRor? saca el error de la cola: reintentarlo lo descartaría
+                    error_status = timed_query(instrument, comando, idempotent=False).strip()
                     print(f"Estado de error ({descripcion}): {error_status}")
                 elif tipo == 'VerificarOPC':
-                    opc_response = instrument.query(comando).strip()
+                    opc_response = timed_query(instrument, comando).strip()
                     print(f"Estado OPC ({descripcion}): {opc_response}")
                 elif tipo == 'Espera':
                     continue
@@ -133,93 +206,87 @@ def instrument_config(instrument, csv_file):
                     print("No se pudo obtener el último error del instrumento (error de VISA).")
                 except Exception as e_inner:
                     print(f"No se pudo obtener el último error del instrumento: {e_inner}")
-                return 1
+                return CONFIG_ERROR
 
+        if not negotiated and negotiate_points(instrument, measurements) != 0:  # Solo configuración
+            return POINTS_ERROR
         print("Configuración completada")
         return 0
 
     except FileNotFoundError:
         print(f"Error: El archivo de configuración '{csv_file}' no se encontró.")
-        return 1
+        return CONFIG_ERROR
     except Exception as e:
         print(f"Error al procesar el archivo de configuración: {e}")
-        return 1
+        return CONFIG_ERROR
 
-def frequency(instrument, directorio, plot=False):
+def frequency(instrument, directorio, plot=False, configure=True):
     # --- Inicialización de variables para almacenar datos ---
     time_data = np.array([])  # Datos de frecuencia
     frequency_data = np.array([])  # Datos de amplitud
     try:
-        if instrument_config(instrument, "config_frequency.csv") == 0: # Llama a la funcion y verifica que no hubo error
-            instrument.write(':FETCh:FVTime?')  # Solicita los datos
-            raw_response = instrument.read_raw()  # Lee los datos en formato binario
+        status = instrument_config(instrument, "config_frequency.csv", solo_captura=not configure)
+        if status == 0: # Verifica que no hubo error
+            raw_response = timed_fetch(instrument, ':FETCh:FVTime?')  # Solicita los datos (timeout adaptativo)
             print(f"Datos crudos de Frequency: {raw_response[:50]}...")
 
             # Procesa los datos binarios recibidos
-            if raw_response[0] == ord('#'):  # Verifica que el formato sea correcto (inicia con #)
-                num_digits = int(chr(raw_response[1]))  # Número de dígitos que indican la longitud de datos
-                num_bytes = int(raw_response[2:2 + num_digits].decode())  # Longitud de los datos en bytes
-                header_length = 2 + num_digits  # Longitud del encabezado
-                data_bytes = raw_response[header_length:header_length + num_bytes]  # Extrae los datos
-                frequency_data = struct.unpack(f'<{num_bytes // 4}f', data_bytes)  # Convierte bytes a flotantes
-                frequency_data = np.array(frequency_data)  # Convierte a arreglo NumPy
-
-                # Genera un arreglo de frecuencias correspondiente a los datos (de 1280 MHz a 1320 MHz)
-                time_data = np.linspace(0, 10e-3, len(frequency_data)) * 1e3
-
-                i = 1
-                while os.path.exists(os.path.join(directorio, f'Frequency_{i}.csv')):  # Verifica si el archivo ya existe
-                    i += 1  # Incrementa el número
-
-                filename = f'Frequency_{i}.csv'
-                output_path = os.path.join(directorio, filename)
-                # Guarda los datos en un archivo CSV
-                pd.DataFrame({'frecuency (Hz)': frequency_data, 'time (s)': time_data}).to_csv(output_path, index=False)
-                print(f"Datos guardados en '{output_path}'.")
-                if plot:    
-                    ploter(output_path)     
+            frequency_data = parse_block(raw_response)  # Convierte a flotantes (float32 o float64 según -f32)
+            if frequency_data is None:  # La respuesta no es un bloque binario (#<n><len><datos>)
+                return "Error en Frequency: formato de respuesta inesperado"
+
+            # Genera un arreglo de frecuencias correspondiente a los datos (de 1280 MHz a 1320 MHz)
+            time_data = time_axis(10e-3, len(frequency_data), 1e3)
+
+            i = 1
+            while capture_exists(os.path.join(directorio, f'Frequency_{i}.csv')):  # Verifica si el archivo ya existe
+                i += 1  # Incrementa el número
+
+            filename = f'Frequency_{i}.csv'
+            output_path = os.path.join(directorio, filename)
+            # Guarda los datos en un archivo CSV
+            save_csv(output_path, {'frecuency (Hz)': frequency_data, 'time (s)': time_data})
+            print(f"Datos guardados en '{output_path}'.")
+            if plot:    
+                ploter(output_path)     
         else:
-            print("Formato de respuesta inesperado en Frequency.")
+            return config_error("Frequency", status)
         return f"Medicion Exitosa"
     except Exception as e:
         return f"Error en Frequency: {e}"
 
-def Spectrum(instrument, directorio, plot=False):
+def Spectrum(instrument, directorio, plot=False, configure=True):
     # --- Inicialización de variables para almacenar datos ---
     spectrum_data = np.array([])  # Datos de amplitud del espectro (DPX Spectrum)
     frequency = np.array([])  # Frecuen cias correspondientes al espectro)
     try:
-        if instrument_config(instrument, "config_spectrum.csv") == 0: # Llama a la funcion y verifica que no hubo error
-            instrument.write(':FETCh:SPECtrum:TRACe1?')  # Solicita los datos de la traza 
-            raw_response = instrument.read_raw()  # Lee los datos en formato binario
+        status = instrument_config(instrument, "config_spectrum.csv", solo_captura=not configure)
+        if status == 0: # Verifica que no hubo error
+            raw_response = timed_fetch(instrument, ':FETCh:SPECtrum:TRACe1?')  # Solicita los datos de la traza (timeout adaptativo)
             print(f"Datos crudos de Spectrum: {raw_response[:50]}...")
 
             # Procesa los datos binarios recibidos
-            if raw_response[0] == ord('#'):  # Verifica que el formato sea correcto (inicia con #)
-                num_digits = int(chr(raw_response[1]))  # Número de dígitos que indican la longitud de datos
-                num_bytes = int(raw_response[2:2 + num_digits].decode())  # Longitud de los datos en bytes
-                header_length = 2 + num_digits  # Longitud del encabezado
-                data_bytes = raw_response[header_length:header_length + num_bytes]  # Extrae los datos
-                spectrum_data = struct.unpack(f'<{num_bytes // 4}f', data_bytes)  # Convierte bytes a flotantes
-                spectrum_data = np.array(spectrum_data)  # Convierte a arreglo NumPy
-
-                # Genera un arreglo de frecuencias correspondiente a los datos (de 1280 MHz a 1320 MHz)
-                frequency = np.linspace(1.3e9 - 20e6, 1.3e9 + 20e6, len(spectrum_data))
-
-                i = 1
-                while os.path.exists(os.path.join(directorio, f'Spectrum_{i}.csv')):  # Verifica si el archivo ya existe
-                    i += 1  # Incrementa el número
-
-                filename = f'Spectrum_{i}.csv'
-                output_path = os.path.join(directorio, filename)
-                # Guarda los datos en un archivo CSV
-                pd.DataFrame({'Frecuencia (Hz)': frequency, 'Amplitud (dBm)': spectrum_data}).to_csv(output_path, index=False)
-                print(f"Datos guardados en '{output_path}'.")
+            spectrum_data = parse_block(raw_response)  # Convierte a flotantes (float32 o float64 según -f32)
+            if spectrum_data is None:  # La respuesta no es un bloque binario (#<n><len><datos>)
+                return "Error en Spectrum: formato de respuesta inesperado"
 
-                if plot:
-                    ploter(output_path)
+            # Genera un arreglo de frecuencias correspondiente a los datos (de 1280 MHz a 1320 MHz)
+            frequency = frequency_axis(1.3e9, 40e6, len(spectrum_data))
+
+            i = 1
+            while capture_exists(os.path.join(directorio, f'Spectrum_{i}.csv')):  # Verifica si el archivo ya existe
+                i += 1  # Incrementa el número
+
+            filename = f'Spectrum_{i}.csv'
+            output_path = os.path.join(directorio, filename)
+            # Guarda los datos en un archivo CSV
+            save_csv(output_path, {'Frecuencia (Hz)': frequency, 'Amplitud (dBm)': spectrum_data})
+            print(f"Datos guardados en '{output_path}'.")
+
+            if plot:
+                ploter(output_path)
         else:
-            print("Formato de respuesta inesperado en Spectrum.")
+            return config_error("Spectrum", status)
         
         return f"Medicion Exitosa"
 
@@ -227,42 +294,38 @@ def Spectrum(instrument, directorio, plot=False):
         return f"Error en Spectrum: {e}"  # Solicitar datos
     
     
-def DPX(instrument, directorio, plot):
+def DPX(instrument, directorio, plot, configure=True):
     # --- Inicialización de variables para almacenar datos ---
     spectrum_data = np.array([])  # Datos de amplitud del espectro (DPX Spectrum)
     frequencies = np.array([])  # Frecuencias correspondientes al espectro
     try:
-        if instrument_config(instrument, "config_dpx.csv") == 0: # Llama a la funcion y verifica que no hubo error
-            instrument.write(':FETCh:DPX:RESults:TRACe3?')  # Solicita los datos de la traza 3 
-            raw_response = instrument.read_raw()  # Lee los datos en formato binario
+        status = instrument_config(instrument, "config_dpx.csv", solo_captura=not configure)
+        if status == 0: # Verifica que no hubo error
+            raw_response = timed_fetch(instrument, ':FETCh:DPX:RESults:TRACe3?')  # Solicita los datos de la traza 3 (timeout adaptativo)
             print(f"Datos crudos de DPX Spectrum: {raw_response[:50]}...")
 
             # Procesa los datos binarios recibidos
-            if raw_response[0] == ord('#'):  # Verifica que el formato sea correcto (inicia con #)
-                num_digits = int(chr(raw_response[1]))  # Número de dígitos que indican la longitud de datos
-                num_bytes = int(raw_response[2:2 + num_digits].decode())  # Longitud de los datos en bytes
-                header_length = 2 + num_digits  # Longitud del encabezado
-                data_bytes = raw_response[header_length:header_length + num_bytes]  # Extrae los datos
-                spectrum_data = struct.unpack(f'<{num_bytes // 4}f', data_bytes)  # Convierte bytes a flotantes
-                spectrum_data = np.array(spectrum_data)  # Convierte a arreglo NumPy
-
-                # Genera un arreglo de frecuencias correspondiente a los datos (de 1280 MHz a 1320 MHz)
-                frequencies = np.linspace(1.3e9 - 20e6, 1.3e9 + 20e6, len(spectrum_data))
-
-                i = 1
-                while os.path.exists(os.path.join(directorio, f'DPX_{i}.csv')):  # Verifica si el archivo ya existe
-                    i += 1  # Incrementa el número
-
-                filename = f'DPX_{i}.csv'
-                output_path = os.path.join(directorio, filename)
-                # Guarda los datos en un archivo CSV
-                pd.DataFrame({'Frecuencia (Hz)': frequencies, 'Amplitud (dBm)': spectrum_data}).to_csv(output_path, index=False)
-                print(f"Datos guardados en '{output_path}'.")
+            spectrum_data = parse_block(raw_response)  # Convierte a flotantes (float32 o float64 según -f32)
+            if spectrum_data is None:  # La respuesta no es un bloque binario (#<n><len><datos>)
+                return "Error en DPX Spectrum: formato de respuesta inesperado"
 
-                if plot:
-                    ploter(output_path)
+            # Genera un arreglo de frecuencias correspondiente a los datos (de 1280 MHz a 1320 MHz)
+            frequencies = frequency_axis(1.3e9, 40e6, len(spectrum_data))
+
+            i = 1
+            while capture_exists(os.path.join(directorio, f'DPX_{i}.csv')):  # Verifica si el archivo ya existe
+                i += 1  # Incrementa el número
+
+            filename = f'DPX_{i}.csv'
+            output_path = os.path.join(directorio, filename)
+            # Guarda los datos en un archivo CSV
+            save_csv(output_path, {'Frecuencia (Hz)': frequencies, 'Amplitud (dBm)': spectrum_data})
+            print(f"Datos guardados en '{output_path}'.")
+
+            if plot:
+                ploter(output_path)
         else:
-            print("Formato de respuesta inesperado en DPX Spectrum.")
+            return config_error("DPX Spectrum", status)
         
         return f"Medicion Exitosa"
 
@@ -270,161 +333,301 @@ def DPX(instrument, directorio, plot):
         return f"Error en DPX Spectrum: {e}"  # Solicitar datos
 
 
-def PVT(instrument, directorio, plot):
+def PVT(instrument, directorio, plot, configure=True):
     # --- Inicialización de variables para almacenar datos ---
     phase_data = np.array([])  # Datos de fase
     time = np.array([])  # vector de tiempo
     try:
-        if instrument_config(instrument, "config_PVT.csv") == 0: # Llama a la funcion y verifica que no hubo error
+        status = instrument_config(instrument, "config_PVT.csv", solo_captura=not configure)
+        if status == 0: # Verifica que no hubo error
         
-            instrument.write(':FETCh:PHVTime?')  # Solicita los datos de phase vs time 
-            raw_response = instrument.read_raw()  # Lee los datos en formato binario
+            raw_response = timed_fetch(instrument, ':FETCh:PHVTime?')  # Solicita los datos de phase vs time (timeout adaptativo)
             print(f"Datos crudos de Phase vs Time {raw_response[:50]}...")
 
             # Procesa los datos binarios recibidos
-            if raw_response[0] == ord('#'):  # Verifica que el formato sea correcto (inicia con #)
-                num_digits = int(chr(raw_response[1]))  # Número de dígitos que indican la longitud de datos
-                num_bytes = int(raw_response[2:2 + num_digits].decode())  # Longitud de los datos en bytes
-                header_length = 2 + num_digits  # Longitud del encabezado
-                data_bytes = raw_response[header_length:header_length + num_bytes]  # Extrae los datos
-                phase_data = struct.unpack(f'<{num_bytes // 4}f', data_bytes)  # Convierte bytes a flotantes
-                phase_data = np.array(phase_data)  # Convierte a arreglo NumPy
-
-                # Genera un arreglo de time# Genera un arreglo de puntos temporales (de 0 a 10 ms)
-                time = np.linspace(0, 10e-3, len(phase_data)) * 1e3  # Convierte a milisegundos
-
-                # Busca el próximo número disponible para el archivo
-                i = 1
-                while os.path.exists(os.path.join(directorio, f'PVTime_{i}.csv')):  # Verifica si el archivo ya existe
-                    i += 1  # Incrementa el número
-
-                filename = f'PVTime_{i}.csv'
-                output_path = os.path.join(directorio, filename)
-
-                # Guarda los datos en un archivo CSV
-                pd.DataFrame({'Time (ms)': time, 'Phase (º)': phase_data}).to_csv(output_path, index=False)
-                print(f"Datos guardados en '{output_path}'.")
+            phase_data = parse_block(raw_response)  # Convierte a flotantes (float32 o float64 según -f32)
+            if phase_data is None:  # La respuesta no es un bloque binario (#<n><len><datos>)
+                return "Error en Phase vs Time: formato de respuesta inesperado"
 
-                if plot:
-                    ploter(output_path)
-            else:
-                print("Formato de respuesta inesperado en Phase vs Time.")
+            # Genera un arreglo de time# Genera un arreglo de puntos temporales (de 0 a 10 ms)
+            time = time_axis(10e-3, len(phase_data), 1e3)  # Convierte a milisegundos
+
+            # Busca el próximo número disponible para el archivo
+            i = 1
+            while capture_exists(os.path.join(directorio, f'PVTime_{i}.csv')):  # Verifica si el archivo ya existe
+                i += 1  # Incrementa el número
+
+            filename = f'PVTime_{i}.csv'
+            output_path = os.path.join(directorio, filename)
+
+            # Guarda los datos en un archivo CSV
+            save_csv(output_path, {'Time (ms)': time, 'Phase (º)': phase_data})
+            print(f"Datos guardados en '{output_path}'.")
+
+            if plot:
+                ploter(output_path)
+        else:
+            return config_error("Phase vs Time", status)
         return f"Medicion Exitosa"
 
     except Exception as e:
         return f"Error en Phase vs Time: {e}"  # Solicitar datos
   
-def TimeOverview(instrument, directorio, plot):
+def TimeOverview(instrument, directorio, plot, configure=True):
     # --- Inicialización de variables para almacenar datos ---
     time_overview_data = np.array([])  # Datos de fase
     time = np.array([])  # vector de tiempo
     try:
         print("\n--- Capturando Time Overview ---")
-        print("Configurando la vista Time Overview...")
-        send_command(instrument, ':DISPlay:PULSe:MEASview:NEW TOVerview')  # Selecciona la vista Time Overview
+        if configure:
+            print("Configurando la vista Time Overview...")
+            send_command(instrument, ':DISPlay:PULSe:MEASview:NEW TOVerview')  # Selecciona la vista Time Overview
+            if negotiate_points(instrument, ['TOVerview']) != 0:  # Puntos de traza pedidos por la view
+                return config_error("TimeOverview", POINTS_ERROR)
         send_command(instrument, ':INITiate:IMMediate', wait_opc=False)  # Inicia la medición
         instrument.write("*WAI")  # Opción 1: espera pasiva
         
-        instrument.write(':FETCh:TOverview?')  # Solicita los datos de phase vs time 
-        raw_response = instrument.read_raw()  # Lee los datos en formato binario
+        raw_response = timed_fetch(instrument, ':FETCh:TOverview?')  # Solicita los datos de phase vs time (timeout adaptativo)
         print(f"Datos crudos de TimeOverview {raw_response[:50]}...")
 
         # Procesa los datos binarios recibidos
-        if raw_response[0] == ord('#'):  # Verifica que el formato sea correcto (inicia con #)
-            num_digits = int(chr(raw_response[1]))  # Número de dígitos que indican la longitud de datos
-            num_bytes = int(raw_response[2:2 + num_digits].decode())  # Longitud de los datos en bytes
-            header_length = 2 + num_digits  # Longitud del encabezado
-            data_bytes = raw_response[header_length:header_length + num_bytes]  # Extrae los datos
-            time_overview_data = struct.unpack(f'<{num_bytes // 4}f', data_bytes)  # Convierte bytes a flotantes
-            time_overview_data = np.array(time_overview_data)  # Convierte a arreglo NumPy
+        time_overview_data = parse_block(raw_response)  # Convierte a flotantes (float32 o float64 según -f32)
+        if time_overview_data is None:  # La respuesta no es un bloque binario (#<n><len><datos>)
+            return "Error en TimeOverview: formato de respuesta inesperado"
 
-            # Genera un arreglo de time# Genera un arreglo de puntos temporales (de 0 a 10 ms)
-            time = np.linspace(0, 10e-3, len(time_overview_data)) * 1e3  # Convierte a milisegundos
+        # Genera un arreglo de time# Genera un arreglo de puntos temporales (de 0 a 10 ms)
+        time = time_axis(10e-3, len(time_overview_data), 1e3)  # Convierte a milisegundos
 
-            # Busca el próximo número disponible para el archivo
-            i = 1
-            while os.path.exists(os.path.join(directorio, f'TimeOverview_{i}.csv')):  # Verifica si el archivo ya existe
-                i += 1  # Incrementa el número
+        # Busca el próximo número disponible para el archivo
+        i = 1
+        while capture_exists(os.path.join(directorio, f'TimeOverview_{i}.csv')):  # Verifica si el archivo ya existe
+            i += 1  # Incrementa el número
 
-            filename = f'TimeOverview_{i}.csv'
-            output_path = os.path.join(directorio, filename)
+        filename = f'TimeOverview_{i}.csv'
+        output_path = os.path.join(directorio, filename)
 
-            # Guarda los datos en un archivo CSV
-            pd.DataFrame({'Time (ms)': time, 'Amplitud (dBm)': time_overview_data}).to_csv(output_path, index=False)
-            print(f"Datos guardados en '{output_path}'.")
+        # Guarda los datos en un archivo CSV
+        save_csv(output_path, {'Time (ms)': time, 'Amplitud (dBm)': time_overview_data})
+        print(f"Datos guardados en '{output_path}'.")
 
-            if plot:
-                ploter(output_path)
-        else:
-            print("Formato de respuesta inesperado en TimeOverview.")
+        if plot:
+            ploter(output_path)
         return f"Medicion Exitosa"
 
     except Exception as e:
         return f"Error en TimeOverview: {e}"  # Solicitar datos
 
 
-def Pulse_Trace(instrument, directorio, plot):
+def Pulse_Trace(instrument, directorio, plot, configure=True):
     # --- Inicialización de variables para almacenar datos ---
     pulse_data = np.array([])  # Datos de fase
     time = np.array([])  # vector de tiempo
     try:
         print("\n--- Capturando Pulse Trace ---")
-        print("Configurando Pulse Trace: Umbral -4 dBm, Rango 15 μs, Reference Level 0 dBm.")
-        send_command(instrument, ':SENSe:PULSe:THReshold -4')  # Establece el umbral para detectar pulsos en -4 dBm
-        send_command(instrument, ':SENSe:PULSe:RANGe 15E-6')  # Rango de tiempo de 15 μs
-        send_command(instrument, ':SENSe:PULSe:REFerence 0')  # Nivel de referencia en 0 dBm
-        print("Configurando la vista Pulse Trace...")
-        send_command(instrument, ':DISPlay:PULSe:MEASview:NEW TRACe')  # Selecciona la vista Pulse Trace
+        if configure:
+            print("Configurando Pulse Trace: Umbral -4 dBm, Rango 15 μs, Reference Level 0 dBm.")
+            send_command(instrument, ':SENSe:PULSe:THReshold -4')  # Establece el umbral para detectar pulsos en -4 dBm
+            send_command(instrument, ':SENSe:PULSe:RANGe 15E-6')  # Rango de tiempo de 15 μs
+            send_command(instrument, ':SENSe:PULSe:REFerence 0')  # Nivel de referencia en 0 dBm
+            print("Configurando la vista Pulse Trace...")
+            send_command(instrument, ':DISPlay:PULSe:MEASview:NEW TRACe')  # Selecciona la vista Pulse Trace
         send_command(instrument, ':INITiate:IMMediate', wait_opc=False)  # Inicia la medición
         instrument.write("*WAI")  # Opción 1: espera pasiva
         
 
-        instrument.write(':FETCh:PULSe:TRACe?')  # Solicita los datos de phase vs time
-        raw_response = instrument.read_raw()  # Lee los datos en formato binario
+        raw_response = timed_fetch(instrument, ':FETCh:PULSe:TRACe?')  # Solicita los datos de phase vs time (timeout adaptativo)
         print(f"Datos crudos de Pulse Trace {raw_response[:50]}...")
 
         # Procesa los datos binarios recibidos
-        if raw_response[0] == ord('#'):  # Verifica que el formato sea correcto (inicia con #)
-            num_digits = int(chr(raw_response[1]))  # Número de dígitos que indican la longitud de datos
-            num_bytes = int(raw_response[2:2 + num_digits].decode())  # Longitud de los datos en bytes
-            header_length = 2 + num_digits  # Longitud del encabezado
-            data_bytes = raw_response[header_length:header_length + num_bytes]  # Extrae los datos
-            pulse_data = struct.unpack(f'<{num_bytes // 4}f', data_bytes)  # Convierte bytes a flotantes
-            pulse_data = np.array(pulse_data)  # Convierte a arreglo NumPy
-            # Genera un arreglo de puntos temporales (de 0 a 15 μs)
-                
-            time = np.linspace(0, 15e-6, len(pulse_data)) * 1e6  # Convierte a microsegundos
-            # Filtrado suave para eliminar ruido extremo (valores fuera de -100 dBm a 20 dBm)
-            valid_mask = (pulse_data >= -100) & (pulse_data <= 20)
-
-            if np.any(valid_mask):
-                pulse_data = pulse_data[valid_mask]  # Aplica el filtro
-                time = time[valid_mask]  # Ajusta los tiempos correspondientes
-                # Guarda los datos en un archivo CSV
-                
-                # Busca el próximo número disponible para el archivo
-                i = 1
-                while os.path.exists(os.path.join(directorio, f'PulseTrace_{i}.csv')):  # Verifica si el archivo ya existe
-                    i += 1  # Incrementa el número
-
-                filename = f'PulseTrace_{i}.csv'
-                output_path = os.path.join(directorio, filename)
-
-                # Guarda los datos en un archivo CSV
-                pd.DataFrame({'Time (ms)': time, 'Amplitud (dBm)': pulse_data}).to_csv(output_path, index=False)
-                print(f"Datos guardados en '{output_path}'.")
+        pulse_data = parse_block(raw_response)  # Convierte a flotantes (float32 o float64 según -f32)
+        if pulse_data is None:  # La respuesta no es un bloque binario (#<n><len><datos>)
+            return "Error en Pulse Trace: formato de respuesta inesperado"
+        # Genera un arreglo de puntos temporales (de 0 a 15 μs)
+            
+        time = time_axis(15e-6, len(pulse_data), 1e6)  # Convierte a microsegundos
+        # Filtrado suave para eliminar ruido extremo (valores fuera de -100 dBm a 20 dBm)
+        valid_mask = (pulse_data >= -100) & (pulse_data <= 20)
+
+        if np.any(valid_mask):
+            pulse_data = pulse_data[valid_mask]  # Aplica el filtro
+            time = time[valid_mask]  # Ajusta los tiempos correspondientes
+            # Guarda los datos en un archivo CSV
+            
+            # Busca el próximo número disponible para el archivo
+            i = 1
+            while capture_exists(os.path.join(directorio, f'PulseTrace_{i}.csv')):  # Verifica si el archivo ya existe
+                i += 1  # Incrementa el número
+
+            filename = f'PulseTrace_{i}.csv'
+            output_path = os.path.join(directorio, filename)
+
+            # Guarda los datos en un archivo CSV
+            save_csv(output_path, {'Time (ms)': time, 'Amplitud (dBm)': pulse_data})
+            print(f"Datos guardados en '{output_path}'.")
+
+            if plot:
+                ploter(output_path)
+        else:
+            return "Error en Pulse Trace: no se encontraron datos válidos después de filtrar"
+        return f"Medicion Exitosa"
+
+    except Exception as e:
+        return f"Error en Pulse Trace: {e}"  # Solicitar datos
+
+
+def fetch_trace(instrument, query):
+    """
+    Solicita una traza al instrumento y la decodifica.
+
+    Args:
+        instrument: Objeto de conexión al instrumento.
+        query (str): Consulta :FETCh que devuelve un bloque binario.
+    Returns:
+        Arreglo NumPy (tipo según -f32), o None si la respuesta no es un bloque binario.
+    """
+    raw_response = timed_fetch(instrument, query)  # Solicita y lee los datos en formato binario
+    print(f"Datos crudos de {query} {raw_response[:50]}...")
+    return parse_block(raw_response)
+
+
+def Multi(instrument, directorio, plot, configure=True):
+    """
+    Phase vs Time, Frequency vs Time y Spectrum de una misma adquisición.
+
+    Las tres vistas quedan abiertas sobre la misma señal (1.3 GHz, span 40 MHz); se dispara
+    una sola adquisición y se leen los tres resultados en una consulta compuesta, de modo que
+    fase, frecuencia y espectro corresponden al mismo pulso.
+    """
+    try:
+        status = instrument_config(instrument, "config_multi.csv", solo_captura=not configure)
+        if status == 0: # Verifica que no hubo error
+            # Los tres resultados de la misma adquisición en un único mensaje compuesto
+            queue = QueryQueue(instrument)
+            queue.add(':FETCh:PHVTime?', binary=True)
+            queue.add(':FETCh:FVTime?', binary=True)
+            queue.add(':FETCh:SPECtrum:TRACe1?', binary=True)
+            try:
+                phase_data, frequency_data, spectrum_data = queue.flush()
+            except ValueError as e:
+                return f"Error en Multi: formato de respuesta inesperado ({e})"
 
+            # Busca el próximo número disponible para el archivo
+            i = 1
+            while capture_exists(os.path.join(directorio, f'Multi_{i}_PVTime.csv')):  # Verifica si el archivo ya existe
+                i += 1  # Incrementa el número
+
+            outputs = {
+                'PVTime': {'Time (ms)': time_axis(10e-3, len(phase_data), 1e3), 'Phase (º)': phase_data},
+                'Frequency': {'frecuency (Hz)': frequency_data, 'time (s)': time_axis(10e-3, len(frequency_data), 1e3)},
+                'Spectrum': {'Frecuencia (Hz)': frequency_axis(1.3e9, 40e6, len(spectrum_data)), 'Amplitud (dBm)': spectrum_data},
+            }
+            for name, columns in outputs.items():
+                output_path = os.path.join(directorio, f'Multi_{i}_{name}.csv')
+                save_csv(output_path, columns)  # Guarda los datos en un archivo CSV
+                print(f"Datos guardados en '{output_path}'.")
                 if plot:
                     ploter(output_path)
-            else:
-                print("No se encontraron datos válidos en Pulse Trace después de filtrar.")
-                pulse_data = np.array([])
-                time = np.array([])
+        else:
+            return config_error("Multi", status)
+        return f"Medicion Exitosa"
+
+    except Exception as e:
+        return f"Error en Multi: {e}"
+
+
+def IQ(instrument, directorio, plot, configure=True):
+    """
+    Registro IQ crudo de la adquisición y vistas derivadas en el host.
+
+    Se lee una sola vez el registro IQ (:FETCh:RFIN:IQ?) y con dsp.derive_views se obtienen
+    Spectrum, Phase vs Time y Frequency vs Time. Se guardan 'IQ_<i>.csv' (I/Q en volts) y
+    'IQ_<i>_Spectrum.csv', 'IQ_<i>_PVTime.csv', 'IQ_<i>_Frequency.csv'.
+    """
+    try:
+        status = instrument_config(instrument, "config_iq.csv", solo_captura=not configure)
+        if status == 0: # Verifica que no hubo error
+            # El registro más reciente de la memoria de adquisición (el instrumento está detenido)
+            record_id = int(timed_query(instrument, ':FETCh:RFIN:RECord:IDS?').strip().split(',')[-1])
+            header = timed_query(instrument, f':FETCh:RFIN:IQ:HEADer? {record_id}').strip().split(',')
+            fs = float(header[1])  # Frecuencia de muestreo en Hz
+            center = float(header[3])  # Frecuencia central en Hz
+            data = fetch_trace(instrument, f':FETCh:RFIN:IQ? {record_id}')
+            if data is None:
+                return "Error en IQ: formato de respuesta inesperado"
+            iq = dsp.iq_from_interleaved(data)  # I(1) Q(1) I(2) Q(2)... -> complejo, sin copia
 
+            # Busca el próximo número disponible para el archivo
+            i = 1
+            while capture_exists(os.path.join(directorio, f'IQ_{i}.csv')):  # Verifica si el archivo ya existe
+                i += 1  # Incrementa el número
+
+            output_path = os.path.join(directorio, f'IQ_{i}.csv')
+            save_csv(output_path, {'Time (s)': dsp.sample_times(len(iq), fs), 'I (V)': iq.real, 'Q (V)': iq.imag})
+            dsp.save_header(output_path, fs, center)  # Para volver a derivar las vistas con la frecuencia central
+            print(f"Datos guardados en '{output_path}'.")
+            for name, columns in dsp.derive_views(iq, fs, center).items():
+                output_path = os.path.join(directorio, f'IQ_{i}_{name}.csv')
+                save_csv(output_path, columns)  # Guarda la vista derivada
+                print(f"Datos guardados en '{output_path}'.")
+                if plot:
+                    ploter(output_path)
         else:
-            print("Formato de respuesta inesperado en Pulse Trace.")
+            return config_error("IQ", status)
         return f"Medicion Exitosa"
 
     except Exception as e:
-        return f"Error en Pulse Trace: {e}"  # Solicitar datos
+        return f"Error en IQ: {e}"
 
+
+def Averaged(instrument, directorio, plot, configure=True, count=50, tol_db=TOL_DB,
+             config="config_spectrum.csv", query=':FETCh:SPECtrum:TRACe1?'):
+    """
+    Promedio de potencia, max-hold, min-hold y promedio exponencial calculados en el host.
+
+    Se configura la vista una vez y se disparan adquisiciones simples (sin promediado en el
+    instrumento); cada traza se acumula en un TraceAccumulator. La captura termina al llegar
+    a count trazas o antes, cuando el promedio converge (cambio menor a tol_db). El acumulador
+    en curso queda en ACCUMULATORS['Averaged'] para consultar resultados parciales.
+    Se guarda 'Averaged_<i>.csv'.
+    """
+    if count < 1:
+        return f"Error en Averaged: se necesita al menos una traza (count={count})"
+    try:
+        if configure:
+            status = instrument_config(instrument, config, solo_configuracion=True)
+            if status != 0:
+                return config_error("Averaged", status)
+        accumulator = None
+        for _ in range(count):
+            if instrument_config(instrument, config, solo_captura=True) != 0: # Dispara una adquisición simple
+                return "Error en Averaged: fallo la adquisición"
+            trace = fetch_trace(instrument, query)
+            if trace is None:
+                return "Error en Averaged: formato de respuesta inesperado"
+            if accumulator is None:
+                accumulator = TraceAccumulator(len(trace))
+                ACCUMULATORS['Averaged'] = accumulator
+            accumulator.update(trace)
+            if accumulator.converged(tol_db):
+                break
+        print(f"Averaged: {accumulator.count} trazas (último cambio {accumulator.last_change_db:.3f} dB)")
+
+        # Busca el próximo número disponible para el archivo
+        i = 1
+        while capture_exists(os.path.join(directorio, f'Averaged_{i}.csv')):  # Verifica si el archivo ya existe
+            i += 1  # Incrementa el número
+
+        result = accumulator.result()
+        output_path = os.path.join(directorio, f'Averaged_{i}.csv')
+        save_csv(output_path, {'Frecuencia (Hz)': frequency_axis(1.3e9, 40e6, len(result['average'])),
+                               'Amplitud (dBm)': result['average'],
+                               'Max Hold (dBm)': result['max_hold'],
+                               'Min Hold (dBm)': result['min_hold'],
+                               'Promedio Exponencial (dBm)': result['exp_average']})
+        print(f"Datos guardados en '{output_path}'.")
+        if plot:
+            ploter(output_path)
+        return f"Medicion Exitosa"
+
+    except Exception as e:
+        return f"Error en Averaged: {e}"
@@ -0,0 +1,298 @@
+# Demonio de adquisición: un único proceso dueño de la sesión VISA con el RSA6114A.
+# Abre la conexión una sola vez (*CLS, *IDN?, :INITiate:CONTinuous OFF) y atiende trabajos
+# de varios scripts cliente por un socket Unix local, de a uno por vez (el instrumento no
+# admite dos configuraciones intercaladas). Las capturas se devuelven como archivos en el
+# directorio pedido y, con -ring, también en el buffer de memoria compartida (trace_ring).
+# Protocolo: una línea JSON por pedido y una por respuesta, p. ej.
+#   {"op": "capture", "view": "PVT", "dir": "/ruta/results/PVT", "repeat": 5}
+#   {"op": "query", "query": ":SENSe:PHVTime:MAXTracepoints?"}
+# Uso (desde este directorio, donde están los CSV de configuración):
+#   python daemon.py -ip 192.168.1.67 -ring rsa_traces
+#   python messuerment.py -daemon /tmp/rsa6114a.sock
+import argparse  #para parsear argumentos
+import json      # Mensajes del protocolo
+import os        #para crear directorios y el socket
+import socket    # Cliente del socket Unix
+import socketserver  # Servidor del socket Unix (un hilo por cliente)
+import threading  # Serialización de los trabajos
+import time  # Tiempo de funcionamiento y duración de los trabajos
+
+import numpy as np  # Para guardar las trazas de los fetch directos
+import pyvisa  # Para comunicación con instrumentos vía VISA
+
+from config_functions import logger, send_command, instrument_config, config_error
+from config_functions import DPX, PVT, TimeOverview, Pulse_Trace, Spectrum, frequency, Multi, IQ, Averaged
+import binblock  # Decodificación y publicación de las trazas
+import transfer  # Puntos de traza negociados por view
+from latency import PROFILE, timed_query, timed_fetch  # Timeouts adaptativos
+from session import open_session, is_alive, reconnect  # Conexión y reconexión VISA
+from trace_ring import TraceRing  # Reparto de trazas en memoria compartida
+
+SOCKET_PATH = "/tmp/rsa6114a.sock"
+MAX_MESSAGE = 1024 * 1024  # Tamaño máximo de un pedido en bytes
+VIEWS = {"DPX": DPX, "PVT": PVT, "TimeOverview": TimeOverview, "Pulse_Trace": Pulse_Trace,
+         "Spectrum": Spectrum, "frequency": frequency, "Multi": Multi, "IQ": IQ, "Averaged": Averaged}
+
+
+class AcquisitionDaemon:
+    """
+    Sesión VISA persistente y ejecución serializada de los trabajos de los clientes.
+
+    Args:
+        rm: pyvisa.ResourceManager (o uno de grabación/reproducción de scpi_trace).
+        ip (str): Dirección IP del instrumento.
+        ring (TraceRing): Buffer de trazas opcional.
+        retries (int): Intentos de reconexión (y de cada captura) si se cae la sesión.
+    """
+
+    def __init__(self, rm, ip, ring=None, retries=8):
+        self.rm = rm
+        self.ip = ip
+        self.ring = ring
+        self.retries = retries
+        self.lock = threading.Lock()  # Un trabajo a la vez sobre el instrumento
+        self.instrument = open_session(rm, ip)
+        self.configured = None  # Última view configurada (se reconfigura solo al cambiar)
+        self.start_time = time.time()
+        self.jobs = 0
+        self.waiting = 0  # Trabajos esperando el instrumento
+        self.waiting_lock = threading.Lock()  # Protege el contador (un hilo por cliente)
+        self.running = None  # Trabajo en curso
+        self.stop = threading.Event()
+
+    def handle(self, request):
+        """
+        Ejecuta un pedido y devuelve la respuesta (dict con 'ok').
+        """
+        op = request.get("op")
+        if op == "status":
+            return self.status()
+        if op == "shutdown":
+            self.stop.set()
+            return {"ok": True}
+        handler = {"capture": self.capture, "configure": self.configure, "command": self.command,
+                   "query": self.query, "fetch": self.fetch}.get(op)
+        if handler is None:
+            return {"ok": False, "error": f"Operación desconocida: {op}"}
+        with self.waiting_lock:
+            self.waiting += 1
+        with self.lock:
+            with self.waiting_lock:
+                self.waiting -= 1
+            self.running = op
+            start = time.perf_counter()
+            try:
+                response = handler(**{k: v for k, v in request.items() if k != "op"})
+            except TypeError as e:
+                response = {"ok": False, "error": f"Parámetros inválidos: {e}"}
+            except Exception as e:
+                response = {"ok": False, "error": str(e)}
+                self.configured = None  # Estado del instrumento desconocido
+            finally:
+                self.running = None
+            self.jobs += 1
+            response["seconds"] = time.perf_counter() - start
+            return response
+
+    def _ensure_session(self):
+        if not is_alive(self.instrument):
+            logger("Sesión perdida en el demonio: reconectando")
+            self.instrument = reconnect(self.rm, self.ip, self.instrument, retries=self.retries)
+            self.configured = None
+
+    def capture(self, view, dir, repeat=1, configure=None, points=None, plot=False):
+        """
+        Capturas de una view; la configuración completa solo se envía si cambió la view
+        (o si configure es True).
+
+        Returns:
+            dict: results (retorno de cada captura), files (archivos nuevos del directorio) y
+            seqs (secuencias publicadas en el buffer de trazas).
+        """
+        if view not in VIEWS:
+            return {"ok": False, "error": f"View desconocida: {view}"}
+        os.makedirs(dir, exist_ok=True)
+        before = set(os.listdir(dir))
+        first_seq = self.ring.head if self.ring is not None else 0
+        transfer.set_resolution(points)
+        results = []
+        for _ in range(int(repeat)):
+            configure_now = configure if configure is not None else self.configured != (view, str(points))
+            saved = binblock.SAVED  # Archivos guardados antes de la captura
+            attempt = 1
+            while True:
+                logger(f"Demonio: {view} (configuración: {configure_now})")
+                retorno = VIEWS[view](self.instrument, dir, plot, configure=configure_now)
+                if retorno.startswith("Medicion Exitosa") or is_alive(self.instrument):
+                    break
+                if attempt >= self.retries:
+                    retorno = f"Error en {view}: captura fallida después de {attempt} intentos ({retorno})"
+                    break
+                # La sesión VISA se cayó: reconecta y repite la captura reconfigurando la view
+                self.instrument = reconnect(self.rm, self.ip, self.instrument, retries=self.retries)
+                configure_now = True
+                attempt += 1
+            if retorno.startswith("Medicion Exitosa") and binblock.SAVED == saved:
+                retorno = f"Error en {view}: la captura no guardó ningún archivo"
+            # Solo una captura completa asegura que la view quedó configurada; ante cualquier
+            # error la próxima captura reconfigura
+            self.configured = (view, str(points)) if retorno.startswith("Medicion Exitosa") else None
+            results.append(retorno)
+        files = sorted(os.path.join(dir, f) for f in set(os.listdir(dir)) - before)
+        seqs = list(range(first_seq, self.ring.head)) if self.ring is not None else []
+        return {"ok": all(r.startswith("Medicion Exitosa") for r in results), "results": results,
+                "files": files, "seqs": seqs}
+
+    def configure(self, csv):
+        """
+        Configura el instrumento con un CSV sin disparar la adquisición.
+        """
+        self._ensure_session()
+        self.configured = None  # La configuración de un cliente no corresponde a ninguna view
+        status = instrument_config(self.instrument, csv, solo_configuracion=True)
+        if status != 0:
+            return {"ok": False, "error": config_error(csv, status)}
+        return {"ok": True}
+
+    def command(self, command, wait_opc=True):
+        self._ensure_session()
+        self.configured = None
+        send_command(self.instrument, command, wait_opc=wait_opc)
+        return {"ok": True}
+
+    def query(self, query):
+        self._ensure_session()
+        return {"ok": True, "response": timed_query(self.instrument, query).strip()}
+
+    def fetch(self, query, path):
+        """
+        Lee un bloque binario y lo guarda decodificado en un archivo .npy.
+        """
+        self._ensure_session()
+        data = binblock.parse_block(timed_fetch(self.instrument, query))
+        if data is None:
+            return {"ok": False, "error": "La respuesta no es un bloque binario"}
+        np.save(path, data)
+        return {"ok": True, "path": path, "points": len(data)}
+
+    def status(self):
+        return {"ok": True, "ip": self.ip, "uptime": time.time() - self.start_time, "jobs": self.jobs,
+                "waiting": self.waiting, "running": self.running,
+                "configured": self.configured[0] if self.configured else None,
+                "ring": self.ring.shm.name if self.ring is not None else None}
+
+    def close(self):
+        if self.instrument is not None:
+            self.instrument.close()
+        self.rm.close()
+
+
+def serve(daemon, path=SOCKET_PATH):
+    """
+    Atiende pedidos en el socket Unix hasta recibir 'shutdown' o Ctrl+C.
+    """
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            for line in self.rfile:
+                if len(line) > MAX_MESSAGE:
+                    response = {"ok": False, "error": "Pedido demasiado grande"}
+                else:
+                    try:
+                        response = daemon.handle(json.loads(line))
+                    except ValueError as e:
+                        response = {"ok": False, "error": f"JSON inválido: {e}"}
+                self.wfile.write((json.dumps(response) + "\n").encode())
+                self.wfile.flush()
+                if daemon.stop.is_set():
+                    break
+
+    if os.path.exists(path):
+        os.remove(path)  # Socket de una ejecución anterior
+    server = socketserver.ThreadingUnixStreamServer(path, Handler)
+    server.daemon_threads = True
+    os.chmod(path, 0o600)  # Solo el usuario que lanzó el demonio
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    print(f"Demonio de adquisición escuchando en {path}")
+    try:
+        while not daemon.stop.wait(0.5):
+            pass
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+        server.server_close()
+        os.remove(path)
+
+
+class DaemonClient:
+    """
+    Cliente del demonio de adquisición (una conexión, pedidos sincrónicos).
+    """
+
+    def __init__(self, path=SOCKET_PATH, timeout=None):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(timeout)
+        self.sock.connect(path)
+        self.reader = self.sock.makefile('rb')
+
+    def request(self, op, **params):
+        """
+        Envía un pedido y espera su respuesta.
+        """
+        self.sock.sendall((json.dumps({"op": op, **params}) + "\n").encode())
+        line = self.reader.readline()
+        if not line:
+            raise ConnectionError("El demonio cerró la conexión")
+        return json.loads(line)
+
+    def capture(self, view, dir, repeat=1, configure=None, points=None):
+        return self.request("capture", view=view, dir=os.path.abspath(dir), repeat=repeat,
+                            configure=configure, points=points)
+
+    def query(self, query):
+        return self.request("query", query=query)
+
+    def command(self, command, wait_opc=True):
+        return self.request("command", command=command, wait_opc=wait_opc)
+
+    def status(self):
+        return self.request("status")
+
+    def shutdown(self):
+        return self.request("shutdown")
+
+    def close(self):
+        self.reader.close()
+        self.sock.close()
+
+
+if __name__ == "__main__":
+    # Crear el parser
+    parser = argparse.ArgumentParser(description="Demonio de adquisición con sesión VISA persistente al RSA6114A")
+    parser.add_argument('-ip', type=str, default="192.168.1.67", help="Dirección IP")
+    parser.add_argument('-socket', type=str, default=SOCKET_PATH, help="Ruta del socket Unix")
+    parser.add_argument('-ring', type=str, default="", help="Publica las trazas en un buffer de memoria compartida con ese nombre")
+    parser.add_argument('-retries', type=int, default=8, help="Intentos de reconexión (y de cada captura) si se cae la sesión VISA")
+    parser.add_argument('-f32', action='store_true', help="Mantiene las muestras en float32 (decodificación, CSV y análisis)")
+    args = parser.parse_args()
+
+    os.makedirs("results", exist_ok=True)  # Directorio del log de mediciones
+    if args.f32:
+        binblock.set_dtype(np.float32)
+    profile_file = os.path.join("results", "latency_profile.json")
+    PROFILE.load(profile_file)
+    rm = pyvisa.ResourceManager()  # Crea un administrador de recursos para manejar conexiones VISA
+    ring = None
+    if args.ring:
+        ring = TraceRing(args.ring)
+        binblock.set_ring(ring)
+    daemon = AcquisitionDaemon(rm, args.ip, ring, args.retries)
+    try:
+        serve(daemon, args.socket)
+    finally:
+        PROFILE.save(profile_file)
+        daemon.close()
+        if ring is not None:
+            ring.close()
+        print("Conexión cerrada correctamente.")
+        logger("Demonio de adquisición detenido.\n_______________________________________________________________")
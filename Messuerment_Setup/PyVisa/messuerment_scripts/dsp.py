@@ -0,0 +1,186 @@
+# Procesamiento en el host (NumPy) de registros IQ crudos del RSA6114A.
+# A partir de un único registro IQ se obtienen Spectrum, Phase vs Time y Frequency vs Time,
+# sin pedirle al instrumento que calcule cada vista. Todas las funciones operan sobre el
+# último eje, de modo que una pila de capturas (capturas x muestras) se procesa de una vez.
+import glob      # Para buscar las capturas IQ de un directorio
+import json      # Encabezado de cada captura IQ (fs y frecuencia central)
+import os        #para armar rutas
+
+import numpy as np  # Para operaciones numéricas y manejo de arreglos
+import pandas as pd  # Para leer archivos CSV
+
+import binblock  # Tipo de dato de las muestras y guardado de CSV
+from compression import open_capture, capture_exists  # Lectura transparente de capturas comprimidas
+
+R_REF = 50.0  # Impedancia de referencia en ohm (P = (I² + Q²) / R)
+
+
+def complex_dtype():
+    """
+    Tipo complejo asociado a binblock.DTYPE (complex64 para float32, complex128 para float64).
+    """
+    return np.result_type(binblock.DTYPE, np.complex64)
+
+
+def iq_from_interleaved(data):
+    """
+    Convierte muestras intercaladas I(1) Q(1) I(2) Q(2)... (formato de :FETCh:RFIN:IQ?)
+    a un arreglo complejo sin copiar los datos.
+
+    Args:
+        data: Arreglo real de tamaño (..., 2 * n).
+    Returns:
+        Arreglo complejo de tamaño (..., n).
+    """
+    data = np.ascontiguousarray(data, dtype=binblock.DTYPE)
+    return data.view(complex_dtype())
+
+
+def spectrum(iq, fs, window='hann', nfft=None):
+    """
+    Espectro de potencia con ventana (FFT) de una o varias capturas.
+
+    Args:
+        iq: Arreglo complejo (..., n).
+        fs (float): Frecuencia de muestreo en Hz.
+        window (str): 'hann', 'blackman' o 'rect'.
+        nfft (int): Puntos de la FFT (por defecto n).
+    Returns:
+        tuple: (frecuencias relativas al centro en Hz, amplitud en dBm de tamaño (..., nfft)).
+    """
+    n = iq.shape[-1]
+    nfft = nfft or n
+    taper = {'hann': np.hanning, 'blackman': np.blackman, 'rect': np.ones}[window](n).astype(binblock.DTYPE)
+    spec = np.fft.fftshift(np.fft.fft(iq * taper, nfft, axis=-1), axes=-1)
+    # Normalización por la ganancia coherente de la ventana: un tono de amplitud A da |A|²/R
+    power = (spec.real ** 2 + spec.imag ** 2) / (taper.sum() ** 2 * R_REF)
+    amplitude_dbm = 10 * np.log10(np.maximum(power, 1e-30)) + 30
+    freqs = np.fft.fftshift(np.fft.fftfreq(nfft, 1 / fs))
+    return freqs, amplitude_dbm.astype(binblock.DTYPE)
+
+
+def phase_vs_time(iq):
+    """
+    Fase desenrollada en grados de una o varias capturas.
+
+    La fase se acumula en float64 (en float32 la suma de miles de saltos pierde precisión)
+    y se devuelve en binblock.DTYPE.
+    """
+    step = np.angle(iq[..., 1:] * np.conj(iq[..., :-1])).astype(np.float64)  # Salto de fase entre muestras
+    phase = np.empty(iq.shape, dtype=np.float64)
+    phase[..., 0] = np.angle(iq[..., 0])
+    phase[..., 1:] = phase[..., :1] + np.cumsum(step, axis=-1)
+    return np.degrees(phase).astype(binblock.DTYPE)
+
+
+def frequency_vs_time(iq, fs):
+    """
+    Frecuencia instantánea en Hz (relativa al centro) de una o varias capturas.
+
+    Se calcula con el discriminador angle(x[n] · conj(x[n-1])), que no necesita desenrollar
+    la fase. El resultado tiene una muestra menos que la entrada.
+    """
+    step = np.angle(iq[..., 1:] * np.conj(iq[..., :-1]))
+    return (step * (fs / (2 * np.pi))).astype(binblock.DTYPE)
+
+
+def sample_times(n, fs, scale=1.0):
+    """
+    Instantes de las n muestras de un registro IQ (k / fs), escalados y del tipo binblock.DTYPE.
+    """
+    return (np.arange(n) * (scale / fs)).astype(binblock.DTYPE)
+
+
+def derive_views(iq, fs, center=0.0, window='hann'):
+    """
+    Deriva las tres vistas de una o varias capturas IQ.
+
+    Args:
+        iq: Arreglo complejo (..., n).
+        fs (float): Frecuencia de muestreo en Hz.
+        center (float): Frecuencia central en Hz (se suma al eje del espectro; la frecuencia
+            instantánea queda relativa al centro, como la devuelve :FETCh:FVTime?).
+    Returns:
+        dict: 'Spectrum', 'PVTime' y 'Frequency' con sus columnas, listos para binblock.save_csv
+        (para una pila de capturas las columnas de datos son 2-D).
+    """
+    n = iq.shape[-1]
+    freqs, amplitude = spectrum(iq, fs, window)
+    time_ms = sample_times(n, fs, 1e3)
+    return {
+        'Spectrum': {'Frecuencia (Hz)': freqs + center, 'Amplitud (dBm)': amplitude},
+        'PVTime': {'Time (ms)': time_ms, 'Phase (º)': phase_vs_time(iq)},
+        'Frequency': {'frecuency (Hz)': frequency_vs_time(iq, fs), 'time (s)': time_ms[1:]},
+    }
+
+
+def header_path(path):
+    """
+    Archivo con el encabezado de una captura IQ ('IQ_<i>.csv' -> 'IQ_<i>_header.json').
+    """
+    return path[:-4] + '_header.json'
+
+
+def save_header(path, fs, center):
+    """
+    Guarda junto a la captura IQ la frecuencia de muestreo y la frecuencia central
+    (:FETCh:RFIN:IQ:HEADer?), que el CSV de I/Q no registra.
+    """
+    with open(header_path(path), 'w') as header_file:
+        json.dump({'fs': fs, 'center': center}, header_file)
+
+
+def load_header(path):
+    """
+    Encabezado guardado con save_header, o None si la captura no lo tiene.
+    """
+    try:
+        with open(header_path(path)) as header_file:
+            return json.load(header_file)
+    except (OSError, ValueError):
+        return None
+
+
+def derive_directory(directorio, center=None, overwrite=False):
+    """
+    Procesa en bloque todas las capturas 'IQ_<i>.csv' de un directorio y guarda sus vistas
+    derivadas ('IQ_<i>_Spectrum.csv', 'IQ_<i>_PVTime.csv', 'IQ_<i>_Frequency.csv').
+
+    La frecuencia central de cada captura se lee de su encabezado (save_header); center
+    solo se usa para capturas sin encabezado, y sin ninguno de los dos la captura se
+    saltea. Las vistas derivadas existentes se conservan salvo con overwrite.
+    Las capturas de igual longitud se apilan y se procesan con una sola llamada vectorizada.
+
+    Returns:
+        int: Capturas procesadas.
+    """
+    groups = {}  # (n, fs, center) -> lista de (ruta, iq)
+    # Rutas sin la extensión de compresión (una captura puede estar comprimiéndose)
+    paths = sorted({p[:p.index('.csv') + 4] for p in glob.glob(os.path.join(directorio, 'IQ_*.csv*'))})
+    for path in paths:
+        if not os.path.basename(path)[3:-4].isdigit():
+            continue  # Salta las vistas derivadas
+        if not overwrite and capture_exists(path[:-4] + '_Spectrum.csv'):
+            continue  # Ya derivada
+        header = load_header(path)
+        capture_center = header['center'] if header is not None else center
+        if capture_center is None:
+            print(f"Advertencia: '{path}' no tiene encabezado con la frecuencia central (use center)")
+            continue
+        with open_capture(path) as capture_file:
+            df = pd.read_csv(capture_file)
+        t = df['Time (s)'].to_numpy(dtype=np.float64)  # El eje temporal se lee en float64 para recuperar fs
+        fs = header['fs'] if header is not None else round((len(t) - 1) / (t[-1] - t[0]))
+        iq = np.empty(len(t), dtype=complex_dtype())
+        iq.real = df['I (V)'].to_numpy()
+        iq.imag = df['Q (V)'].to_numpy()
+        groups.setdefault((len(iq), fs, capture_center), []).append((path, iq))
+
+    for (n, fs, capture_center), captures in groups.items():
+        stack = np.stack([iq for _, iq in captures])  # capturas x muestras
+        views = derive_views(stack, fs, capture_center)
+        for k, (path, _) in enumerate(captures):
+            for name, columns in views.items():
+                row = {col: (val[k] if val.ndim == 2 else val) for col, val in columns.items()}
+                binblock.save_csv(path[:-4] + f'_{name}.csv', row)
+    return sum(len(captures) for captures in groups.values())
@@ -0,0 +1,75 @@
+# Bitácora (journal) de la campaña: archivo CSV de solo agregado con cada captura realizada.
+# Permite reanudar una campaña interrumpida (-resume) sin repetir las capturas ya hechas.
+import datetime  # Para obtener la fecha y hora actual
+import os        #para armar rutas
+
+JOURNAL_NAME = "journal.csv"
+HEADER = "timestamp,view,number,status,detail\n"
+
+
+def journal_path(directorio):
+    """
+    Ruta del journal dentro del directorio de resultados.
+    """
+    return os.path.join(directorio, JOURNAL_NAME)
+
+
+def append(path, view, number, status, detail=""):
+    """
+    Agrega una línea al journal y la fuerza a disco, para que sobreviva a un corte.
+
+    Args:
+        path (str): Ruta del journal.
+        view (str): Nombre de la view ("-" para marcas de campaña).
+        number (int): Número de captura de la view.
+        status (str): "ok", "error" o "inicio" (comienzo de una campaña nueva).
+        detail (str): Retorno de la view o comentario.
+    """
+    new_file = not os.path.exists(path)
+    timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    detail = str(detail).replace('"', "'").replace("\n", " ")
+    with open(path, "a") as journal_file:
+        if new_file:
+            journal_file.write(HEADER)
+        journal_file.write(f'{timestamp},{view},{number},{status},"{detail}"\n')
+        journal_file.flush()
+        os.fsync(journal_file.fileno())
+
+
+def load_progress(path):
+    """
+    Lee el journal y devuelve las capturas completadas por view desde la última marca de
+    inicio de campaña.
+
+    Returns:
+        dict: Nombre de view -> número de capturas completadas ("ok").
+    """
+    progress = {}
+    if not os.path.exists(path):
+        return progress
+    with open(path) as journal_file:
+        next(journal_file, None)  # Encabezado
+        for line in journal_file:
+            fields = line.rstrip("\n").split(",", 4)
+            if len(fields) < 4:
+                continue  # Línea incompleta (corte durante la escritura)
+            _, view, _, status = fields[:4]
+            if status == "inicio":
+                progress = {}
+            elif status == "ok":
+                progress[view] = progress.get(view, 0) + 1
+    return progress
+
+
+def remaining_schedule(schedule, progress):
+    """
+    Quita del plan las primeras capturas de cada view ya registradas como completadas.
+    """
+    done = dict(progress)
+    remaining = []
+    for view in schedule:
+        if done.get(view["name"], 0) > 0:
+            done[view["name"]] -= 1
+        else:
+            remaining.append(view)
+    return remaining
@@ -0,0 +1,164 @@
+# Timeouts por operación aprendidos de las latencias observadas.
+# En lugar de un único instrument.timeout para todo (de *IDN? a un fetch de DPX con 50
+# promedios), cada operación usa p99 de sus latencias recientes x FACTOR. Las consultas
+# idempotentes se reintentan con espera exponencial.
+import json      # Para guardar el perfil de latencias
+import os        #para verificar si existe el perfil
+import time  # Para medir latencias
+from collections import deque  # Ventana móvil de latencias
+
+import pyvisa  # Para identificar los errores de VISA
+
+import transfer  # Verificación de los bloques recibidos
+
+FACTOR = 5.0  # Margen sobre el p99 observado
+MIN_SAMPLES = 20  # Muestras necesarias antes de confiar en el perfil
+MIN_TIMEOUT_MS = 200  # Piso del timeout aprendido
+WINDOW = 200  # Tamaño de la ventana móvil por operación
+RETRIES = 2  # Reintentos de las consultas idempotentes
+BACKOFF = 0.5  # Espera inicial entre reintentos en segundos (se duplica)
+WAIT_COMMANDS = (':INITiate:IMMediate', '*WAI')  # Disparo y espera: duran lo que la adquisición
+
+
+class LatencyProfile:
+    """
+    Perfil de latencias por clase de operación (ventana móvil de segundos y bytes).
+    """
+
+    def __init__(self, default_ms=12000):
+        self.default_ms = default_ms  # Timeout global: se usa hasta tener MIN_SAMPLES
+        self.samples = {}  # operación -> deque de (segundos, bytes)
+
+    def record(self, op, seconds, nbytes=0):
+        """
+        Registra la duración (y el tamaño transferido) de una operación.
+        """
+        self.samples.setdefault(op, deque(maxlen=WINDOW)).append((seconds, nbytes))
+
+    def percentile(self, op, q=99):
+        """
+        Percentil q de las latencias de la operación en segundos (None si no hay datos).
+        """
+        values = sorted(s for s, _ in self.samples.get(op, ()))
+        if not values:
+            return None
+        return values[min(len(values) - 1, int(round(q / 100 * (len(values) - 1))))]
+
+    def timeout_ms(self, op):
+        """
+        Timeout para la operación: p99 x FACTOR, entre MIN_TIMEOUT_MS y el timeout global.
+        """
+        if len(self.samples.get(op, ())) < MIN_SAMPLES:
+            return self.default_ms
+        return int(min(self.default_ms, max(MIN_TIMEOUT_MS, self.percentile(op) * FACTOR * 1000)))
+
+    def transfer_rate(self, op):
+        """
+        Tasa de transferencia media de la operación en bytes/s (None si no hay datos).
+        """
+        samples = self.samples.get(op, ())
+        seconds = sum(s for s, _ in samples)
+        nbytes = sum(b for _, b in samples)
+        return nbytes / seconds if seconds > 0 and nbytes > 0 else None
+
+    def save(self, path):
+        """
+        Guarda el perfil en JSON para que la próxima campaña arranque con lo aprendido.
+        """
+        data = {op: [list(sample) for sample in samples] for op, samples in self.samples.items()}
+        with open(path, "w") as profile_file:
+            json.dump({"default_ms": self.default_ms, "samples": data}, profile_file)
+
+    def load(self, path):
+        """
+        Carga un perfil guardado con save() (si existe).
+        """
+        if not os.path.exists(path):
+            return
+        with open(path) as profile_file:
+            data = json.load(profile_file)
+        for op, samples in data.get("samples", {}).items():
+            self.samples[op] = deque((tuple(sample) for sample in samples), maxlen=WINDOW)
+
+
+PROFILE = LatencyProfile()  # Perfil compartido por todas las funciones del script
+
+
+def op_class(command):
+    """
+    Clase de operación de un comando: la consulta sin argumentos (':FETCh:PHVTime',
+    '*OPC', ':SYSTem:ERRor'...).
+    """
+    return command.split('?')[0].split(' ')[0].strip()
+
+
+def opc_class(command, context=None):
+    """
+    Clase de operación del *OPC? que sigue a un comando. El disparo y la espera duran lo
+    que la adquisición de la view (un DPX de 50 promedios frente a un PVT simple), así que
+    su clase incluye el contexto (el CSV de configuración).
+    """
+    op = op_class(command)
+    if context and op in WAIT_COMMANDS:
+        return f"*OPC {op} [{context}]"
+    return f"*OPC {op}"
+
+
+def _timed(instrument, op, action, idempotent):
+    """
+    Ejecuta action() con el timeout de la operación, registra la latencia y reintenta
+    (solo si es idempotente) cuando vence el timeout.
+    """
+    previous_timeout = instrument.timeout
+    delay = BACKOFF
+    attempts = RETRIES + 1 if idempotent else 1
+    try:
+        for attempt in range(attempts):
+            # Cada reintento duplica el timeout; el último usa al menos el timeout global
+            instrument.timeout = PROFILE.timeout_ms(op) * 2 ** attempt
+            if attempt == attempts - 1 and attempt > 0:
+                instrument.timeout = max(instrument.timeout, PROFILE.default_ms)
+            start = time.perf_counter()
+            try:
+                result = action()
+            except pyvisa.errors.VisaIOError as e:
+                if e.error_code != pyvisa.constants.StatusCode.error_timeout or attempt == attempts - 1:
+                    raise
+                print(f"Timeout en {op} ({instrument.timeout} ms), reintentando en {delay:.1f} s")
+                try:
+                    instrument.clear()  # Descarta la respuesta pendiente antes de reintentar
+                except Exception:
+                    pass
+                time.sleep(delay)
+                delay *= 2
+                continue
+            PROFILE.record(op, time.perf_counter() - start, len(result))
+            return result
+    finally:
+        instrument.timeout = previous_timeout
+
+
+def timed_query(instrument, query, op=None, idempotent=True):
+    """
+    instrument.query() con timeout adaptativo.
+
+    Args:
+        instrument: Objeto de conexión al instrumento.
+        query (str): Consulta SCPI.
+        op (str): Clase de operación (por defecto op_class(query)).
+        idempotent (bool): Si True, se reintenta ante un timeout.
+    """
+    return _timed(instrument, op or op_class(query), lambda: instrument.query(query), idempotent)
+
+
+def timed_fetch(instrument, query, op=None):
+    """
+    Envía una consulta de datos y lee la respuesta binaria con timeout adaptativo.
+    Las consultas :FETCh no disparan una adquisición nueva, así que se pueden reintentar.
+    """
+    def action():
+        instrument.write(query)
+        return instrument.read_raw()
+    raw_response = _timed(instrument, op or op_class(query), action, True)
+    transfer.verify(query, raw_response)  # Binario, float32 little endian y puntos negociados
+    return raw_response
@@ -11,24 +11,46 @@ import datetime  # Para obtener la fecha y hora actual
 
 # --- Importación de funciones views ---
 from config_functions import logger
-from config_functions import send_command
 from config_functions import DPX
 from config_functions import PVT
 from config_functions import TimeOverview
 from config_functions import Pulse_Trace
 from config_functions import Spectrum
 from config_functions import frequency
+from config_functions import Multi
+from config_functions import IQ
+from config_functions import Averaged
+import transfer  # Puntos de traza negociados por view
+import binblock  # Tipo de dato de las muestras (float32/float64)
+from scheduler import build_schedule, print_plan  # Orden de capturas y duración prevista
+from streaming import stream, STREAM_VIEWS  # Adquisición continua
+from session import open_session, is_alive, reconnect  # Conexión y reconexión VISA
+import journal  # Bitácora de capturas para reanudar campañas
+from latency import PROFILE  # Perfil de latencias (timeouts adaptativos)
+from compression import BackgroundCompressor, CODECS  # Compresión de capturas en segundo plano
+from planner import apply_estimates, print_dry_run  # Estimación de la campaña en seco
+from monitor import Monitor  # Monitoreo en vivo desde el navegador
+from trace_ring import TraceRing  # Reparto de trazas en memoria compartida
+from daemon import DaemonClient  # Capturas a través del demonio de adquisición
+from scpi_trace import RecordingResourceManager, ReplayResourceManager  # Grabación y reproducción de sesiones
 #from pr import Ejemplo_funcion
 
 # --- Lista de views con sus parámetros ---
 # Cada view tiene un nombre, estado, número de repeticiones, directorio y función a ejecutar
+# Claves opcionales para el planificador: "block" (máximo de capturas consecutivas),
+# "interval" (segundos mínimos entre capturas), "t_config" y "t_capture" (tiempos estimados)
+# Clave opcional "points": puntos de traza que necesita el análisis (int, o dict medición ->
+# puntos); se fijan y verifican al configurar la view (ver transfer.py)
 views = [
     {"name": "DPX", "state": False, "repet": 1,"plot":False,"funtion":DPX,"dir":"dir","executed":1},
-    {"name": "PVT", "state": True, "repet": 10,"plot":False,"funtion":PVT,"dir":"dir","executed":1},
-    {"name": "TimeOverview", "state": False, "repet": 20,"plot":False,"funtion":TimeOverview,"dir":"dir","executed":1},
+    {"name": "PVT", "state": True, "repet": 10,"points":1000,"plot":False,"funtion":PVT,"dir":"dir","executed":1},
+    {"name": "TimeOverview", "state": False, "repet": 20,"points":1000,"plot":False,"funtion":TimeOverview,"dir":"dir","executed":1},
     {"name": "Pulse_Trace", "state": False, "repet": 20,"plot":False,"funtion":Pulse_Trace,"dir":"dir","executed":1},
-    {"name": "Spectrum", "state": True, "repet": 10,"plot":False,"funtion":Spectrum,"dir":"dir","executed":1},
-    {"name": "frequency", "state": False, "repet": 20,"plot":False,"funtion":frequency,"dir":"dir","executed":1},
+    {"name": "Spectrum", "state": True, "repet": 10,"points":801,"plot":False,"funtion":Spectrum,"dir":"dir","executed":1},
+    {"name": "frequency", "state": False, "repet": 20,"points":1000,"plot":False,"funtion":frequency,"dir":"dir","executed":1},
+    {"name": "Multi", "state": False, "repet": 10,"points":{"PHVTime": 1000, "FVTime": 1000, "SPECtrum": 801},"plot":False,"funtion":Multi,"dir":"dir","executed":1},
+    {"name": "IQ", "state": False, "repet": 10,"plot":False,"funtion":IQ,"dir":"dir","executed":1},
+    {"name": "Averaged", "state": False, "repet": 1,"points":801,"plot":False,"funtion":Averaged,"dir":"dir","executed":1},
 ]
 
 
@@ -40,15 +62,54 @@ parser.add_argument('-dir', type=str, default="results", help="Directorio de res
 parser.add_argument('-case', type=str, default="none", help="Ejecutar caso unico Ejemplo: -case DPX")
 parser.add_argument('-l', action='store_true', help="Listar los parámetros de ejecución")
 parser.add_argument('-w', type=int, default="5", help="delay para cada medicion")
+parser.add_argument('-rr', action='store_true', help="Orden round-robin original (reconfigura en cada captura)")
+parser.add_argument('-stream', type=str, default="none", choices=["none"] + list(STREAM_VIEWS), help="Adquisición continua de una view Ejemplo: -stream PVT")
+parser.add_argument('-t', type=float, default=60, help="Duración del streaming en segundos")
+parser.add_argument('-resume', action='store_true', help="Reanuda la campaña interrumpida según el journal del directorio")
+parser.add_argument('-retries', type=int, default=8, help="Intentos de reconexión (y de cada captura) si se cae la sesión VISA")
+parser.add_argument('-compress', type=str, default="none", choices=["none"] + list(CODECS), help="Comprime los CSV en segundo plano Ejemplo: -compress zlib")
+parser.add_argument('-f32', action='store_true', help="Mantiene las muestras en float32 (decodificación, CSV y análisis)")
+parser.add_argument('-dry', action='store_true', help="Estima duración y volumen de datos de la campaña sin conectarse al instrumento")
+parser.add_argument('-record', type=str, default="", help="Graba la sesión SCPI en un archivo de traza Ejemplo: -record sesion.scpi.gz")
+parser.add_argument('-replay', type=str, default="", help="Reproduce una traza grabada en lugar de conectarse al instrumento")
+parser.add_argument('-speed', type=float, default=1.0, help="Velocidad de reproducción (1 = grabada, 0 = sin esperas)")
+parser.add_argument('-ring', type=str, default="", help="Publica las trazas en un buffer de memoria compartida con ese nombre Ejemplo: -ring rsa_traces")
+parser.add_argument('-daemon', type=str, default="", help="Envía las capturas al demonio de adquisición en ese socket Ejemplo: -daemon /tmp/rsa6114a.sock")
+parser.add_argument('-monitor', type=int, default=0, help="Puerto del monitoreo HTTP local (0 = desactivado) Ejemplo: -monitor 8050")
 # Parsear los argumentos
 args = parser.parse_args()
+if args.daemon and args.stream != "none":
+    parser.error("-stream necesita la conexión directa al instrumento (sin -daemon)")
+if args.daemon and (args.compress != "none" or args.monitor or args.ring or args.f32):
+    parser.error("-compress, -monitor, -ring y -f32 no tienen efecto con -daemon (el demonio guarda las capturas; -ring y -f32 van en daemon.py)")
 # Asignar los valores
 ip = args.ip
 wait = args.w
+if args.f32:
+    binblock.set_dtype(np.float32)  # Evita duplicar memoria convirtiendo a float64
+compressor = None
+if args.compress != "none" and not (args.l or args.dry):
+    compressor = BackgroundCompressor(args.compress)
+    binblock.set_compressor(compressor)
+monitor = None
+if args.monitor and not (args.l or args.dry):
+    monitor = Monitor(args.monitor)
+    monitor.start()
+    binblock.set_monitor(monitor)
+ring = None
+if args.ring and not (args.l or args.dry):
+    ring = TraceRing(args.ring)
+    binblock.set_ring(ring)
 
 # --- Configuración inicial de la conexión al instrumento ---
 rm = pyvisa.ResourceManager()  # Crea un administrador de recursos para manejar conexiones VISA
+if args.replay:
+    rm.close()
+    rm = ReplayResourceManager(args.replay, args.speed)  # Responde con la traza grabada
+elif args.record and not (args.l or args.dry):
+    rm = RecordingResourceManager(rm, args.record)  # Graba todo lo que pasa por la sesión
 instrument = None  # Variable para almacenar la conexión al instrumento (inicialmente None)
+client = None  # Cliente del demonio de adquisición (-daemon)
 
 # Asignar el directorio de resultados
 for view in views:
@@ -70,6 +131,7 @@ print("Mediciones automaticas con PyVISA en Tecktronix RSA6114A")
 print("_______________________________________________________________\n")
 print("Paramtros script:\n")
 print(f"\t -IP: {ip}\n")
+print(f"\t -Tipo de dato: {np.dtype(binblock.DTYPE).name}\n")
 for view in views:
     print(f"\t -Mensurement view: {view['name']}")
     print(f"\t\t -Estado: {view['state']}")
@@ -77,9 +139,25 @@ for view in views:
     print(f"\t\t -Directorio: {view['dir']}")
     print(f"\t\t -Plot: {view['plot']}\n")
 print("_______________________________________________________________\n")
+schedule = build_schedule(views, round_robin=args.rr)  # Agrupa repeticiones para minimizar cambios de view
+journal_file = journal.journal_path(args.dir)
+if args.resume:
+    # Descarta las capturas ya completadas y continúa la numeración de cada view
+    progress = journal.load_progress(journal_file)
+    schedule = journal.remaining_schedule(schedule, progress)
+    for view in views:
+        view["executed"] += min(progress.get(view["name"], 0), view["repet"])
+    print(f"Reanudando campaña: {progress}\n")
+profile_file = os.path.join(args.dir, "latency_profile.json")
+PROFILE.load(profile_file)  # Latencias aprendidas en campañas anteriores
+apply_estimates(views, PROFILE)  # Tiempos de configuración y captura compilados de los CSV
+print_plan(views, schedule, wait)
+if args.dry:
+    print_dry_run(views, schedule, wait, PROFILE)
+print("_______________________________________________________________\n")
 
 try:
-    if not(args.l): #si se usa el flag -l solo se lista los parametros
+    if not(args.l or args.dry): #si se usa el flag -l o -dry solo se listan los parametros
         # Crear directorios si no existen
         print("Creando directorios...")
         for dir in views:
@@ -95,34 +173,77 @@ try:
         logger("Nueva medición iniciada.\n\n\n")
 
         # --- Establece conexión con el analizador de espectro Tektronix RSA6114A ---
-        instrument = rm.open_resource('TCPIP0::' + ip + '::INSTR')  # Conecta al instrumento vía TCP/IP
-        instrument.timeout = 12000  # Establece un timeout largo (250 segundos) para operaciones lentas
-        send_command(instrument, '*CLS')  # Limpia el estado del instrumento
-        send_command(instrument, '*IDN?', wait_opc=False)  # Solicita la identificación del instrumento
-        idn = instrument.read().strip()  # Lee y muestra la identificación (por ejemplo, TEKTRONIX,RSA6114A)
-        print(f"Identificación del instrumento: {idn}")
-        logger(f"Conexión establecida con instrumento ID:{idn}")
-        send_command(instrument, ':INITiate:CONTinuous OFF')  # Desactiva el modo continuo para tomar mediciones únicas
-        error_status = instrument.query(':SYSTem:ERRor?').strip()  # Verifica si hay errores después del comando
-        print(f"Estado después de :INITiate:CONTinuous OFF: {error_status}")
+        if args.daemon:
+            client = DaemonClient(args.daemon)  # El demonio ya tiene la sesión abierta
+            print(f"Usando el demonio de adquisición en {args.daemon}")
+        else:
+            instrument = open_session(rm, ip)
+        if not args.resume and args.stream == "none":
+            journal.append(journal_file, "-", 0, "inicio", "Nueva campaña")  # Marca de comienzo de campaña
 
         print("_______________________________________________________________\n")
-        # Ejecutar el bucle de mediciones
-        repet = True
-        while repet:
-            repet = False
-            # Ejecutar las mediciones
-            for view in views:
-                if(view["state"] and view["executed"] <= view["repet"]):
-                    time.sleep(wait)  # Espera un tiempo
-                    logger((f"Medida: {view['name']} - Número: {view['executed'] - 1}"))
-                    print(f"Ejecutando mediciones {view['name']}...({view['executed']} de {view['repet']})")
-                    view['executed'] += 1
-                    repet = True
-                    retorno = view["funtion"](instrument, view['dir'], view['plot'])  # llamado a la función
-
-                    logger(f"{retorno}\n_______________________________________________________________") #loggea el retorno de la función
-                    print(f"{retorno}\n_______________________________________________________________\n")
+        if args.stream != "none":
+            # Modo continuo: una sola configuración y lectura de resultados durante -t segundos
+            retorno = stream(instrument, args.stream, args.dir + "/" + args.stream, duration=args.t)
+            logger(f"{retorno}\n_______________________________________________________________")
+            print(f"{retorno}\n_______________________________________________________________\n")
+            schedule = []  # No se ejecuta el plan de capturas simples
+
+        # Ejecutar el bucle de mediciones en el orden del planificador
+        previous = None  # View de la captura anterior
+        last_capture = {}  # Instante de la última captura de cada view (restricción "interval")
+        for view in schedule:
+            configure = view is not previous  # Solo se reconfigura al cambiar de view
+            if configure:
+                time.sleep(wait)  # Espera un tiempo
+            elif view["name"] in last_capture:
+                pending = view.get("interval", 0) - (time.time() - last_capture[view["name"]])
+                if pending > 0:
+                    time.sleep(pending)  # Respeta la tasa máxima de la view
+            logger((f"Medida: {view['name']} - Número: {view['executed'] - 1}"))
+            print(f"Ejecutando mediciones {view['name']}...({view['executed']} de {view['repet']})")
+            last_capture[view["name"]] = time.time()
+            capture_start = time.perf_counter()
+            transfer.set_resolution(view.get("points"))  # Resolución que necesita el análisis de la view
+            saved = binblock.SAVED  # Archivos guardados antes de la captura
+            response = {}
+            attempt = 1
+            while True:
+                try:
+                    if client is not None:
+                        # El demonio serializa los trabajos, reconecta si se cae la sesión y decide
+                        # si reconfigura (otro cliente pudo configurar otra view en el medio)
+                        response = client.capture(view['name'], view['dir'], configure=None, points=view.get("points"))
+                        retorno = (response.get("results") or [f"Error en {view['name']}: {response.get('error')}"])[0]
+                        break
+                    retorno = view["funtion"](instrument, view['dir'], view['plot'], configure=configure)  # llamado a la función
+                except Exception as e:
+                    retorno = f"Error en {view['name']}: {e}"
+                    if client is not None:
+                        break
+                if retorno.startswith("Medicion Exitosa") or is_alive(instrument):
+                    break
+                if attempt >= args.retries:
+                    retorno = f"Error en {view['name']}: captura fallida después de {attempt} intentos ({retorno})"
+                    break
+                # La sesión VISA se cayó: reconecta y repite la captura reconfigurando solo esta view
+                logger(f"Sesión perdida durante {view['name']}: {retorno}")
+                instrument = reconnect(rm, ip, instrument, retries=args.retries)
+                configure = True
+                attempt += 1
+            # La captura cuenta como hecha solo si dejó al menos un archivo guardado
+            stored = response.get("files") if client is not None else binblock.SAVED > saved
+            if retorno.startswith("Medicion Exitosa") and not stored:
+                retorno = f"Error en {view['name']}: la captura no guardó ningún archivo"
+            status = "ok" if retorno.startswith("Medicion Exitosa") else "error"
+            if monitor is not None:
+                monitor.capture_done(view['name'], status == "ok", time.perf_counter() - capture_start)
+            journal.append(journal_file, view['name'], view['executed'], status, retorno)
+            view['executed'] += 1
+            previous = view if status == "ok" else None  # Tras un error la próxima captura reconfigura
+
+            logger(f"{retorno}\n_______________________________________________________________") #loggea el retorno de la función
+            print(f"{retorno}\n_______________________________________________________________\n")
 
 except Exception as e: # Captura cualquier excepción que ocurra durante la ejecución
     print("_______________________________________________________________\n")
@@ -132,9 +253,19 @@ except Exception as e: # Captura cualquier excepción que ocurra durante la ejec
 
 finally:
     time.sleep(wait)  # Espera un tiempo
+    if not (args.l or args.dry):
+        PROFILE.save(os.path.join(args.dir, "latency_profile.json"))  # Guarda el perfil de latencias
+    if compressor is not None:
+        compressor.close()  # Termina de comprimir las capturas pendientes
+    if monitor is not None:
+        monitor.close()  # Detiene el servidor de monitoreo
+    if ring is not None:
+        ring.close()  # Elimina el segmento de memoria compartida
     # Cierra la conexión al instrumento y libera recursos
     if instrument is not None:
         instrument.close()  # Cierra la conexión al instrumento
+    if client is not None:
+        client.close()  # La sesión sigue abierta en el demonio
     rm.close()  # Cierra el administrador de recursos
     print("Conexión cerrada correctamente.")
     logger("Conexión cerrada correctamente.\n_______________________________________________________________")
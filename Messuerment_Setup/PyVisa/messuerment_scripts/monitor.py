@@ -0,0 +1,217 @@
+# Monitoreo en vivo de la campaña desde el navegador.
+# Servidor HTTP local (biblioteca estándar, en un hilo aparte) que publica la última traza
+# diezmada de cada view, los contadores de capturas, capturas/s y las latencias por etapa.
+# Los datos se empujan con Server-Sent Events (/events), que el navegador consume sin
+# dependencias; /metrics y /traces devuelven lo mismo en JSON. Reemplaza plot=True, que
+# bloquea el bucle de adquisición en ploter().
+import json      # Respuestas del servidor
+import os        #para obtener el nombre de la view desde la ruta
+import threading  # Hilo del servidor y acceso concurrente al estado
+import time  # Para capturas/s y el intervalo de los eventos
+from collections import deque  # Instantes de las capturas recientes
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer  # Servidor HTTP
+
+import numpy as np  # Para el diezmado de las trazas
+
+from latency import PROFILE  # Latencias por operación
+from trace_accumulator import ACCUMULATORS  # Promedios en curso
+
+DECIMATE_POINTS = 1000  # Puntos por traza publicada
+EVENT_INTERVAL = 1.0  # Segundos entre eventos
+RATE_WINDOW = 60.0  # Ventana de capturas/s recientes en segundos
+X_PREFIXES = ('time', 'tiempo', 'frecuencia')  # Columnas que se usan como eje x
+
+PAGE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>RSA6114A - monitoreo</title>
+<style>body{font-family:sans-serif;margin:1em}svg{border:1px solid #ccc;background:#fafafa}
+td,th{padding:2px 8px;text-align:right}</style></head>
+<body><h2>Mediciones RSA6114A</h2><div id="metrics"></div><div id="traces"></div>
+<script>
+const traces = {};
+function draw(name, t) {
+  let div = document.getElementById('tr_' + name);
+  if (!div) { div = document.createElement('div'); div.id = 'tr_' + name;
+    document.getElementById('traces').appendChild(div); }
+  const W = 900, H = 220, x = t.x, y = t.y.map(v => v === null ? NaN : v);
+  const fin = y.filter(Number.isFinite), x0 = x[0], x1 = x[x.length - 1];
+  const y0 = Math.min(...fin), y1 = Math.max(...fin);
+  const pts = x.map((v, i) => Number.isFinite(y[i]) ? ((v - x0) / (x1 - x0 || 1) * W).toFixed(1) + ',' +
+    (H - (y[i] - y0) / (y1 - y0 || 1) * H).toFixed(1) : '').filter(p => p).join(' ');
+  div.innerHTML = `<h4>${name}: ${t.file} (${t.y_label}, ${y0.toFixed(2)} .. ${y1.toFixed(2)})</h4>
+    <svg width="${W}" height="${H}"><polyline fill="none" stroke="#1565c0" points="${pts}"/></svg>`;
+}
+function table(m) {
+  let h = `<p>Capturas: ${m.captures} (${m.errors} errores) - ${m.rate.toFixed(3)} capturas/s
+    (últimos 60 s: ${m.recent_rate.toFixed(3)}) - ${m.elapsed.toFixed(0)} s</p>
+    <table><tr><th>View</th><th>Capturas</th><th>Errores</th><th>Última (s)</th><th>Media (s)</th></tr>`;
+  for (const [v, c] of Object.entries(m.views)) h += `<tr><td>${v}</td><td>${c.captures}</td><td>${c.errors}</td>
+    <td>${c.last_s.toFixed(2)}</td><td>${c.mean_s.toFixed(2)}</td></tr>`;
+  h += '</table><table><tr><th>Operación</th><th>n</th><th>p50 (ms)</th><th>p99 (ms)</th></tr>';
+  for (const [op, s] of Object.entries(m.latency)) h += `<tr><td>${op}</td><td>${s.n}</td>
+    <td>${s.p50_ms.toFixed(1)}</td><td>${s.p99_ms.toFixed(1)}</td></tr>`;
+  document.getElementById('metrics').innerHTML = h + '</table>';
+}
+const es = new EventSource('/events');
+es.onmessage = e => { const d = JSON.parse(e.data); table(d.metrics);
+  for (const [name, t] of Object.entries(d.traces)) draw(name, t); };
+</script></body></html>
+"""
+
+
+def decimate(x, y, points=DECIMATE_POINTS):
+    """
+    Diezmado min/max: conserva el mínimo y el máximo de cada grupo (no se pierden los picos).
+
+    Returns:
+        tuple: (x, y) con a lo sumo points muestras.
+    """
+    n = len(y)
+    if n <= points:
+        return x, y
+    k = int(np.ceil(n / (points // 2)))  # Muestras por grupo
+    m = n // k * k
+    xb, yb = x[:m].reshape(-1, k), y[:m].reshape(-1, k)
+    rows = np.arange(len(yb))[:, np.newaxis]
+    i_min, i_max = np.nanargmin(yb, axis=1), np.nanargmax(yb, axis=1)
+    order = np.sort(np.column_stack([i_min, i_max]), axis=1)  # Mantiene el orden temporal
+    return xb[rows, order].ravel(), yb[rows, order].ravel()
+
+
+class Monitor:
+    """
+    Estado publicado por el servidor de monitoreo.
+    """
+
+    def __init__(self, port=8050, host='127.0.0.1', points=DECIMATE_POINTS):
+        self.address = (host, port)
+        self.points = points
+        self.lock = threading.Lock()
+        self.start_time = time.time()
+        self.traces = {}  # view -> última traza diezmada
+        self.version = 0  # Se incrementa con cada traza publicada
+        self.views = {}  # view -> contadores
+        self.recent = deque()  # Instantes de las capturas de la ventana RATE_WINDOW
+        self.server = None
+
+    def start(self):
+        """
+        Arranca el servidor en un hilo daemon.
+        """
+        monitor = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass  # Sin registro por consola de cada pedido
+
+            def _send(self, body, content_type):
+                data = body.encode()
+                self.send_response(200)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                if self.path == '/':
+                    self._send(PAGE, 'text/html; charset=utf-8')
+                elif self.path == '/metrics':
+                    self._send(json.dumps(monitor.metrics()), 'application/json')
+                elif self.path == '/traces':
+                    self._send(json.dumps(monitor.traces_since(-1)[0]), 'application/json')
+                elif self.path == '/events':
+                    self.send_response(200)
+                    self.send_header('Content-Type', 'text/event-stream')
+                    self.send_header('Cache-Control', 'no-cache')
+                    self.end_headers()
+                    seen = -1
+                    try:
+                        while True:
+                            traces, seen = monitor.traces_since(seen)
+                            payload = json.dumps({'metrics': monitor.metrics(), 'traces': traces})
+                            self.wfile.write(f"data: {payload}\n\n".encode())
+                            self.wfile.flush()
+                            time.sleep(EVENT_INTERVAL)
+                    except (BrokenPipeError, ConnectionResetError):
+                        pass  # El navegador cerró la conexión
+                else:
+                    self.send_error(404)
+
+        self.server = ThreadingHTTPServer(self.address, Handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        print(f"Monitoreo en http://{self.address[0]}:{self.server.server_address[1]}/")
+
+    def publish(self, output_path, columns):
+        """
+        Guarda la traza diezmada de una captura (se llama desde binblock.save_csv).
+        """
+        names = list(columns)
+        x_name = next((c for c in names if c.lower().startswith(X_PREFIXES)), names[0])
+        y_name = next((c for c in names if c != x_name), x_name)
+        x, y = decimate(np.asarray(columns[x_name], dtype=np.float64),
+                        np.asarray(columns[y_name], dtype=np.float64), self.points)
+        view = os.path.basename(os.path.dirname(output_path)) or 'captura'
+        trace = {'file': os.path.basename(output_path), 'x_label': x_name, 'y_label': y_name,
+                 'x': [float(v) for v in x], 'y': [float(v) if np.isfinite(v) else None for v in y]}
+        with self.lock:
+            self.version += 1
+            trace['version'] = self.version
+            self.traces[view] = trace
+
+    def capture_done(self, view, ok, seconds):
+        """
+        Registra una captura terminada (exitosa o no) y su duración.
+        """
+        now = time.time()
+        with self.lock:
+            counters = self.views.setdefault(view, {'captures': 0, 'errors': 0, 'last_s': 0.0, 'total_s': 0.0})
+            counters['captures'] += 1
+            counters['errors'] += 0 if ok else 1
+            counters['last_s'] = seconds
+            counters['total_s'] += seconds
+            self.recent.append(now)
+            while self.recent and now - self.recent[0] > RATE_WINDOW:
+                self.recent.popleft()
+
+    def traces_since(self, version):
+        """
+        Trazas publicadas después de version y la versión actual.
+        """
+        with self.lock:
+            return {v: t for v, t in self.traces.items() if t['version'] > version}, self.version
+
+    def metrics(self):
+        """
+        Contadores, capturas/s, latencias por etapa y promedios en curso.
+        """
+        now = time.time()
+        elapsed = now - self.start_time
+        with self.lock:
+            views = {v: {'captures': c['captures'], 'errors': c['errors'], 'last_s': c['last_s'],
+                         'mean_s': c['total_s'] / c['captures']} for v, c in self.views.items()}
+            recent = sum(1 for t in self.recent if now - t <= RATE_WINDOW)
+        captures = sum(c['captures'] for c in views.values())
+        latency = {}
+        for op in list(PROFILE.samples):
+            try:
+                n = len(PROFILE.samples[op])
+                latency[op] = {'n': n, 'p50_ms': 1e3 * PROFILE.percentile(op, 50),
+                               'p99_ms': 1e3 * PROFILE.percentile(op, 99)}
+            except (RuntimeError, TypeError):
+                continue  # La ventana cambió mientras se leía: se muestra en el próximo evento
+        return {
+            'elapsed': elapsed,
+            'captures': captures,
+            'errors': sum(c['errors'] for c in views.values()),
+            'rate': captures / elapsed if elapsed > 0 else 0.0,
+            'recent_rate': recent / min(elapsed, RATE_WINDOW) if elapsed > 0 else 0.0,
+            'views': views,
+            'latency': latency,
+            'accumulators': {name: {'count': acc.count, 'last_change_db': float(min(acc.last_change_db, 1e9))}
+                             for name, acc in list(ACCUMULATORS.items())},
+        }
+
+    def close(self):
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
@@ -0,0 +1,190 @@
+# Planificador de campañas en seco (dry-run): estima duración y volumen de datos sin
+# conectarse al instrumento.
+# Compila el CSV de configuración de cada view habilitada (o sus comandos fijos) y suma:
+# los Delay explícitos, el retardo de send_command y la espera de *OPC? de cada comando,
+# las consultas de verificación, los fetch (tamaño / tasa de transferencia medida) y las
+# esperas `wait` entre views. Las latencias y tasas salen del perfil guardado por las
+# campañas anteriores (latency_profile.json); sin datos se usan valores nominales.
+import pandas as pd  # Para leer los CSV de configuración
+
+from latency import op_class, opc_class  # Clases de operación del perfil de latencias
+from scheduler import estimate_duration, format_duration  # Duración total del orden de capturas
+from transfer import POINTS_COMMANDS, points_setting, requested  # Puntos de traza negociados
+
+SEND_DELAY = 0.1  # Retardo fijo de send_command (argumento delay)
+DEFAULT_QUERY = 0.05  # Latencia nominal de una consulta corta (*OPC?, :SYSTem:ERRor?) en s
+DEFAULT_RATE = 1e6  # Tasa de transferencia nominal en bytes/s
+TEXT_BYTES = 100  # Tamaño de una respuesta de texto
+SAVE_BYTES_PER_POINT = 30  # Bytes de CSV por punto (dos columnas de texto)
+
+# --- Origen de los comandos y consultas de datos de cada view ---
+# "config": CSV de configuración; "setup"/"capture": comandos fijos de las views que no usan
+# CSV (setup con *OPC?, capture sin esperar); "fetch": (consulta, puntos nominales; 0 = texto);
+# "repeat": adquisiciones por captura (Averaged, en el peor caso).
+VIEW_SOURCES = {
+    "DPX": {"config": "config_dpx.csv", "fetch": [(':FETCh:DPX:RESults:TRACe3?', 801)]},
+    "PVT": {"config": "config_PVT.csv", "fetch": [(':FETCh:PHVTime?', 1000)]},
+    "TimeOverview": {"setup": [':DISPlay:PULSe:MEASview:NEW TOVerview'],
+                     "capture": [':INITiate:IMMediate', '*WAI'], "fetch": [(':FETCh:TOverview?', 1000)]},
+    "Pulse_Trace": {"setup": [':SENSe:PULSe:THReshold -4', ':SENSe:PULSe:RANGe 15E-6', ':SENSe:PULSe:REFerence 0',
+                              ':DISPlay:PULSe:MEASview:NEW TRACe'],
+                    "capture": [':INITiate:IMMediate', '*WAI'], "fetch": [(':FETCh:PULSe:TRACe?', 1000)]},
+    "Spectrum": {"config": "config_spectrum.csv", "fetch": [(':FETCh:SPECtrum:TRACe1?', 801)]},
+    "frequency": {"config": "config_frequency.csv", "fetch": [(':FETCh:FVTime?', 1000)]},
+    "Multi": {"config": "config_multi.csv",
+              "fetch": [(':FETCh:PHVTime?;:FETCh:FVTime?;:FETCh:SPECtrum:TRACe1?', 2801)]},
+    "IQ": {"config": "config_iq.csv", "fetch": [(':FETCh:RFIN:RECord:IDS?', 0), (':FETCh:RFIN:IQ:HEADer?', 0),
+                                               (':FETCh:RFIN:IQ?', 200000)]},
+    "Averaged": {"config": "config_spectrum.csv", "fetch": [(':FETCh:SPECtrum:TRACe1?', 801)], "repeat": 50},
+}
+
+
+def compile_csv(csv_file):
+    """
+    Compila un CSV de configuración en pasos (como los ejecuta instrument_config).
+
+    Returns:
+        tuple: (pasos de configuración, pasos de captura); cada paso es (tipo, comando, delay)
+        y la captura son los :CLEar:RESults más las filas desde el primer :INITiate:IMMediate.
+    """
+    df = pd.read_csv(csv_file, encoding='utf-8-sig')
+    steps = []
+    for _, row in df.iterrows():
+        delay = pd.to_numeric(row['Delay'], errors='coerce')
+        comando = str(row['Comando']).strip() if pd.notna(row['Comando']) else ""
+        if row['Tipo'] == 'Comando' and pd.notna(row['Parametro']):
+            comando = f"{comando} {row['Parametro']}"
+        steps.append((row['Tipo'], comando, 0.0 if pd.isna(delay) else float(delay)))
+    for k, (_, comando, _) in enumerate(steps):
+        if comando == ':INITiate:IMMediate':
+            clear = [step for step in steps[:k] if step[0] == 'Comando' and ':CLEAR:RESULTS' in step[1].upper()]
+            return steps[:k], clear + steps[k:]
+    return steps, []
+
+
+def query_seconds(profile, op):
+    """
+    Latencia típica (mediana) de una operación según el perfil, o el valor nominal.
+    """
+    median = profile.percentile(op, 50) if profile is not None else None
+    return DEFAULT_QUERY if median is None else median
+
+
+def steps_seconds(steps, profile, context=None):
+    """
+    Duración prevista de una lista de pasos compilados (context: CSV de origen, como en
+    send_command).
+    """
+    total = 0.0
+    for tipo, comando, delay in steps:
+        total += delay
+        if tipo == 'Comando':
+            total += SEND_DELAY + query_seconds(profile, opc_class(comando, context))
+        elif tipo in ('VerificarError', 'VerificarOPC'):
+            total += query_seconds(profile, op_class(comando))
+    return total
+
+
+def fetch_cost(query, points, profile):
+    """
+    Duración y bytes previstos de una consulta de datos.
+
+    El tamaño es el promedio observado en el perfil (o puntos x 4 bytes de float32) y la
+    duración ese tamaño dividido la tasa de transferencia medida de la operación (o la
+    latencia típica para las respuestas de texto).
+    """
+    op = ';'.join(op_class(q) for q in query.split(';'))  # Misma clase que QueryQueue
+    samples = profile.samples.get(op, ()) if profile is not None else ()
+    nbytes = sum(b for _, b in samples) / len(samples) if samples else (points * 4 + 10 if points else TEXT_BYTES)
+    if not points:
+        return query_seconds(profile, op), nbytes
+    rate = (profile.transfer_rate(op) if profile is not None else None) or DEFAULT_RATE
+    return nbytes / rate, nbytes
+
+
+def declared_points(view, query, points):
+    """
+    Puntos de una consulta de datos según la resolución declarada por la view ("points"),
+    o los nominales.
+    """
+    if not points or view.get("points") is None:
+        return points
+    total = 0
+    for q in query.split(';'):
+        measurement = next((m for m, (_, fetch, _, _) in POINTS_COMMANDS.items() if fetch == op_class(q)), None)
+        wanted = requested(measurement, view["points"]) if measurement is not None else None
+        if wanted is None:
+            return points  # Consulta sin cantidad de puntos negociable o sin resolución declarada
+        total += points_setting(measurement, wanted)[2]
+    return total
+
+
+def view_costs(view, profile=None):
+    """
+    Costos previstos de una view.
+
+    Returns:
+        dict: t_config (configuración completa), t_capture (una captura), bytes (transferidos
+        por captura) y csv_bytes (guardados por captura).
+    """
+    source = VIEW_SOURCES[view["name"]]
+    if "config" in source:
+        setup, capture = compile_csv(source["config"])
+        t_config, t_acquire = (steps_seconds(setup, profile, source["config"]),
+                               steps_seconds(capture, profile, source["config"]))
+    else:
+        t_config = len(source["setup"]) * SEND_DELAY + sum(
+            query_seconds(profile, opc_class(c)) for c in source["setup"])
+        t_acquire = SEND_DELAY  # :INITiate:IMMediate sin *OPC?; *WAI se escribe sin esperar
+    t_fetch, nbytes, points = 0.0, 0.0, 0
+    for query, n in source["fetch"]:
+        n = declared_points(view, query, n)
+        seconds, size = fetch_cost(query, n, profile)
+        t_fetch += seconds
+        nbytes += size
+        points += n
+    repeat = source.get("repeat", 1)
+    return {
+        "t_config": t_config,
+        "t_capture": repeat * (t_acquire + t_fetch),
+        "bytes": repeat * nbytes,
+        "csv_bytes": points * SAVE_BYTES_PER_POINT,
+    }
+
+
+def apply_estimates(views, profile=None):
+    """
+    Completa t_config y t_capture de las views habilitadas que no los declaran, para que
+    estimate_duration() use los costos compilados.
+    """
+    for view in views:
+        if view["state"] and view["name"] in VIEW_SOURCES:
+            costs = view_costs(view, profile)
+            view.setdefault("t_config", costs["t_config"])
+            view.setdefault("t_capture", costs["t_capture"])
+
+
+def print_dry_run(views, schedule, wait, profile=None):
+    """
+    Muestra la duración y el volumen de datos previstos por view y totales.
+    """
+    print("Plan en seco (sin instrumento):\n")
+    total_bytes = total_csv = 0.0
+    for view in views:
+        if not view["state"]:
+            continue
+        captures = sum(1 for item in schedule if item is view)
+        if view["name"] not in VIEW_SOURCES:
+            print(f"\t -{view['name']}: sin costos conocidos")
+            continue
+        costs = view_costs(view, profile)
+        configs = sum(1 for i, item in enumerate(schedule) if item is view and (i == 0 or schedule[i - 1] is not view))
+        seconds = configs * (wait + view.get("t_config", costs["t_config"])) + captures * view.get("t_capture", costs["t_capture"])
+        total_bytes += captures * costs["bytes"]
+        total_csv += captures * costs["csv_bytes"]
+        print(f"\t -{view['name']}: {captures} capturas, {configs} configuraciones, "
+              f"{format_duration(seconds)}, {captures * costs['bytes'] / 1e6:.2f} MB transferidos, "
+              f"{captures * costs['csv_bytes'] / 1e6:.2f} MB en CSV")
+    print(f"\n\t -Duración prevista: {format_duration(estimate_duration(schedule, wait))}")
+    print(f"\t -Datos transferidos: {total_bytes / 1e6:.2f} MB, en disco: {total_csv / 1e6:.2f} MB (sin comprimir)")
+    print(f"\t -Perfil de latencias: {'medido' if profile is not None and profile.samples else 'valores nominales'}\n")
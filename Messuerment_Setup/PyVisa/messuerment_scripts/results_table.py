@@ -0,0 +1,277 @@
+# Tabla columnar de resultados de campaña (parámetros de chirp y PRI por captura o corrida).
+# Cada columna es un archivo binario de solo agregado dentro del directorio de la tabla:
+# numéricas en float64 y de texto (view, config_hash) codificadas como int32 con su
+# diccionario en JSON. Las consultas cargan solo las columnas pedidas con np.memmap y
+# filtran de forma vectorizada; el tiempo se indexa con búsqueda binaria.
+# Uso: python results_table.py -table results/tabla -add chirp_parameters.csv -view DPX
+#      python results_table.py -table results/tabla -query -desde "2025-05-01" -agrupar config_hash
+import argparse  #para parsear argumentos
+import datetime  # Para convertir fechas
+import hashlib   # Hash de configuración
+import json      # Diccionarios de las columnas de texto
+import os        #para crear directorios
+import time  # Para obtener la fecha y hora actual
+
+import numpy as np  # Para operaciones numéricas y manejo de arreglos
+import pandas as pd  # Para leer chirp_parameters.csv
+
+TEXT_COLUMNS = ['view', 'config_hash']
+NUMERIC_COLUMNS = ['timestamp', 'duration_us', 'amplitude_dbm', 'avg_power_dbm', 'min_freq_mhz',
+                   'max_freq_mhz', 'central_freq_mhz', 'bandwidth_mhz', 'chirp_rate_mhz_per_us',
+                   'pri_ms', 'prf_hz', 'jitter_ms']
+
+# Columnas de chirp_parameters.csv (Funcional pruebas.py) -> columnas de la tabla
+PARAMETER_NAMES = {
+    'Duración (μs)': 'duration_us',
+    'Amplitud (dBm)': 'amplitude_dbm',
+    'Potencia Promedio (dBm)': 'avg_power_dbm',
+    'Frecuencia Mínima (MHz)': 'min_freq_mhz',
+    'Frecuencia Máxima (MHz)': 'max_freq_mhz',
+    'Frecuencia Central (MHz)': 'central_freq_mhz',
+    'Ancho de banda (MHz)': 'bandwidth_mhz',
+    'Tasa de cambio de frecuencia (MHz/μs)': 'chirp_rate_mhz_per_us',
+    'PRI (ms)': 'pri_ms',
+    'PRF (Hz)': 'prf_hz',
+    'Jitter (ms)': 'jitter_ms',
+    'Timestamp': 'timestamp',
+}
+
+
+def config_hash(*parts, files=()):
+    """
+    Hash corto (12 hex) de una configuración.
+
+    Args:
+        parts: Parámetros que la identifican (comandos, valores); se hashean como texto
+            aunque coincidan con el nombre de un archivo.
+        files: Rutas de los CSV de configuración; se hashea su contenido (no la ruta, así
+            que el hash no depende del directorio de trabajo).
+    """
+    digest = hashlib.sha1()
+    for part in parts:
+        digest.update(str(part).encode())
+    for path in files:
+        with open(path, 'rb') as config_file:
+            digest.update(config_file.read())
+    return digest.hexdigest()[:12]
+
+
+class ResultsTable:
+    """
+    Tabla de resultados de solo agregado, almacenada por columnas.
+    """
+
+    def __init__(self, directorio):
+        self.directorio = directorio
+        os.makedirs(directorio, exist_ok=True)
+        self.dictionaries = {}
+        for col in TEXT_COLUMNS:
+            path = os.path.join(directorio, f'{col}.dict.json')
+            if os.path.exists(path):
+                with open(path) as dict_file:
+                    self.dictionaries[col] = json.load(dict_file)
+            else:
+                self.dictionaries[col] = []
+        self._repair()
+        self._load_meta()
+
+    def _column_path(self, col):
+        ext = 'i32' if col in TEXT_COLUMNS else 'f64'
+        return os.path.join(self.directorio, f'{col}.{ext}')
+
+    def _repair(self):
+        """
+        Si un corte dejó columnas con distinta cantidad de filas, las recorta a la menor.
+        """
+        sizes = {}
+        for col in TEXT_COLUMNS + NUMERIC_COLUMNS:
+            path = self._column_path(col)
+            sizes[col] = os.path.getsize(path) // 4 // (1 if col in TEXT_COLUMNS else 2) if os.path.exists(path) else 0
+        self.rows = min(sizes.values())
+        for col, size in sizes.items():
+            if size != self.rows:
+                with open(self._column_path(col), 'r+b') as column_file:
+                    column_file.truncate(self.rows * (4 if col in TEXT_COLUMNS else 8))
+
+    def _meta_path(self):
+        return os.path.join(self.directorio, 'meta.json')
+
+    def _load_meta(self):
+        """
+        Lee si la columna timestamp está ordenada. Si los metadatos faltan o no corresponden
+        a la cantidad de filas (tabla anterior o recortada por _repair) se recalcula una vez.
+        """
+        meta = {}
+        if os.path.exists(self._meta_path()):
+            with open(self._meta_path()) as meta_file:
+                meta = json.load(meta_file)
+        if meta.get('rows') == self.rows:
+            self.sorted = meta['sorted']
+            self.last_timestamp = meta['last_timestamp']
+        else:
+            timestamps = self.column('timestamp')
+            self.sorted = bool(np.all(timestamps[1:] >= timestamps[:-1]))
+            self.last_timestamp = float(timestamps[-1]) if self.rows else None
+            self._save_meta()
+
+    def _save_meta(self):
+        with open(self._meta_path(), 'w') as meta_file:
+            json.dump({'rows': self.rows, 'sorted': self.sorted, 'last_timestamp': self.last_timestamp}, meta_file)
+
+    def _encode(self, col, value):
+        values = self.dictionaries[col]
+        value = str(value)
+        if value not in values:
+            values.append(value)
+            with open(os.path.join(self.directorio, f'{col}.dict.json'), 'w') as dict_file:
+                json.dump(values, dict_file)
+        return values.index(value)
+
+    def append(self, rows):
+        """
+        Agrega una o varias filas.
+
+        Args:
+            rows: dict o lista de dict con las columnas de la tabla (las faltantes quedan NaN;
+                si falta timestamp se usa la hora actual).
+        """
+        if isinstance(rows, dict):
+            rows = [rows]
+        now = time.time()
+        for col in TEXT_COLUMNS:
+            codes = np.array([self._encode(col, row.get(col, '')) for row in rows], dtype=np.int32)
+            with open(self._column_path(col), 'ab') as column_file:
+                column_file.write(codes.tobytes())
+        for col in NUMERIC_COLUMNS:
+            default = now if col == 'timestamp' else np.nan
+            values = np.array([row.get(col, default) for row in rows], dtype=np.float64)
+            with open(self._column_path(col), 'ab') as column_file:
+                column_file.write(values.tobytes())
+            if col == 'timestamp' and len(values):
+                # El orden se mantiene al agregar: solo se revisan las filas nuevas
+                if self.last_timestamp is not None and values[0] < self.last_timestamp:
+                    self.sorted = False
+                self.sorted = self.sorted and bool(np.all(values[1:] >= values[:-1]))
+                self.last_timestamp = float(values[-1])
+        self.rows += len(rows)
+        self._save_meta()
+
+    def column(self, col):
+        """
+        Devuelve la columna completa (np.memmap de solo lectura, sin copiar a memoria).
+        """
+        if self.rows == 0:
+            return np.array([], dtype=np.int32 if col in TEXT_COLUMNS else np.float64)
+        dtype = np.int32 if col in TEXT_COLUMNS else np.float64
+        return np.memmap(self._column_path(col), dtype=dtype, mode='r', shape=(self.rows,))
+
+    def select(self, t_start=None, t_end=None, view=None, config=None):
+        """
+        Índices de las filas que cumplen los filtros.
+
+        Args:
+            t_start, t_end (float): Rango de timestamp (epoch, segundos).
+            view (str): Nombre de la view.
+            config (str): Hash de configuración.
+        """
+        timestamps = self.column('timestamp')
+        filters = [(col, value) for col, value in (('view', view), ('config_hash', config)) if value is not None]
+        for col, value in filters:
+            if value not in self.dictionaries[col]:
+                return np.array([], dtype=np.int64)
+        if self.sorted:
+            # Índice de tiempo: la columna está ordenada (se agrega en orden cronológico)
+            lo = 0 if t_start is None else np.searchsorted(timestamps, t_start, 'left')
+            hi = self.rows if t_end is None else np.searchsorted(timestamps, t_end, 'right')
+            if not filters:
+                return np.arange(lo, hi)
+            # Los filtros de texto se evalúan solo sobre el rango de tiempo
+            mask = np.ones(hi - lo, dtype=bool)
+            for col, value in filters:
+                mask &= self.column(col)[lo:hi] == self.dictionaries[col].index(value)
+            return lo + np.flatnonzero(mask)
+        mask = np.ones(self.rows, dtype=bool)
+        if t_start is not None:
+            mask &= timestamps >= t_start
+        if t_end is not None:
+            mask &= timestamps <= t_end
+        for col, value in filters:
+            mask &= self.column(col) == self.dictionaries[col].index(value)
+        return np.flatnonzero(mask)
+
+    def query(self, columns=None, **filters):
+        """
+        Devuelve las columnas pedidas de las filas filtradas (ver select()).
+
+        Returns:
+            dict: Nombre de columna -> arreglo (las de texto ya decodificadas).
+        """
+        rows = self.select(**filters)
+        result = {}
+        for col in columns or TEXT_COLUMNS + NUMERIC_COLUMNS:
+            values = self.column(col)[rows]
+            if col in TEXT_COLUMNS:
+                values = np.array(self.dictionaries[col], dtype=object)[values] if len(values) else values.astype(object)
+            result[col] = values
+        return result
+
+    def aggregate(self, column, by='config_hash', **filters):
+        """
+        Estadísticas de una columna agrupadas por view o config_hash.
+
+        Returns:
+            pd.DataFrame: count, mean, std, min y max por grupo.
+        """
+        data = self.query(columns=[by, column], **filters)
+        df = pd.DataFrame({by: data[by], column: data[column]})
+        return df.groupby(by)[column].agg(['count', 'mean', 'std', 'min', 'max'])
+
+
+def ingest_parameters(table, csv_file, view, config):
+    """
+    Agrega a la tabla las filas de un chirp_parameters.csv de Funcional pruebas.py.
+    """
+    df = pd.read_csv(csv_file).rename(columns=PARAMETER_NAMES)
+    rows = []
+    for record in df.to_dict('records'):
+        if 'timestamp' not in record:
+            record['timestamp'] = os.path.getmtime(csv_file)
+        record['view'] = view
+        record['config_hash'] = config
+        rows.append(record)
+    table.append(rows)
+    return len(rows)
+
+
+def _to_epoch(text):
+    return datetime.datetime.fromisoformat(text).timestamp() if text else None
+
+
+if __name__ == "__main__":
+    # Crear el parser
+    parser = argparse.ArgumentParser(description="Tabla de resultados de campaña (chirp y PRI)")
+    parser.add_argument('-table', type=str, default="results/tabla", help="Directorio de la tabla")
+    parser.add_argument('-add', type=str, default="", help="Agrega un chirp_parameters.csv a la tabla")
+    parser.add_argument('-view', type=str, default="", help="View de las filas agregadas (Funcional por defecto) o filtro de la consulta")
+    parser.add_argument('-config', type=str, default="", help="Hash de configuración (o CSV de configuración) de las filas agregadas o filtro de la consulta")
+    parser.add_argument('-query', action='store_true', help="Consulta la tabla")
+    parser.add_argument('-desde', type=str, default="", help="Fecha inicial ISO (2025-05-01 10:00)")
+    parser.add_argument('-hasta', type=str, default="", help="Fecha final ISO")
+    parser.add_argument('-agrupar', type=str, default="", help="Agrupa por view o config_hash")
+    parser.add_argument('-col', type=str, default="pri_ms", help="Columna a agregar")
+    args = parser.parse_args()
+
+    table = ResultsTable(args.table)
+    if args.add:
+        config = config_hash(files=[args.config]) if os.path.isfile(args.config) else args.config
+        print(f"Filas agregadas: {ingest_parameters(table, args.add, args.view or 'Funcional', config)}")
+    if args.query:
+        config = config_hash(files=[args.config]) if os.path.isfile(args.config) else args.config
+        filters = {'t_start': _to_epoch(args.desde), 't_end': _to_epoch(args.hasta),
+                   'view': args.view or None, 'config': config or None}
+        start = time.perf_counter()
+        if args.agrupar:
+            print(table.aggregate(args.col, by=args.agrupar, **filters))
+        else:
+            print(pd.DataFrame(table.query(**filters)))
+        print(f"Consulta sobre {table.rows} filas en {1e3 * (time.perf_counter() - start):.1f} ms")
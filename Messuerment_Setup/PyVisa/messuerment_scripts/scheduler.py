@@ -0,0 +1,85 @@
+# Planificador de capturas para la tabla de views.
+# Ordena las capturas agrupando repeticiones consecutivas de una misma view, de forma que
+# el instrumento solo se reconfigura (y espera `wait`) cuando cambia de view.
+
+# Tiempos por defecto (en segundos) si la view no los declara en la tabla
+T_CONFIG = 3.0   # Reconfiguración completa de la vista (CSV de configuración)
+T_CAPTURE = 2.0  # Disparo, adquisición, fetch y guardado de una captura
+
+
+def build_schedule(views, round_robin=False):
+    """
+    Genera el orden de ejecución de las capturas.
+
+    Cada view habilitada aporta `repet` capturas. Se agotan las repeticiones de una view
+    antes de pasar a la siguiente, salvo que la view declare:
+        "block": máximo de capturas consecutivas antes de ceder el turno (restricción de
+                 intercalado; por ejemplo block=5 alterna bloques de 5 capturas).
+
+    Args:
+        views (list): Tabla de views (diccionarios con name, state, repet...).
+        round_robin (bool): Si True, reproduce el orden original (una captura por view).
+    Returns:
+        list: Lista de views, una entrada por captura, en el orden a ejecutar.
+    """
+    enabled = [view for view in views if view["state"]]
+    remaining = {view["name"]: view["repet"] for view in enabled}
+    schedule = []
+    while any(remaining.values()):
+        for view in enabled:
+            block = 1 if round_robin else view.get("block") or remaining[view["name"]]
+            n = min(block, remaining[view["name"]])
+            schedule.extend([view] * n)
+            remaining[view["name"]] -= n
+    return schedule
+
+
+def count_switches(schedule):
+    """
+    Cuenta los cambios de view (reconfiguraciones) de un orden de ejecución.
+    """
+    return sum(1 for i, view in enumerate(schedule) if i == 0 or view is not schedule[i - 1])
+
+
+def estimate_duration(schedule, wait):
+    """
+    Predice la duración de la campaña en segundos.
+
+    Cada cambio de view cuesta `wait` + el tiempo de configuración ("t_config" de la view);
+    cada captura cuesta "t_capture". Las capturas consecutivas de una misma view respetan
+    además la restricción de tasa "interval" (segundos mínimos entre capturas).
+
+    Args:
+        schedule (list): Orden de ejecución generado por build_schedule().
+        wait (float): Espera entre views (argumento -w).
+    """
+    total = 0.0
+    for i, view in enumerate(schedule):
+        t_capture = view.get("t_capture", T_CAPTURE)
+        if i == 0 or view is not schedule[i - 1]:
+            total += wait + view.get("t_config", T_CONFIG)
+        else:
+            total += max(0.0, view.get("interval", 0) - t_capture)
+        total += t_capture
+    return total
+
+
+def format_duration(seconds):
+    """
+    Devuelve la duración en formato HH:MM:SS.
+    """
+    seconds = int(round(seconds))
+    return f"{seconds // 3600:02d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+
+
+def print_plan(views, schedule, wait):
+    """
+    Muestra el resumen del plan: capturas, cambios de view y duración prevista, comparado
+    con el orden round-robin original.
+    """
+    rr = build_schedule(views, round_robin=True)
+    print("Plan de capturas:\n")
+    print(f"\t -Capturas: {len(schedule)}")
+    print(f"\t -Cambios de view: {count_switches(schedule)} (round-robin: {count_switches(rr)})")
+    print(f"\t -Duración prevista: {format_duration(estimate_duration(schedule, wait))}"
+          f" (round-robin: {format_duration(estimate_duration(rr, wait))})\n")
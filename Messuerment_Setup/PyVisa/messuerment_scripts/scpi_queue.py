@@ -0,0 +1,91 @@
+# Cola de consultas SCPI: envía varias consultas independientes en un solo mensaje y
+# separa las respuestas en orden, incluidos los bloques binarios.
+#
+# IEEE 488.2 no permite mandar una consulta nueva antes de leer la respuesta de la anterior
+# (error -410 "Query INTERRUPTED"), pero sí varias consultas unidas con ';' en un mismo
+# mensaje: el instrumento devuelve un único mensaje de respuesta con los resultados
+# separados por ';'. Así se paga un solo viaje de red por lote en lugar de uno por consulta.
+import binblock  # Decodificación de bloques binarios
+from latency import timed_fetch, op_class  # Timeout adaptativo por operación
+
+
+class QueryQueue:
+    """
+    Cola de consultas sobre una sesión VISA.
+
+    Uso:
+        queue = QueryQueue(instrument)
+        queue.add('*OPC?')
+        queue.add(':FETCh:PHVTime?', binary=True)
+        opc, phase = queue.flush()
+    """
+
+    def __init__(self, instrument, max_batch=8):
+        self.instrument = instrument
+        self.max_batch = max_batch  # Consultas por mensaje (limita el tamaño del mensaje)
+        self.pending = []  # Lista de (consulta, binaria)
+
+    def add(self, query, binary=False):
+        """
+        Agrega una consulta a la cola.
+
+        Args:
+            query (str): Consulta SCPI (debe terminar en '?').
+            binary (bool): True si la respuesta es un bloque binario de float32.
+        """
+        self.pending.append((query, binary))
+
+    def flush(self):
+        """
+        Envía las consultas pendientes en lotes de max_batch y devuelve las respuestas en el
+        mismo orden: str para las consultas de texto y arreglo NumPy para las binarias.
+        """
+        responses = []
+        while self.pending:
+            batch, self.pending = self.pending[:self.max_batch], self.pending[self.max_batch:]
+            # ':' inicial en cada consulta para que el árbol SCPI vuelva a la raíz
+            message = ';'.join(q if q.startswith((':', '*')) else ':' + q for q, _ in batch)
+            op = ';'.join(op_class(q) for q, _ in batch)  # Clase de operación del lote completo
+            raw_response = timed_fetch(self.instrument, message, op=op)  # Un solo viaje de red por lote
+            responses.extend(split_responses(raw_response, [binary for _, binary in batch]))
+        return responses
+
+
+def split_responses(raw_response, kinds):
+    """
+    Separa un mensaje de respuesta compuesto.
+
+    Args:
+        raw_response (bytes): Mensaje leído con read_raw().
+        kinds (list): Para cada respuesta esperada, True si es un bloque binario.
+    Returns:
+        list: Respuestas en orden (str o arreglo NumPy).
+    Raises:
+        ValueError si el mensaje no contiene las respuestas esperadas.
+    """
+    responses = []
+    pos = 0
+    for binary in kinds:
+        if binary:
+            if raw_response[pos:pos + 1] != b'#':
+                raise ValueError(f"Se esperaba un bloque binario en la posición {pos}")
+            num_digits = int(chr(raw_response[pos + 1]))  # Número de dígitos que indican la longitud de datos
+            num_bytes = int(raw_response[pos + 2:pos + 2 + num_digits].decode())  # Longitud de los datos en bytes
+            start = pos + 2 + num_digits
+            responses.append(binblock.decode_floats(raw_response[start:start + num_bytes]))
+            pos = start + num_bytes
+        else:
+            # Busca el ';' separador fuera de las cadenas entre comillas
+            end = pos
+            quoted = False
+            while end < len(raw_response) and (quoted or raw_response[end] not in b';\n'):
+                if raw_response[end] == ord('"'):
+                    quoted = not quoted
+                end += 1
+            responses.append(raw_response[pos:end].decode(errors='replace').strip())
+            pos = end
+        if len(responses) < len(kinds):
+            if raw_response[pos:pos + 1] != b';':
+                raise ValueError(f"Respuesta compuesta incompleta: {len(responses)} de {len(kinds)}")
+            pos += 1  # Salta el separador
+    return responses
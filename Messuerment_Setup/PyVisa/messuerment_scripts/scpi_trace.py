@@ -0,0 +1,268 @@
+# Grabación y reproducción de sesiones SCPI.
+# RecordingResourceManager envuelve las sesiones VISA reales y guarda cada write, query,
+# lectura de texto, respuesta binaria (read_raw), clear y error de VISA con su instante en un
+# archivo de traza comprimido. ReplayResourceManager sirve esa traza como si fuera el
+# instrumento, a la velocidad grabada o acelerada, de modo que la decodificación, el guardado
+# y el análisis se pueden probar de forma determinística con datos reales sin el hardware.
+# Uso: python messuerment.py -record sesion.scpi.gz
+#      python messuerment.py -replay sesion.scpi.gz -speed 0
+#      python scpi_trace.py sesion.scpi.gz   (resumen de la traza)
+import argparse  #para parsear argumentos
+import gzip      # Contenedor comprimido de la traza
+import struct    # Encabezado binario de cada registro
+import time  # Instantes de los registros y esperas de la reproducción
+
+import pyvisa  # Para reproducir los errores de VISA
+
+MAGIC = b'SCPITRACE1\n'
+RECORD = struct.Struct('<dcI')  # instante (s desde el inicio), tipo, longitud del contenido
+
+# Tipos de registro
+OPEN = b'O'      # Apertura de sesión (nombre del recurso)
+WRITE = b'W'     # Comando enviado
+QUERY = b'Q'     # Consulta enviada con query()
+READ = b'R'      # Respuesta de texto (query() o read())
+RAW = b'B'       # Respuesta binaria de read_raw()
+CLEAR = b'C'     # Device clear
+ERROR = b'X'     # Error de VISA (código de estado)
+CLOSE = b'Z'     # Cierre de sesión
+
+
+class ReplayMismatch(RuntimeError):
+    """
+    El script pidió algo distinto de lo grabado en la traza.
+    """
+
+
+class TraceWriter:
+    """
+    Escritura secuencial de registros en la traza.
+    """
+
+    def __init__(self, path):
+        self.file = gzip.open(path, 'wb', compresslevel=6)
+        self.file.write(MAGIC)
+        self.start = time.perf_counter()
+        self.records = 0
+
+    def write(self, kind, payload=b''):
+        if isinstance(payload, str):
+            payload = payload.encode()
+        self.file.write(RECORD.pack(time.perf_counter() - self.start, kind, len(payload)))
+        self.file.write(payload)
+        self.records += 1
+
+    def close(self):
+        self.file.close()
+
+
+def read_trace(path):
+    """
+    Lee todos los registros de una traza.
+
+    Returns:
+        list: Tuplas (instante, tipo, contenido).
+    """
+    records = []
+    with gzip.open(path, 'rb') as trace_file:
+        if trace_file.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"'{path}' no es una traza SCPI")
+        while True:
+            header = trace_file.read(RECORD.size)
+            if len(header) < RECORD.size:
+                break  # Fin de la traza (o corte durante la grabación)
+            t, kind, length = RECORD.unpack(header)
+            records.append((t, kind, trace_file.read(length)))
+    return records
+
+
+class RecordingInstrument:
+    """
+    Sesión VISA que graba todo lo que pasa por ella (delegando en la sesión real).
+    """
+
+    def __init__(self, instrument, writer):
+        object.__setattr__(self, '_instrument', instrument)
+        object.__setattr__(self, '_writer', writer)
+
+    def __getattr__(self, name):
+        return getattr(self._instrument, name)
+
+    def __setattr__(self, name, value):
+        setattr(self._instrument, name, value)  # timeout y demás atributos de la sesión real
+
+    def _call(self, action):
+        try:
+            return action()
+        except pyvisa.errors.VisaIOError as e:
+            self._writer.write(ERROR, str(int(e.error_code)))
+            raise
+
+    def write(self, command):
+        self._writer.write(WRITE, command)
+        return self._call(lambda: self._instrument.write(command))
+
+    def query(self, command):
+        self._writer.write(QUERY, command)
+        response = self._call(lambda: self._instrument.query(command))
+        self._writer.write(READ, response)
+        return response
+
+    def read(self):
+        response = self._call(self._instrument.read)
+        self._writer.write(READ, response)
+        return response
+
+    def read_raw(self):
+        response = self._call(self._instrument.read_raw)
+        self._writer.write(RAW, response)
+        return response
+
+    def clear(self):
+        self._writer.write(CLEAR)
+        return self._call(self._instrument.clear)
+
+    def close(self):
+        self._writer.write(CLOSE)
+        return self._instrument.close()
+
+
+class RecordingResourceManager:
+    """
+    ResourceManager que graba las sesiones que abre en un único archivo de traza.
+    """
+
+    def __init__(self, rm, path):
+        self.rm = rm
+        self.writer = TraceWriter(path)
+
+    def open_resource(self, name):
+        self.writer.write(OPEN, name)
+        try:
+            instrument = self.rm.open_resource(name)
+        except pyvisa.errors.VisaIOError as e:
+            self.writer.write(ERROR, str(int(e.error_code)))
+            raise
+        return RecordingInstrument(instrument, self.writer)
+
+    def close(self):
+        print(f"Traza SCPI: {self.writer.records} registros grabados")
+        self.writer.close()
+        self.rm.close()
+
+
+class ReplayInstrument:
+    """
+    Sesión simulada que responde con los registros de la traza, en orden.
+    """
+
+    def __init__(self, player):
+        self.player = player
+        self.timeout = 12000
+
+    def write(self, command):
+        self.player.expect(WRITE, command)
+
+    def query(self, command):
+        self.player.expect(QUERY, command)
+        return self.player.respond(READ).decode()
+
+    def read(self):
+        return self.player.respond(READ).decode()
+
+    def read_raw(self):
+        return self.player.respond(RAW)
+
+    def clear(self):
+        self.player.expect(CLEAR)
+
+    def close(self):
+        self.player.expect(CLOSE)
+
+
+class ReplayResourceManager:
+    """
+    ResourceManager que reproduce una traza grabada.
+
+    Args:
+        path (str): Archivo de traza.
+        speed (float): 1 = latencias grabadas, 10 = diez veces más rápido, 0 = sin esperas.
+    """
+
+    def __init__(self, path, speed=1.0):
+        self.records = read_trace(path)
+        self.speed = speed
+        self.position = 0
+        self.last_request = 0.0  # Instante grabado del último pedido (para la latencia)
+
+    def _next(self):
+        if self.position >= len(self.records):
+            raise ReplayMismatch("La traza terminó")
+        record = self.records[self.position]
+        self.position += 1
+        return record
+
+    def _raise_error(self):
+        # Un error grabado en este punto se vuelve a lanzar (timeouts, sesión caída...)
+        if self.position < len(self.records) and self.records[self.position][1] == ERROR:
+            t, _, payload = self._next()
+            self._wait(t)
+            raise pyvisa.errors.VisaIOError(int(payload))
+
+    def _wait(self, t):
+        if self.speed > 0 and t > self.last_request:
+            time.sleep((t - self.last_request) / self.speed)
+
+    def expect(self, kind, payload=None):
+        """
+        Consume el próximo registro verificando que coincida con lo que pide el script.
+        """
+        t, recorded_kind, recorded = self._next()
+        if recorded_kind != kind or (payload is not None and recorded.decode() != payload):
+            raise ReplayMismatch(f"Registro {self.position}: se grabó {recorded_kind.decode()} "
+                                 f"{recorded[:60]!r}, se pidió {kind.decode()} {payload!r}")
+        self.last_request = t
+        self._raise_error()
+
+    def respond(self, kind):
+        """
+        Devuelve la próxima respuesta grabada, esperando su latencia (escalada por speed).
+        """
+        self._raise_error()
+        t, recorded_kind, payload = self._next()
+        if recorded_kind != kind:
+            raise ReplayMismatch(f"Registro {self.position}: se grabó {recorded_kind.decode()}, "
+                                 f"se esperaba una respuesta {kind.decode()}")
+        self._wait(t)
+        return payload
+
+    def open_resource(self, name):
+        self.expect(OPEN, name)
+        return ReplayInstrument(self)
+
+    def close(self):
+        print(f"Traza SCPI: {self.position} de {len(self.records)} registros reproducidos")
+
+
+def summary(path):
+    """
+    Resumen de una traza: duración, registros y bytes por tipo.
+    """
+    records = read_trace(path)
+    counts = {}
+    for _, kind, payload in records:
+        n, nbytes = counts.get(kind, (0, 0))
+        counts[kind] = (n + 1, nbytes + len(payload))
+    return {'duration': records[-1][0] if records else 0.0, 'records': len(records), 'kinds': counts}
+
+
+if __name__ == "__main__":
+    # Crear el parser
+    parser = argparse.ArgumentParser(description="Resumen de una traza SCPI grabada")
+    parser.add_argument('trace', type=str, help="Archivo de traza")
+    args = parser.parse_args()
+
+    info = summary(args.trace)
+    print(f"Duración: {info['duration']:.1f} s, registros: {info['records']}")
+    for kind, (n, nbytes) in sorted(info['kinds'].items()):
+        print(f"\t -{kind.decode()}: {n} registros, {nbytes / 1e3:.1f} kB")
@@ -0,0 +1,73 @@
+# Apertura de la sesión VISA con el RSA6114A y reconexión con espera exponencial.
+import time  # Para las esperas entre reintentos
+
+from config_functions import send_command, logger
+from latency import PROFILE, timed_query  # Perfil de latencias por operación
+
+
+def open_session(rm, ip, timeout=12000):
+    """
+    Abre la conexión con el analizador y lo deja listo para mediciones simples.
+
+    Args:
+        rm: pyvisa.ResourceManager.
+        ip (str): Dirección IP del instrumento.
+        timeout (int): Timeout de VISA en ms.
+    Returns:
+        Objeto de conexión al instrumento.
+    """
+    instrument = rm.open_resource('TCPIP0::' + ip + '::INSTR')  # Conecta al instrumento vía TCP/IP
+    instrument.timeout = timeout  # Timeout largo para operaciones lentas
+    PROFILE.default_ms = timeout  # Techo de los timeouts adaptativos
+    send_command(instrument, '*CLS')  # Limpia el estado del instrumento
+    send_command(instrument, '*IDN?', wait_opc=False)  # Solicita la identificación del instrumento
+    idn = instrument.read().strip()  # Lee y muestra la identificación (por ejemplo, TEKTRONIX,RSA6114A)
+    print(f"Identificación del instrumento: {idn}")
+    logger(f"Conexión establecida con instrumento ID:{idn}")
+    send_command(instrument, ':INITiate:CONTinuous OFF')  # Desactiva el modo continuo para tomar mediciones únicas
+    error_status = instrument.query(':SYSTem:ERRor?').strip()  # Verifica si hay errores después del comando
+    print(f"Estado después de :INITiate:CONTinuous OFF: {error_status}")
+    return instrument
+
+
+def is_alive(instrument):
+    """
+    Verifica con *OPC? que la sesión siga respondiendo.
+    """
+    try:
+        return timed_query(instrument, '*OPC?', idempotent=False).strip() == '1'
+    except Exception:
+        return False
+
+
+def reconnect(rm, ip, instrument, retries=8, backoff=2.0, max_delay=60.0, timeout=12000):
+    """
+    Cierra la sesión caída y vuelve a abrirla, esperando 1, 2, 4... segundos entre intentos
+    (hasta max_delay).
+
+    Args:
+        rm: pyvisa.ResourceManager.
+        ip (str): Dirección IP del instrumento.
+        instrument: Sesión anterior (puede ser None).
+        retries (int): Número máximo de intentos.
+    Returns:
+        La nueva sesión.
+    Raises:
+        ConnectionError si no se pudo reconectar.
+    """
+    if instrument is not None:
+        try:
+            instrument.close()
+        except Exception:
+            pass  # La sesión ya estaba caída
+    delay = 1.0
+    for attempt in range(1, retries + 1):
+        try:
+            print(f"Reconectando (intento {attempt} de {retries})...")
+            logger(f"Reconectando (intento {attempt} de {retries})")
+            return open_session(rm, ip, timeout)
+        except Exception as e:
+            print(f"Reconexión fallida: {e}. Reintentando en {delay:.0f} s")
+            time.sleep(delay)
+            delay = min(delay * backoff, max_delay)
+    raise ConnectionError(f"No se pudo reconectar con {ip} después de {retries} intentos")
@@ -0,0 +1,203 @@
+# Modo de adquisición continua (streaming) para monitoreos largos de PVT o TimeOverview.
+# Configura la view una sola vez, pone el analizador en :INITiate:CONTinuous ON y lee los
+# resultados a medida que aparecen, detectando adquisiciones duplicadas y perdidas.
+import os        #para crear directorios
+import time  # Para medir tiempos entre resultados
+import zlib  # CRC32 del contenido para detectar resultados repetidos
+
+from config_functions import send_command, instrument_config, config_error, logger
+from binblock import block_bytes  # Bytes de datos del bloque, sin decodificar
+from latency import timed_query, timed_fetch, opc_class  # Timeouts adaptativos y verificación de bloques
+
+# --- Tabla de views soportadas en streaming ---
+# Archivo de configuración (None = se selecciona la vista con el comando "view") y consulta de datos
+STREAM_VIEWS = {
+    "PVT": {"config": "config_PVT.csv", "fetch": ':FETCh:PHVTime?'},
+    "frequency": {"config": "config_frequency.csv", "fetch": ':FETCh:FVTime?'},
+    "Spectrum": {"config": "config_spectrum.csv", "fetch": ':FETCh:SPECtrum:TRACe1?'},
+    "TimeOverview": {"config": None, "view": ':DISPlay:PULSe:MEASview:NEW TOVerview', "fetch": ':FETCh:TOVerview?'},
+}
+MAX_INVALID = 5  # Respuestas inválidas consecutivas antes de abortar el streaming
+INVALID_BACKOFF = 0.1  # Espera inicial tras una respuesta inválida en segundos (se duplica)
+MAX_BACKOFF = 2.0  # Espera máxima tras una respuesta inválida
+
+
+class AcquisitionTracker:
+    """
+    Seguimiento de secuencia de los resultados leídos en modo continuo.
+
+    En modo continuo el instrumento devuelve siempre el último resultado disponible:
+    si se consulta más rápido de lo que adquiere, el mismo resultado vuelve a leerse
+    (duplicado); si se consulta más lento, se pierden adquisiciones intermedias.
+    Los duplicados se detectan por el CRC32 del contenido. Mientras haya duplicados, el
+    período de adquisición se estima como el menor intervalo entre las primeras lecturas de
+    resultados consecutivos (acotado inferiormente por la duración de la adquisición). Sin
+    duplicados cada lectura trae un resultado nuevo y ese intervalo es el de las lecturas,
+    no el de adquisición: el período se acota superiormente por la duración de la
+    adquisición más el tiempo de rearme medido (las pérdidas estimadas con esa cota son un
+    mínimo). Las pérdidas se estiman con el número de
+    períodos transcurridos desde la última lectura del resultado anterior; si el período no
+    se puede acotar quedan sin estimar (None).
+    """
+
+    def __init__(self, acq_seconds=0.0, rearm_seconds=None):
+        self.acq_seconds = acq_seconds  # Duración de la adquisición (:SENSe:ACQuisition:SEConds?)
+        self.rearm_seconds = rearm_seconds  # Tiempo de rearme medido (None = desconocido)
+        self.period = None  # Período estimado a partir de los duplicados
+        self.last_crc = None
+        self.first_seen = None  # Primera lectura del resultado actual
+        self.last_seen = None  # Última lectura (incluidos duplicados) del resultado actual
+        self.sequence = 0  # Número de resultados nuevos
+        self.duplicates = 0
+        self.dropped = 0
+        self.unknown = 0  # Resultados con pérdidas sin estimar
+        self.start = time.time()
+
+    def upper_bound(self):
+        """
+        Período máximo de adquisición (duración más rearme), o None si no se conoce.
+        """
+        if not self.acq_seconds or self.rearm_seconds is None:
+            return None
+        return self.acq_seconds + self.rearm_seconds
+
+    def update(self, data_bytes, timestamp):
+        """
+        Registra un resultado leído.
+
+        Returns:
+            tuple: (nuevo, perdidas) donde nuevo es False si el resultado es un duplicado y
+            perdidas es el número estimado de adquisiciones perdidas antes de este resultado
+            (None si no se puede estimar).
+        """
+        crc = zlib.crc32(data_bytes)
+        if crc == self.last_crc:
+            self.duplicates += 1
+            self.last_seen = timestamp
+            return False, 0
+        lost = 0
+        # La primera lectura del primer resultado tiene fase arbitraria: no sirve para el período
+        if self.sequence >= 2:
+            interval = max(timestamp - self.first_seen, self.acq_seconds)
+            self.period = interval if self.period is None else min(self.period, interval)
+        if self.sequence >= 1:
+            bound = self.upper_bound()
+            if self.duplicates and self.period:
+                period = min(self.period, bound) if bound else self.period
+            else:
+                period = bound
+            if period:
+                lost = max(0, int(round((timestamp - self.last_seen) / period)) - 1)
+                self.dropped += lost
+            else:
+                lost = None
+                self.unknown += 1
+        self.last_crc = crc
+        self.first_seen = self.last_seen = timestamp
+        self.sequence += 1
+        return True, lost
+
+    def rate(self):
+        """
+        Tasa de resultados nuevos por segundo desde el inicio.
+        """
+        elapsed = time.time() - self.start
+        return self.sequence / elapsed if elapsed > 0 else 0.0
+
+
+def stream(instrument, view_name, directorio, duration=60.0, max_captures=None):
+    """
+    Adquiere en modo continuo una view durante `duration` segundos.
+
+    Los datos crudos (float32 tal como llegan del instrumento) se agregan a
+    '<directorio>/Stream_<i>.f32' y cada resultado nuevo se registra en
+    '<directorio>/Stream_<i>_index.csv' (secuencia, timestamp, CRC, puntos y pérdidas).
+    Las respuestas inválidas (no binarias o rechazadas por transfer.verify) se cuentan y se
+    reintentan con espera exponencial; tras MAX_INVALID seguidas se aborta el streaming.
+
+    Args:
+        instrument: Objeto de conexión al instrumento.
+        view_name (str): Nombre de la view (clave de STREAM_VIEWS).
+        directorio (str): Directorio de resultados de la view.
+        duration (float): Duración del monitoreo en segundos.
+        max_captures (int): Corta al alcanzar este número de resultados nuevos (opcional).
+    """
+    try:
+        spec = STREAM_VIEWS[view_name]
+        print(f"\n--- Streaming de {view_name} ---")
+        # Configura la vista una sola vez, sin disparar la adquisición simple
+        if spec["config"] is not None:
+            status = instrument_config(instrument, spec["config"], solo_configuracion=True)
+            if status != 0:
+                return config_error(f"streaming {view_name}", status)
+        else:
+            send_command(instrument, spec["view"])
+        acq_seconds = float(timed_query(instrument, ':SENSe:ACQuisition:SEConds?').strip())
+        # Una adquisición simple cronometrada: lo que excede a acq_seconds es el rearme
+        # (y la ida y vuelta del *OPC?), cota del período en modo continuo
+        start = time.perf_counter()
+        instrument.write(':INITiate:IMMediate')
+        timed_query(instrument, '*OPC?', op=opc_class(':INITiate:IMMediate', spec["config"] or view_name), idempotent=False)
+        rearm_seconds = max(0.0, time.perf_counter() - start - acq_seconds)
+        send_command(instrument, ':INITiate:CONTinuous ON')  # Modo de adquisición continua
+        send_command(instrument, ':INITiate:IMMediate', wait_opc=False)  # Inicia la adquisición
+
+        # Busca el próximo número disponible para el archivo
+        i = 1
+        while os.path.exists(os.path.join(directorio, f'Stream_{i}.f32')):
+            i += 1
+        data_path = os.path.join(directorio, f'Stream_{i}.f32')
+        index_path = os.path.join(directorio, f'Stream_{i}_index.csv')
+
+        tracker = AcquisitionTracker(acq_seconds, rearm_seconds)
+        invalid = 0  # Respuestas inválidas en total
+        consecutive = 0  # Respuestas inválidas seguidas
+        end = time.time() + duration
+        with open(data_path, 'ab') as data_file, open(index_path, 'w') as index_file:
+            index_file.write("seq,timestamp,crc32,points,offset,lost\n")
+            while time.time() < end and (max_captures is None or tracker.sequence < max_captures):
+                try:
+                    # Último resultado, con timeout adaptativo y bloque verificado (transfer.verify)
+                    raw_response = timed_fetch(instrument, spec["fetch"])
+                    data_bytes = block_bytes(raw_response)
+                    if data_bytes is None:
+                        raise ValueError("la respuesta no es un bloque binario")
+                except ValueError as e:
+                    invalid += 1
+                    consecutive += 1
+                    if consecutive >= MAX_INVALID:
+                        return f"Error en streaming {view_name}: {consecutive} respuestas inválidas seguidas ({e})"
+                    delay = min(INVALID_BACKOFF * 2 ** (consecutive - 1), MAX_BACKOFF)
+                    print(f"Respuesta inválida en streaming {view_name} ({e}), reintentando en {delay:.1f} s")
+                    time.sleep(delay)  # No satura el instrumento ni la consola mientras dure la falla
+                    continue
+                consecutive = 0
+                timestamp = time.time()
+                num_bytes = len(data_bytes)
+                new, lost = tracker.update(data_bytes, timestamp)
+                if not new:
+                    continue
+                offset = data_file.tell()
+                data_file.write(data_bytes)  # Se guardan los bytes crudos: sin conversión en el lazo
+                index_file.write(f"{tracker.sequence},{timestamp:.6f},{tracker.last_crc},"
+                                 f"{num_bytes // 4},{offset},{'' if lost is None else lost}\n")
+                if lost:
+                    logger(f"Streaming {view_name}: {lost} adquisiciones perdidas antes de la secuencia {tracker.sequence}")
+
+        resumen = (f"Streaming {view_name}: {tracker.sequence} resultados nuevos, "
+                   f"{tracker.duplicates} duplicados, {tracker.dropped} perdidos (estimado, "
+                   f"{tracker.unknown} sin estimar), {invalid} respuestas inválidas, "
+                   f"{tracker.rate():.2f} capturas/s")
+        print(resumen)
+        logger(resumen)
+        return f"Medicion Exitosa"
+
+    except Exception as e:
+        return f"Error en streaming {view_name}: {e}"
+
+    finally:
+        # Vuelve al modo de adquisición simple que usa el resto del script
+        try:
+            send_command(instrument, ':INITiate:CONTinuous OFF')
+        except Exception as e:
+            print(f"No se pudo desactivar el modo continuo: {e}")
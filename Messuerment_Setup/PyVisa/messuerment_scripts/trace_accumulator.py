@@ -0,0 +1,85 @@
+# Promediado de trazas en el host (promedio de potencia, max-hold, min-hold y exponencial).
+# En lugar de pedirle al analizador 50 promedios (:TRACe3:DPSA:AVERage:COUNt 50) y esperar
+# un tiempo fijo, se leen adquisiciones simples rápidas y se acumulan acá. Los resultados
+# parciales se pueden consultar en cualquier momento y la captura termina cuando el promedio
+# converge. Todo se actualiza en su lugar sobre arreglos float32 reservados al inicio.
+import numpy as np  # Para operaciones numéricas y manejo de arreglos
+
+ALPHA = 0.1  # Peso de la traza nueva en el promedio exponencial
+TOL_DB = 0.05  # Cambio máximo del promedio (dB) para considerarlo convergido
+MIN_COUNT = 10  # Trazas mínimas antes de evaluar la convergencia
+
+ACCUMULATORS = {}  # Acumulador en curso por view (resultados parciales en cualquier momento)
+
+
+class TraceAccumulator:
+    """
+    Acumulador de trazas en dBm.
+
+    El promedio y el promedio exponencial se calculan en potencia (mW) y no en dB, como el
+    promedio de potencia del instrumento; max-hold y min-hold se guardan directamente en dBm.
+    """
+
+    def __init__(self, n_points, alpha=ALPHA):
+        self.alpha = np.float32(alpha)
+        self.count = 0
+        self.last_change_db = np.inf  # Cambio máximo del promedio en la última traza
+        self.average = np.zeros(n_points, dtype=np.float32)  # mW
+        self.exp_average = np.zeros(n_points, dtype=np.float32)  # mW
+        self.max_hold = np.full(n_points, -np.inf, dtype=np.float32)  # dBm
+        self.min_hold = np.full(n_points, np.inf, dtype=np.float32)  # dBm
+        self._power = np.empty(n_points, dtype=np.float32)  # Áreas de trabajo
+        self._delta = np.empty(n_points, dtype=np.float32)
+
+    def update(self, trace_dbm):
+        """
+        Acumula una traza en dBm (sin reservar memoria nueva).
+        """
+        power, delta = self._power, self._delta
+        np.multiply(trace_dbm, np.float32(0.1), out=power, casting='same_kind')
+        np.power(np.float32(10), power, out=power)  # dBm -> mW
+        np.maximum(self.max_hold, trace_dbm, out=self.max_hold, casting='same_kind')
+        np.minimum(self.min_hold, trace_dbm, out=self.min_hold, casting='same_kind')
+        self.count += 1
+        if self.count == 1:
+            self.average[:] = power
+            self.exp_average[:] = power
+            return
+        # Promedio exponencial: ema += alpha * (p - ema)
+        np.subtract(power, self.exp_average, out=delta)
+        delta *= self.alpha
+        self.exp_average += delta
+        # Promedio acumulado: avg += (p - avg) / n
+        np.subtract(power, self.average, out=delta)
+        delta *= np.float32(1 / self.count)
+        self.average += delta
+        np.divide(delta, self.average, out=delta)  # Cambio relativo respecto del promedio nuevo
+        worst = max(abs(float(delta.max())), abs(float(delta.min())))
+        self.last_change_db = abs(10 * np.log10(max(1 - worst, 1e-12)))
+
+    def converged(self, tol_db=TOL_DB, min_count=MIN_COUNT):
+        """
+        True si la última traza cambió el promedio menos de tol_db en todos los puntos.
+        """
+        return self.count >= min_count and self.last_change_db < tol_db
+
+    def result(self):
+        """
+        Resultados parciales en dBm (copias: el acumulador sigue actualizándose).
+
+        Returns:
+            dict: 'average', 'max_hold', 'min_hold' y 'exp_average'.
+        """
+        to_dbm = lambda power: (10 * np.log10(np.maximum(power, np.float32(1e-30)))).astype(np.float32)
+        return {
+            'average': to_dbm(self.average),
+            'max_hold': self.max_hold.copy(),
+            'min_hold': self.min_hold.copy(),
+            'exp_average': to_dbm(self.exp_average),
+        }
+
+    def reset(self):
+        self.count = 0
+        self.last_change_db = np.inf
+        self.max_hold.fill(-np.inf)
+        self.min_hold.fill(np.inf)
@@ -0,0 +1,236 @@
+# Buffer circular en memoria compartida para repartir las trazas adquiridas.
+# Cada traza guardada con binblock.save_csv también se publica en un segmento de
+# multiprocessing.shared_memory de tamaño fijo (SLOTS ranuras de SLOT_BYTES). Cada traza
+# lleva un número de secuencia creciente; varios procesos consumidores (extracción de PDW,
+# promediado, archivo, vista en vivo) leen la misma traza sin copiarla y en paralelo con el
+# bucle de adquisición, sin volver a leer los CSV del disco.
+# El productor nunca espera a los consumidores: si un consumidor se atrasa más de SLOTS
+# trazas, las ranuras se sobrescriben y el consumidor lo detecta (overrun) por la secuencia.
+# Uso: python messuerment.py -ring rsa_traces
+#      python trace_ring.py rsa_traces   (consumidor de ejemplo)
+import argparse  #para parsear argumentos
+import os        #para obtener la view desde la ruta
+import struct    # Encabezados del segmento y de cada ranura
+import time  # Instante de publicación y espera de los consumidores
+from multiprocessing import resource_tracker, shared_memory  # Segmento compartido entre procesos
+
+import numpy as np  # Vistas de las trazas sobre la memoria compartida
+
+SLOTS = 16  # Ranuras del buffer (trazas que puede atrasarse un consumidor)
+SLOT_BYTES = 4 * 1024 * 1024  # Bytes de datos por ranura (IQ: 200000 puntos x 3 columnas float32)
+MAX_COLUMNS = 8  # Columnas por traza
+POLL_INTERVAL = 0.01  # Segundos entre consultas de los consumidores
+
+MAGIC = b'RSARING1'
+HEADER = struct.Struct('<8sIQQ')  # magic, ranuras, bytes por ranura, próxima secuencia (head)
+HEADER_SIZE = 64
+# Encabezado de ranura: secuencia al empezar a escribir, secuencia al terminar, instante,
+# puntos, columnas, tipo de dato, view, archivo y nombres de columnas
+SLOT = struct.Struct(f'<QQdIIc32s96s{32 * MAX_COLUMNS}s')
+SLOT_HEADER_SIZE = 512
+DTYPES = {b'f': np.float32, b'd': np.float64}
+
+
+class Overrun(RuntimeError):
+    """
+    La traza pedida ya fue sobrescrita por el productor.
+    """
+
+
+class TraceRing:
+    """
+    Productor: crea el segmento y publica las trazas (un único proceso escritor).
+
+    Args:
+        name (str): Nombre del segmento (lo usan los consumidores para conectarse).
+        slots (int): Cantidad de ranuras.
+        slot_bytes (int): Bytes de datos por ranura.
+    """
+
+    def __init__(self, name, slots=SLOTS, slot_bytes=SLOT_BYTES):
+        self.slots = slots
+        self.slot_bytes = slot_bytes
+        size = HEADER_SIZE + slots * (SLOT_HEADER_SIZE + slot_bytes)
+        self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        self.head = 1  # La secuencia 0 marca una ranura vacía
+        self.skipped = 0  # Trazas que no entran en una ranura
+        self.shm.buf[:HEADER_SIZE] = bytes(HEADER_SIZE)
+        for i in range(slots):
+            offset = HEADER_SIZE + i * (SLOT_HEADER_SIZE + slot_bytes)
+            self.shm.buf[offset:offset + SLOT.size] = bytes(SLOT.size)
+        HEADER.pack_into(self.shm.buf, 0, MAGIC, slots, slot_bytes, self.head)
+        print(f"Buffer de trazas '{name}': {slots} ranuras de {slot_bytes / 2**20:.0f} MB")
+
+    def publish(self, output_path, columns):
+        """
+        Copia las columnas de una captura en la próxima ranura (se llama desde binblock.save_csv).
+
+        Returns:
+            int: Secuencia asignada, o 0 si la traza no entra en una ranura.
+        """
+        names = list(columns)[:MAX_COLUMNS]
+        arrays = [np.asarray(columns[c]) for c in names]
+        dtype = np.float32 if all(a.dtype == np.float32 for a in arrays) else np.float64
+        n_points = min(len(a) for a in arrays)
+        nbytes = len(arrays) * n_points * np.dtype(dtype).itemsize
+        if nbytes > self.slot_bytes:
+            self.skipped += 1
+            return 0
+        seq = self.head
+        offset = HEADER_SIZE + (seq % self.slots) * (SLOT_HEADER_SIZE + self.slot_bytes)
+        buf = self.shm.buf
+        # Secuencia de inicio primero: un consumidor que lee la ranura ve que cambió (seqlock)
+        struct.pack_into('<Q', buf, offset, seq)
+        data = np.ndarray((len(arrays), n_points), dtype=dtype, buffer=buf, offset=offset + SLOT_HEADER_SIZE)
+        for row, a in zip(data, arrays):
+            row[:] = a[:n_points]
+        del data  # Libera la vista para poder cerrar el segmento
+        view = os.path.basename(os.path.dirname(output_path)) or 'captura'
+        packed_names = b''.join(c.encode()[:32].ljust(32, b'\0') for c in names)
+        SLOT.pack_into(buf, offset, seq, seq, time.time(), n_points, len(arrays),
+                       b'f' if dtype == np.float32 else b'd', view.encode()[:32],
+                       os.path.basename(output_path).encode()[:96], packed_names)
+        self.head = seq + 1
+        struct.pack_into('<Q', buf, 20, self.head)  # Recién ahora la traza es visible
+        return seq
+
+    def close(self):
+        """
+        Cierra y elimina el segmento (los consumidores conectados dejan de recibir trazas).
+        """
+        if self.skipped:
+            print(f"Buffer de trazas: {self.skipped} trazas no entraron en una ranura")
+        self.shm.close()
+        self.shm.unlink()
+
+
+class RingReader:
+    """
+    Consumidor: se conecta a un segmento existente y lee las trazas en orden.
+
+    Las trazas devueltas son vistas sobre la memoria compartida (sin copia): son válidas
+    hasta que el productor reutiliza la ranura, lo que se verifica con valid(). Para
+    conservarlas más tiempo hay que copiarlas (read(seq, copy=True)).
+
+    Args:
+        name (str): Nombre del segmento.
+        start (str): 'latest' empieza en la próxima traza publicada, 'oldest' en la más
+            antigua disponible.
+    """
+
+    def __init__(self, name, start='latest'):
+        own_tracker = resource_tracker._resource_tracker._fd is None  # No heredado del productor (fork)
+        self.shm = shared_memory.SharedMemory(name=name)
+        if own_tracker:
+            # El segmento es del productor: el consumidor no debe eliminarlo al terminar
+            resource_tracker.unregister(self.shm._name, 'shared_memory')
+        magic, self.slots, self.slot_bytes, head = HEADER.unpack_from(self.shm.buf, 0)
+        if magic != MAGIC:
+            self.shm.close()
+            raise ValueError(f"'{name}' no es un buffer de trazas")
+        self.next_seq = head if start == 'latest' else max(1, head - self.slots + 1)
+        self.lost = 0  # Trazas perdidas por overrun
+
+    def head(self):
+        """
+        Próxima secuencia que publicará el productor.
+        """
+        return struct.unpack_from('<Q', self.shm.buf, 20)[0]
+
+    def _offset(self, seq):
+        return HEADER_SIZE + (seq % self.slots) * (SLOT_HEADER_SIZE + self.slot_bytes)
+
+    def valid(self, seq):
+        """
+        True si la ranura todavía contiene la traza seq (las vistas devueltas siguen válidas).
+        """
+        return struct.unpack_from('<Q', self.shm.buf, self._offset(seq))[0] == seq
+
+    def read(self, seq, copy=False):
+        """
+        Lee la traza seq.
+
+        Returns:
+            dict: seq, time, view, file y columns (nombre -> arreglo).
+
+        Raises:
+            Overrun: Si la traza ya fue sobrescrita (o todavía no se publicó).
+        """
+        offset = self._offset(seq)
+        begin, end, t, n_points, n_columns, code, view, file, names = SLOT.unpack_from(self.shm.buf, offset)
+        if begin != seq or end != seq:
+            raise Overrun(f"La traza {seq} ya no está en el buffer")
+        data = np.ndarray((n_columns, n_points), dtype=DTYPES[code], buffer=self.shm.buf,
+                          offset=offset + SLOT_HEADER_SIZE)
+        if copy:
+            data = data.copy()
+        names = [names[32 * i:32 * (i + 1)].rstrip(b'\0').decode(errors='replace') for i in range(n_columns)]
+        if not self.valid(seq):
+            raise Overrun(f"La traza {seq} se sobrescribió durante la lectura")
+        return {'seq': seq, 'time': t, 'view': view.rstrip(b'\0').decode(), 'file': file.rstrip(b'\0').decode(),
+                'columns': dict(zip(names, data))}
+
+    def next(self, timeout=None):
+        """
+        Próxima traza en orden, esperando a que se publique.
+
+        Si el consumidor se atrasó más de lo que guarda el buffer, salta a la traza más
+        antigua disponible y suma las perdidas en lost.
+
+        Returns:
+            dict: Traza (ver read), o None si se agotó timeout.
+        """
+        deadline = None if timeout is None else time.time() + timeout
+        while True:
+            head = self.head()
+            if self.next_seq < head:
+                if head - self.next_seq > self.slots - 1:
+                    oldest = head - self.slots + 1  # La ranura siguiente puede estar escribiéndose
+                    self.lost += oldest - self.next_seq
+                    self.next_seq = oldest
+                try:
+                    trace = self.read(self.next_seq)
+                except Overrun:
+                    self.lost += 1
+                    self.next_seq += 1
+                    continue
+                self.next_seq += 1
+                return trace
+            if deadline is not None and time.time() >= deadline:
+                return None
+            time.sleep(POLL_INTERVAL)
+
+    def close(self):
+        """
+        Desconecta el consumidor (hay que soltar antes las vistas devueltas).
+        """
+        self.shm.close()
+
+
+if __name__ == "__main__":
+    # Crear el parser
+    parser = argparse.ArgumentParser(description="Consumidor de ejemplo del buffer de trazas en memoria compartida")
+    parser.add_argument('name', type=str, help="Nombre del segmento (argumento -ring de messuerment.py)")
+    parser.add_argument('-oldest', action='store_true', help="Empieza por la traza más antigua disponible")
+    parser.add_argument('-t', type=float, default=10, help="Segundos sin trazas nuevas antes de terminar")
+    args = parser.parse_args()
+
+    reader = RingReader(args.name, 'oldest' if args.oldest else 'latest')
+    try:
+        while True:
+            trace = reader.next(timeout=args.t)
+            if trace is None:
+                break
+            columns = trace['columns']
+            y = list(columns.values())[-1]
+            print(f"#{trace['seq']} {trace['view']}/{trace['file']}: {len(y)} puntos, "
+                  f"{', '.join(columns)} - max {np.nanmax(y):.2f}, retardo {time.time() - trace['time']:.3f} s, "
+                  f"perdidas {reader.lost}")
+            valid = reader.valid(trace['seq'])
+            del trace, columns, y  # Suelta las vistas sobre la memoria compartida
+            if not valid:
+                print("\t -La traza se sobrescribió mientras se procesaba")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        reader.close()
@@ -0,0 +1,134 @@
+# Negociación del tamaño de transferencia de cada view.
+# Cada view declara la resolución que necesita el análisis (clave "points" de la lista de
+# views del runner). Al configurarla se fija explícitamente la cantidad de puntos de traza
+# de cada medición (:MAXTracepoints o :POINts:COUNt), se verifica leyéndola de vuelta y
+# cada bloque recibido se controla: binario (no ASCII), float32 completo, orden de bytes
+# little endian plausible y no más puntos que los pedidos.
+# El RSA6114A no tiene subsistema :FORMat: los :FETCh devuelven siempre bloques binarios
+# IEEE 488.2 de float32 little endian, así que el formato y el orden de bytes se verifican
+# en cada bloque en lugar de configurarse.
+import numpy as np  # Para verificar los bloques recibidos
+
+# Valores de los parámetros enumerados: puntos -> parámetro SCPI
+MAX_TRACEPOINTS = {1000: 'ONEK', 10000: 'TENK', 100000: 'HUNDredk'}
+SPECTRUM_POINTS = {801: 'P801', 2401: 'P2401', 4001: 'P4001', 8001: 'P8001', 10401: 'P10401'}
+
+# Medición -> (comando de puntos, consulta de datos, valores posibles, cantidad exacta)
+# Con :MAXTracepoints el instrumento devuelve a lo sumo esa cantidad; con :POINts:COUNt exacta.
+POINTS_COMMANDS = {
+    'PHVTime': (':SENSe:PHVTime:MAXTracepoints', ':FETCh:PHVTime', MAX_TRACEPOINTS, False),
+    'FVTime': (':SENSe:FVTime:MAXTracepoints', ':FETCh:FVTime', MAX_TRACEPOINTS, False),
+    'TOVerview': (':SENSe:TOVerview:MAXTracepoints', ':FETCh:TOverview', MAX_TRACEPOINTS, False),
+    'SPECtrum': (':SENSe:SPECtrum:POINts:COUNt', ':FETCh:SPECtrum:TRACe1', SPECTRUM_POINTS, True),
+}
+# DPX (DPSA) no tiene comando de cantidad de puntos: sus trazas no se negocian ni se verifican
+ABSURD = 1e12  # Valor absoluto máximo plausible de una muestra
+TINY = 1e-20  # Valor absoluto mínimo plausible (distinto de cero)
+
+RESOLUTION = None  # Puntos pedidos por la view en curso (int, dict medición -> puntos o None)
+EXPECTED = {}  # Consulta de datos -> (puntos negociados, cantidad exacta)
+
+
+def set_resolution(points):
+    """
+    Selecciona la resolución de la view que se va a ejecutar (None = la del instrumento).
+    """
+    global RESOLUTION
+    RESOLUTION = points
+
+
+def requested(measurement, resolution=None):
+    """
+    Puntos pedidos para una medición por la view en curso (o por resolution), o None.
+    """
+    resolution = RESOLUTION if resolution is None else resolution
+    if isinstance(resolution, dict):
+        return resolution.get(measurement)
+    return resolution
+
+
+def measurement_of(command):
+    """
+    Medición que abre un comando :DISPlay:...:MEASview:NEW/SELect, o None.
+    """
+    parts = command.split()
+    if len(parts) < 2 or ':MEASVIEW:' not in parts[0].upper():
+        return None
+    return parts[1] if parts[1] in POINTS_COMMANDS else None
+
+
+def points_setting(measurement, points):
+    """
+    Comando y parámetro que dan al menos points puntos (el menor posible, para no transferir
+    de más).
+
+    Returns:
+        tuple: (comando, parámetro, puntos que se van a recibir).
+    """
+    command, _, values, _ = POINTS_COMMANDS[measurement]
+    options = sorted(values)
+    chosen = next((n for n in options if n >= points), options[-1])
+    if chosen < points:
+        print(f"Advertencia: {measurement} admite a lo sumo {chosen} puntos (se pidieron {points})")
+    return command, values[chosen], chosen
+
+
+def same_value(response, value):
+    """
+    True si la respuesta del instrumento corresponde al parámetro (forma larga o corta).
+    """
+    response = response.strip().strip('"').upper()
+    short = ''.join(ch for ch in value if ch.isupper() or ch.isdigit())
+    return response in (value.upper(), short)
+
+
+def expect(measurement, points):
+    """
+    Registra los puntos negociados para verificar los bloques de la medición (None = sin control).
+    """
+    _, query, _, exact = POINTS_COMMANDS[measurement]
+    if points is None:
+        EXPECTED.pop(query, None)
+    else:
+        EXPECTED[query] = (points, exact)
+
+
+def _absurd_fraction(values):
+    with np.errstate(invalid='ignore', over='ignore'):
+        magnitude = np.abs(values)
+        bad = ~np.isfinite(values) | (magnitude > ABSURD) | ((magnitude > 0) & (magnitude < TINY))
+    return float(bad.mean()) if len(values) else 0.0
+
+
+def verify(query, raw_response):
+    """
+    Verifica los bloques de una consulta de datos (o de una consulta compuesta con ';').
+    Solo se controlan las consultas de las mediciones de POINTS_COMMANDS.
+
+    Raises:
+        ValueError: Respuesta ASCII, bloque incompleto, orden de bytes invertido o más
+            puntos que los negociados.
+    """
+    queries = [q.split('?')[0].strip() for q in query.split(';')]
+    known = {q for _, q, _, _ in POINTS_COMMANDS.values()}
+    if not all(q in known for q in queries):
+        return
+    position = 0
+    for q in queries:
+        if position >= len(raw_response) or raw_response[position] != ord('#'):
+            raise ValueError(f"{q}: la respuesta no es un bloque binario (¿formato ASCII?)")
+        num_digits = int(chr(raw_response[position + 1]))
+        num_bytes = int(raw_response[position + 2:position + 2 + num_digits].decode())
+        start = position + 2 + num_digits
+        data = raw_response[start:start + num_bytes]
+        if len(data) < num_bytes or num_bytes % 4:
+            raise ValueError(f"{q}: bloque incompleto ({len(data)} de {num_bytes} bytes)")
+        points = num_bytes // 4
+        little = np.frombuffer(data, dtype='<f4')
+        if _absurd_fraction(little) > 0.2 and _absurd_fraction(little.byteswap()) < 0.01:
+            raise ValueError(f"{q}: los datos no son float32 little endian (orden de bytes invertido)")
+        if q in EXPECTED:
+            expected, exact = EXPECTED[q]
+            if points > expected or (exact and points != expected):
+                raise ValueError(f"{q}: se recibieron {points} puntos, se negociaron {expected}")
+        position = start + num_bytes + 1  # Separador ';' entre bloques
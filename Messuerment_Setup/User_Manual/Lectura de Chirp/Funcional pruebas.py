@@ -9,10 +9,20 @@ import struct  # Para desempaquetar datos binarios recibidos del instrumento
 import pandas as pd  # Para guardar datos en archivos CSV
 import time  # Para agregar retrasos entre comandos
 from scipy.signal import find_peaks  # Para detectar picos en los datos de Time Overview
+import os  # Para armar rutas
+import sys  # Para importar la tabla de resultados de messuerment_scripts
+
+# Tabla de resultados de campaña (una fila por corrida, de solo agregado)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'PyVisa', 'messuerment_scripts'))
+try:
+    from results_table import ResultsTable, config_hash, PARAMETER_NAMES
+except ImportError:
+    ResultsTable = None
 
 # --- Configuración inicial de la conexión al instrumento ---
 rm = pyvisa.ResourceManager()  # Crea un administrador de recursos para manejar conexiones VISA
 instrument = None  # Variable para almacenar la conexión al instrumento (inicialmente None)
+configuracion = []  # Comandos de configuración enviados (identifican la corrida en la tabla de resultados)
 
 # Función para enviar comandos al instrumento y verificar su ejecución
 def send_command(instr, command, wait_opc=True, delay=0.1):
@@ -25,6 +35,8 @@ def send_command(instr, command, wait_opc=True, delay=0.1):
         delay (float): Retraso en segundos después de enviar el comando.
     """
     print(f"Enviando: {command}")  # Muestra el comando que se está enviando
+    if not command.startswith(('*', ':INITiate')) and not command.endswith('?'):
+        configuracion.append(command)  # Los disparos y consultas no son parte de la configuración
     instr.write(command)  # Envía el comando al instrumento
     time.sleep(delay)  # Espera un pequeño retraso para que el instrumento procese el comando
     if wait_opc:
@@ -195,6 +207,7 @@ try:
         avg_power_dbm = 0  # Potencia promedio del pulso en dBm
         pri_ms = 0  # Intervalo entre pulsos (PRI) en ms
         prf_hz = 0  # Frecuencia de repetición de pulsos (PRF) en Hz
+        jitter_ms = 0  # Desvío estándar del PRI en ms
 
         # Calcula la duración del pulso a partir de Pulse Trace
         if len(pulse_data) > 0:
@@ -247,6 +260,7 @@ try:
                 intervals_ms = np.diff(time_points[peaks])  # Intervalos entre picos en ms
                 pri_ms = np.mean(intervals_ms)  # PRI promedio
                 prf_hz = 1000 / pri_ms  # PRF en Hz (1000 / PRI)
+                jitter_ms = np.std(intervals_ms)  # Jitter del PRI
                 print(f"Intervalo promedio entre pulsos (PRI): {pri_ms:.3f} ms")
                 print(f"PRF: {prf_hz:.2f} Hz")
                 # Grafica Time Overview con los picos detectados
@@ -272,10 +286,18 @@ try:
             'Ancho de banda (MHz)': bandwidth_mhz,
             'Tasa de cambio de frecuencia (MHz/μs)': chirp_rate_mhz_per_us,
             'PRI (ms)': pri_ms,
-            'PRF (Hz)': prf_hz
+            'PRF (Hz)': prf_hz,
+            'Jitter (ms)': jitter_ms,
+            'Timestamp': time.time()
         }
-        pd.DataFrame([parameters]).to_csv('chirp_parameters.csv', index=False)
+        pd.DataFrame([parameters]).to_csv('chirp_parameters.csv', index=False)  # Última corrida
         print("Parámetros guardados en 'chirp_parameters.csv'.")
+        # Agrega la corrida a la tabla de resultados (identificada por los comandos de configuración enviados)
+        if ResultsTable is not None:
+            table = ResultsTable('tabla_resultados')
+            table.append({'view': 'Funcional', 'config_hash': config_hash(*configuracion),
+                          **{name: parameters[col] for col, name in PARAMETER_NAMES.items()}})
+            print(f"Corrida agregada a 'tabla_resultados' ({table.rows} filas).")
 
     except Exception as e:
         print(f"Error al extraer parámetros: {e}")